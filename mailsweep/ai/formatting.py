@@ -0,0 +1,64 @@
+"""Plain-string helpers for the AI chat: history trimming and reply markup."""
+from __future__ import annotations
+
+import re
+
+# Chat history sent with each request: at most this many past turns
+# (user + assistant message pairs), and at most this many characters.
+_MAX_HISTORY_TURNS = 20
+_MAX_HISTORY_CHARS = 32_000
+
+# Markdown subset rendered by format_response, matched in one pass.
+# Groups: 1 bold, 2 code block (may span lines), 3 inline code, 4 rest of a MOVE line
+_MD_RE = re.compile(r"\*\*(.+?)\*\*|(?s:```(.*?)```)|`([^`]+)`|MOVE:(.*)")
+
+# Static HTML around rendered markdown, concatenated per use
+_PRE_PRE = '<pre style="background:#e8e8e8; padding:4px; color:#333;">'
+_CODE_PRE = '<code style="background:#e8e8e8; color:#333;">'
+_MOVE_PRE = '<span style="color: #bf360c; font-weight: bold;">MOVE:'
+
+_ESCAPE_TABLE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+
+
+def history_window(history: list[dict]) -> tuple[dict, ...]:
+    """Return the most recent part of *history* that fits the turn and size limits.
+
+    The window always starts on a user message, as chat APIs expect. It is
+    returned as a tuple so the worker thread gets a snapshot it cannot mutate.
+    """
+    first = max(0, len(history) - _MAX_HISTORY_TURNS * 2)
+    total = 0
+    start = len(history)
+    for i in range(len(history) - 1, first - 1, -1):
+        total += len(history[i]["content"])
+        if total > _MAX_HISTORY_CHARS:
+            break
+        start = i
+    while start < len(history) and history[start]["role"] != "user":
+        start += 1
+    return tuple(history[start:])
+
+
+def escape_html(text: str) -> str:
+    return text.translate(_ESCAPE_TABLE)
+
+
+def format_response(text: str) -> str:
+    """Basic markdown → HTML conversion for AI responses."""
+    escaped = escape_html(text)
+    if "*" not in text and "`" not in text and "MOVE:" not in text:
+        return escaped.replace("\n", "<br>")  # plain prose: nothing for _MD_RE to match
+    return _MD_RE.sub(_render_markdown, escaped).replace("\n", "<br>")
+
+
+def _render_markdown(m: re.Match[str]) -> str:
+    bold, block, code, move = m.groups()
+    if bold is not None:
+        return "<b>" + _MD_RE.sub(_render_markdown, bold) + "</b>"
+    if block is not None:
+        # MOVE lines are often fenced; keep them highlighted inside the block
+        return _PRE_PRE + _MD_RE.sub(_render_markdown, block) + "</pre>"
+    if code is not None:
+        return _CODE_PRE + code + "</code>"
+    # MOVE lines — highlight them
+    return _MOVE_PRE + _MD_RE.sub(_render_markdown, move) + "</span>"
@@ -6,6 +6,7 @@ import logging
 import urllib.request
 import urllib.error
 from abc import ABC, abstractmethod
+from typing import Iterator
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +22,24 @@ class LLMProvider(ABC):
     def chat(self, messages: list[dict], system: str = "") -> str:
         """Send a chat completion request and return the assistant's reply text."""
 
+    def chat_stream(self, messages: list[dict], system: str = "") -> Iterator[str]:
+        """Like chat(), but yield the reply in chunks as the server produces them.
+
+        The default implementation yields the whole reply as one chunk.
+        """
+        yield self.chat(messages, system=system)
+
+
+def _iter_sse_data(resp, source: str) -> Iterator[str]:
+    """Yield the payload of each ``data:`` line of a server-sent event stream."""
+    try:
+        for raw in resp:
+            line = raw.decode("utf-8").strip()
+            if line.startswith("data:"):
+                yield line[5:].lstrip()
+    except Exception as exc:
+        raise LLMError(f"Stream from {source} interrupted: {exc}") from exc
+
 
 class OpenAICompatProvider(LLMProvider):
     """POST /v1/chat/completions — works with OpenAI, Ollama, Groq, Together, etc."""
@@ -30,7 +49,7 @@ class OpenAICompatProvider(LLMProvider):
         self._api_key = api_key
         self._model = model
 
-    def chat(self, messages: list[dict], system: str = "") -> str:
+    def _request(self, messages: list[dict], system: str, stream: bool) -> urllib.request.Request:
         url = f"{self._base_url}/chat/completions"
         all_messages = list(messages)
         if system:
@@ -39,7 +58,7 @@ class OpenAICompatProvider(LLMProvider):
         payload = {
             "model": self._model,
             "messages": all_messages,
-            "stream": False,
+            "stream": stream,
         }
 
         headers = {"Content-Type": "application/json"}
@@ -47,11 +66,12 @@ class OpenAICompatProvider(LLMProvider):
             headers["Authorization"] = f"Bearer {self._api_key}"
 
         data = json.dumps(payload).encode("utf-8")
-        req = urllib.request.Request(url, data=data, headers=headers, method="POST")
+        return urllib.request.Request(url, data=data, headers=headers, method="POST")
 
+    def _open(self, req: urllib.request.Request):
+        url = req.full_url
         try:
-            with urllib.request.urlopen(req, timeout=TIMEOUT) as resp:
-                body = json.loads(resp.read().decode("utf-8"))
+            return urllib.request.urlopen(req, timeout=TIMEOUT)
         except urllib.error.HTTPError as exc:
             err_body = exc.read().decode("utf-8", errors="replace")
             raise LLMError(f"HTTP {exc.code} from {url}: {err_body}") from exc
@@ -60,11 +80,36 @@ class OpenAICompatProvider(LLMProvider):
         except Exception as exc:
             raise LLMError(f"Request failed: {exc}") from exc
 
+    def chat(self, messages: list[dict], system: str = "") -> str:
+        req = self._request(messages, system, stream=False)
+        with self._open(req) as resp:
+            try:
+                body = json.loads(resp.read().decode("utf-8"))
+            except Exception as exc:
+                raise LLMError(f"Request failed: {exc}") from exc
+
         try:
             return body["choices"][0]["message"]["content"]
         except (KeyError, IndexError) as exc:
             raise LLMError(f"Unexpected response format: {body}") from exc
 
+    def chat_stream(self, messages: list[dict], system: str = "") -> Iterator[str]:
+        req = self._request(messages, system, stream=True)
+        with self._open(req) as resp:
+            for data in _iter_sse_data(resp, req.full_url):
+                if data == "[DONE]":
+                    return
+                try:
+                    chunk = json.loads(data)
+                    choices = chunk.get("choices")
+                    if not choices:
+                        continue  # usage or content-filter chunk, no text
+                    text = choices[0].get("delta", {}).get("content")
+                except (ValueError, AttributeError) as exc:
+                    raise LLMError(f"Unexpected stream chunk: {data}") from exc
+                if text:
+                    yield text
+
 
 class AnthropicProvider(LLMProvider):
     """POST /v1/messages — Anthropic API."""
@@ -75,7 +120,7 @@ class AnthropicProvider(LLMProvider):
         self._api_key = api_key
         self._model = model
 
-    def chat(self, messages: list[dict], system: str = "") -> str:
+    def _request(self, messages: list[dict], system: str, stream: bool) -> urllib.request.Request:
         payload: dict = {
             "model": self._model,
             "max_tokens": 4096,
@@ -83,6 +128,8 @@ class AnthropicProvider(LLMProvider):
         }
         if system:
             payload["system"] = system
+        if stream:
+            payload["stream"] = True
 
         headers = {
             "Content-Type": "application/json",
@@ -91,13 +138,13 @@ class AnthropicProvider(LLMProvider):
         }
 
         data = json.dumps(payload).encode("utf-8")
-        req = urllib.request.Request(
+        return urllib.request.Request(
             self.API_URL, data=data, headers=headers, method="POST"
         )
 
+    def _open(self, req: urllib.request.Request):
         try:
-            with urllib.request.urlopen(req, timeout=TIMEOUT) as resp:
-                body = json.loads(resp.read().decode("utf-8"))
+            return urllib.request.urlopen(req, timeout=TIMEOUT)
         except urllib.error.HTTPError as exc:
             err_body = exc.read().decode("utf-8", errors="replace")
             raise LLMError(f"HTTP {exc.code} from Anthropic: {err_body}") from exc
@@ -106,11 +153,38 @@ class AnthropicProvider(LLMProvider):
         except Exception as exc:
             raise LLMError(f"Request failed: {exc}") from exc
 
+    def chat(self, messages: list[dict], system: str = "") -> str:
+        req = self._request(messages, system, stream=False)
+        with self._open(req) as resp:
+            try:
+                body = json.loads(resp.read().decode("utf-8"))
+            except Exception as exc:
+                raise LLMError(f"Request failed: {exc}") from exc
+
         try:
             return body["content"][0]["text"]
         except (KeyError, IndexError) as exc:
             raise LLMError(f"Unexpected Anthropic response: {body}") from exc
 
+    def chat_stream(self, messages: list[dict], system: str = "") -> Iterator[str]:
+        req = self._request(messages, system, stream=True)
+        with self._open(req) as resp:
+            for data in _iter_sse_data(resp, "Anthropic"):
+                try:
+                    event = json.loads(data)
+                except ValueError as exc:
+                    raise LLMError(f"Unexpected Anthropic stream event: {data}") from exc
+                kind = event.get("type")
+                if kind == "content_block_delta":
+                    text = event.get("delta", {}).get("text")
+                    if text:
+                        yield text
+                elif kind == "message_stop":
+                    return
+                elif kind == "error":
+                    message = event.get("error", {}).get("message", data)
+                    raise LLMError(f"Anthropic stream error: {message}")
+
 
 # ── Provider presets ─────────────────────────────────────────────────────────
 
@@ -130,18 +204,21 @@ PROVIDER_MODELS: dict[str, list[str]] = {
     "custom": [],
 }
 
+# Local servers that need no API key
+NO_KEY_PROVIDERS = frozenset({"ollama", "lm-studio"})
 
 def fetch_model_list(base_url: str, api_key: str = "") -> list[str]:
     """GET {base_url}/models and return sorted list of model IDs.
 
     Returns an empty list on any error (connection refused, timeout, etc.).
+    Goes through urllib so proxy settings and redirects are honoured.
     """
     url = f"{base_url.rstrip('/')}/models"
     headers: dict[str, str] = {}
     if api_key:
         headers["Authorization"] = f"Bearer {api_key}"
-    req = urllib.request.Request(url, headers=headers, method="GET")
     try:
+        req = urllib.request.Request(url, headers=headers, method="GET")
         with urllib.request.urlopen(req, timeout=5) as resp:
             body = json.loads(resp.read().decode("utf-8"))
         return sorted(item["id"] for item in body.get("data", []))
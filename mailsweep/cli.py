@@ -123,9 +123,7 @@ def main(argv: list[str] | None = None) -> None:
         folder.uid_validity = server_uidvalidity
         folder.last_scanned_at = datetime.now(timezone.utc)
         folder_repo.upsert(folder)
-        folder_repo.update_stats(folder.id)
-
-        updated = folder_repo.get_by_id(folder.id)
+        updated = folder_repo.update_stats(folder.id)
         count = updated.message_count if updated else len(messages)
         size = updated.total_size_bytes if updated else sum(m.size_bytes for m in messages)
         results.append((fname, count, size))
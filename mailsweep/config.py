@@ -29,12 +29,14 @@ for _d in (DATA_DIR, CONFIG_DIR, DEFAULT_SAVE_DIR):
 # ── Scan settings ─────────────────────────────────────────────────────────────
 
 SCAN_BATCH_SIZE: int = 500
+SCAN_CONNECTIONS: int = 3  # parallel IMAP connections per scan (servers cap these)
 SCAN_TIMEOUT_SECONDS: int = 60
 
 # ── UI ────────────────────────────────────────────────────────────────────────
 
 MESSAGE_TABLE_MAX_ROWS: int = 5000
 TREEMAP_MIN_SIZE_BYTES: int = 1024  # Don't draw tiles smaller than 1 KB
+TREEMAP_MAX_NODES: int = 2000  # Larger item sets keep the biggest; the rest become "Other"
 
 # ── AI ───────────────────────────────────────────────────────────────────────
 
@@ -53,6 +55,7 @@ def save_settings() -> None:
     """Persist user-changeable settings to disk.  AI API key goes to keyring."""
     data = {
         "scan_batch_size": SCAN_BATCH_SIZE,
+        "scan_connections": SCAN_CONNECTIONS,
         "message_table_max_rows": MESSAGE_TABLE_MAX_ROWS,
         "default_save_dir": str(DEFAULT_SAVE_DIR),
         "unlabelled_mode": UNLABELLED_MODE,
@@ -78,7 +81,7 @@ def save_settings() -> None:
 
 def load_settings() -> None:
     """Load persisted settings from disk, falling back to defaults."""
-    global SCAN_BATCH_SIZE, MESSAGE_TABLE_MAX_ROWS, DEFAULT_SAVE_DIR
+    global SCAN_BATCH_SIZE, SCAN_CONNECTIONS, MESSAGE_TABLE_MAX_ROWS, DEFAULT_SAVE_DIR
     global UNLABELLED_MODE, SKIP_ALL_MAIL
     global AI_PROVIDER, AI_BASE_URL, AI_API_KEY, AI_MODEL
     if not SETTINGS_PATH.exists():
@@ -86,6 +89,7 @@ def load_settings() -> None:
     try:
         data = json.loads(SETTINGS_PATH.read_text(encoding="utf-8"))
         SCAN_BATCH_SIZE = int(data.get("scan_batch_size", SCAN_BATCH_SIZE))
+        SCAN_CONNECTIONS = max(1, int(data.get("scan_connections", SCAN_CONNECTIONS)))
         MESSAGE_TABLE_MAX_ROWS = int(data.get("message_table_max_rows", MESSAGE_TABLE_MAX_ROWS))
         saved_dir = data.get("default_save_dir")
         if saved_dir:
@@ -3,13 +3,16 @@ from __future__ import annotations
 
 import logging
 import sqlite3
+from collections import defaultdict
 from contextlib import contextmanager
 from datetime import datetime, timezone
-from typing import Any, Generator
+from functools import lru_cache
+from typing import Any, Generator, Iterator
 
+from mailsweep.db.schema import ConnectionPool
 from mailsweep.models.account import Account, AuthType
 from mailsweep.models.folder import Folder
-from mailsweep.models.message import Message
+from mailsweep.models.message import Message, bare_email
 
 logger = logging.getLogger(__name__)
 
@@ -29,9 +32,128 @@ def _now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
-class AccountRepository:
-    def __init__(self, conn: sqlite3.Connection) -> None:
-        self._conn = conn
+def _bucket_size(n: int) -> int:
+    """Round n up to the next power of two so IN (...) lists keep a stable shape."""
+    return 1 << (n - 1).bit_length() if n > 1 else n
+
+
+def _bucketed_ids(ids: list[int]) -> list[int]:
+    """Pad ids to their bucket size by repeating the last one (IN ignores repeats)."""
+    if not ids:
+        return ids
+    return ids + [ids[-1]] * (_bucket_size(len(ids)) - len(ids))
+
+
+_ALLOWED_ORDER = frozenset({
+    "size_bytes DESC", "size_bytes ASC",
+    "date DESC", "date ASC",
+    "from_addr ASC", "from_addr DESC",
+    "to_addr ASC", "to_addr DESC",
+    "subject ASC", "subject DESC",
+})
+
+# Text columns sort case-insensitively, like the message table always has
+_NOCASE_ORDER_COLUMNS = frozenset({"from_addr", "to_addr", "subject"})
+
+
+def _order_sql(order_by: str) -> str:
+    """Return the ORDER BY term for a validated _ALLOWED_ORDER entry."""
+    column, direction = order_by.split()
+    if column in _NOCASE_ORDER_COLUMNS:
+        return f"m.{column} COLLATE NOCASE {direction}"
+    return f"m.{order_by}"
+
+
+@lru_cache(maxsize=128)
+def _query_messages_sql(
+    n_folders: int,
+    has_from: bool,
+    has_to: bool,
+    has_subject: bool,
+    has_date_from: bool,
+    has_date_to: bool,
+    has_size_min: bool,
+    has_size_max: bool,
+    has_attachment: bool | None,
+    order_by: str,
+    kind: str = "rows",
+) -> str:
+    """Build the query_messages SQL for one clause shape.
+
+    Only the shape is part of the key, so repeated searches that differ in
+    parameter values reuse the same SQL text and hit sqlite3's statement cache.
+    Placeholder order must match the params built in _message_query().
+
+    kind selects the statement built around the filter clauses:
+      "rows"     — the page of messages (LIMIT ? OFFSET ?)
+      "count"    — capped COUNT(*) of the rows (LIMIT ?), no join or ORDER BY
+      "target"   — id and size of the row with a given (folder_id, uid)
+      "position" — rows ordered before a (size, size, id) target under
+                   "size_bytes DESC", the order the message table pages in
+      "treemap"  — just the columns a treemap tile shows (LIMIT ?), no join
+    Rows tie-break on m.id so OFFSET pages and positions are stable.
+    """
+    clauses: list[str] = []
+    if n_folders:
+        clauses.append(f"m.folder_id IN ({','.join('?' * n_folders)})")
+    if has_from:
+        clauses.append("LOWER(m.from_addr) LIKE ?")
+    if has_to:
+        clauses.append("LOWER(m.to_addr) LIKE ?")
+    if has_subject:
+        clauses.append("LOWER(m.subject) LIKE ?")
+    if has_date_from:
+        clauses.append("m.date >= ?")
+    if has_date_to:
+        clauses.append("m.date <= ?")
+    if has_size_min:
+        clauses.append("m.size_bytes >= ?")
+    if has_size_max:
+        clauses.append("m.size_bytes <= ?")
+    if has_attachment is True:
+        clauses.append("m.has_attachment = 1")
+    elif has_attachment is False:
+        clauses.append("m.has_attachment = 0")
+
+    if kind == "target":
+        clauses.append("m.folder_id = ? AND m.uid = ?")
+    elif kind == "position":
+        clauses.append("(m.size_bytes > ? OR (m.size_bytes = ? AND m.id < ?))")
+    where = "WHERE " + " AND ".join(clauses) if clauses else ""
+    if kind == "count":
+        return f"SELECT COUNT(*) FROM (SELECT 1 FROM messages m {where} LIMIT ?)"
+    if kind == "target":
+        return f"SELECT m.id, m.size_bytes FROM messages m {where}"  # (folder_id, uid) is unique
+    if kind == "position":
+        return f"SELECT COUNT(*) FROM messages m {where}"
+    if kind == "treemap":
+        return (
+            f"SELECT m.uid, m.subject, m.sender_email, m.folder_id, m.size_bytes "
+            f"FROM messages m {where} ORDER BY {_order_sql(order_by)}, m.id LIMIT ?"
+        )
+    return f"""
+            SELECT m.*, f.name AS folder_name
+            FROM messages m
+            JOIN folders f ON f.id = m.folder_id
+            {where}
+            ORDER BY {_order_sql(order_by)}, m.id
+            LIMIT ? OFFSET ?
+        """
+
+
+class _BaseRepository:
+    """Accepts a raw connection or a ConnectionPool (one connection per thread)."""
+
+    def __init__(self, conn: sqlite3.Connection | ConnectionPool) -> None:
+        self._db = conn
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        db = self._db
+        return db.get() if isinstance(db, ConnectionPool) else db
+
+
+class AccountRepository(_BaseRepository):
 
     def upsert(self, account: Account) -> Account:
         with _safe_commit(self._conn):
@@ -44,7 +166,7 @@ class AccountRepository:
                     port         = excluded.port,
                     auth_type    = excluded.auth_type,
                     use_ssl      = excluded.use_ssl
-                RETURNING id
+                RETURNING *
                 """,
                 (
                     account.display_name, account.host, account.port,
@@ -52,8 +174,7 @@ class AccountRepository:
                 ),
             )
             row = cur.fetchone()
-            account.id = row["id"]
-        return account
+        return self._row_to_account(row)
 
     def get_all(self) -> list[Account]:
         rows = self._conn.execute("SELECT * FROM accounts ORDER BY display_name").fetchall()
@@ -81,32 +202,31 @@ class AccountRepository:
         )
 
 
-class FolderRepository:
-    def __init__(self, conn: sqlite3.Connection) -> None:
-        self._conn = conn
+class FolderRepository(_BaseRepository):
 
     def upsert(self, folder: Folder) -> Folder:
         with _safe_commit(self._conn):
             cur = self._conn.execute(
                 """
-                INSERT INTO folders (account_id, name, uid_validity, message_count, total_size_bytes, last_scanned_at)
-                VALUES (?, ?, ?, ?, ?, ?)
+                INSERT INTO folders (account_id, name, uid_validity, highest_modseq,
+                                     message_count, total_size_bytes, last_scanned_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
                 ON CONFLICT(account_id, name) DO UPDATE SET
                     uid_validity     = excluded.uid_validity,
+                    highest_modseq   = excluded.highest_modseq,
                     message_count    = excluded.message_count,
                     total_size_bytes = excluded.total_size_bytes,
                     last_scanned_at  = excluded.last_scanned_at
-                RETURNING id
+                RETURNING *
                 """,
                 (
-                    folder.account_id, folder.name, folder.uid_validity,
+                    folder.account_id, folder.name, folder.uid_validity, folder.highest_modseq,
                     folder.message_count, folder.total_size_bytes,
                     folder.last_scanned_at.isoformat() if folder.last_scanned_at else None,
                 ),
             )
             row = cur.fetchone()
-            folder.id = row["id"]
-        return folder
+        return self._row_to_folder(row)
 
     def get_by_account(self, account_id: int) -> list[Folder]:
         rows = self._conn.execute(
@@ -121,6 +241,16 @@ class FolderRepository:
         ).fetchone()
         return self._row_to_folder(row) if row else None
 
+    def get_by_ids(self, folder_ids: list[int]) -> list[Folder]:
+        """Return the folders with the given ids in one query (missing ids are skipped)."""
+        if not folder_ids:
+            return []
+        ids = _bucketed_ids(list(folder_ids))
+        rows = self._conn.execute(
+            f"SELECT * FROM folders WHERE id IN ({','.join('?' * len(ids))})", ids
+        ).fetchall()
+        return [self._row_to_folder(r) for r in rows]
+
     def get_by_name(self, account_id: int, name: str) -> Folder | None:
         row = self._conn.execute(
             "SELECT * FROM folders WHERE account_id = ? AND name = ?",
@@ -133,22 +263,29 @@ class FolderRepository:
         with _safe_commit(self._conn):
             self._conn.execute("DELETE FROM messages WHERE folder_id = ?", (folder_id,))
             self._conn.execute(
-                "UPDATE folders SET uid_validity=0, message_count=0, total_size_bytes=0, last_scanned_at=NULL WHERE id=?",
+                "UPDATE folders SET uid_validity=0, highest_modseq=0, last_uid=0, message_count=0, total_size_bytes=0,"
+                " last_scanned_at=NULL WHERE id=?",
                 (folder_id,),
             )
 
-    def update_stats(self, folder_id: int) -> None:
-        """Recompute message_count and total_size_bytes from messages table."""
+    def update_stats(self, folder_id: int) -> Folder | None:
+        """Recompute message_count, total_size_bytes and last_uid from messages table.
+
+        Returns the updated folder, or None if it no longer exists.
+        """
         with _safe_commit(self._conn):
-            self._conn.execute(
+            row = self._conn.execute(
                 """
                 UPDATE folders SET
                     message_count    = (SELECT COUNT(*)    FROM messages WHERE folder_id = folders.id),
-                    total_size_bytes = (SELECT COALESCE(SUM(size_bytes), 0) FROM messages WHERE folder_id = folders.id)
+                    total_size_bytes = (SELECT COALESCE(SUM(size_bytes), 0) FROM messages WHERE folder_id = folders.id),
+                    last_uid         = (SELECT COALESCE(MAX(uid), 0) FROM messages WHERE folder_id = folders.id)
                 WHERE id = ?
+                RETURNING *
                 """,
                 (folder_id,),
-            )
+            ).fetchone()
+        return self._row_to_folder(row) if row else None
 
     _ALL_MAIL_NAMES = {"[gmail]/all mail", "[google mail]/all mail"}
 
@@ -173,6 +310,8 @@ class FolderRepository:
             account_id=row["account_id"],
             name=row["name"],
             uid_validity=row["uid_validity"],
+            highest_modseq=row["highest_modseq"],
+            last_uid=row["last_uid"],
             message_count=row["message_count"],
             total_size_bytes=row["total_size_bytes"],
             last_scanned_at=(
@@ -182,26 +321,29 @@ class FolderRepository:
         )
 
 
-class MessageRepository:
-    def __init__(self, conn: sqlite3.Connection) -> None:
-        self._conn = conn
+class MessageRepository(_BaseRepository):
 
     def upsert_batch(self, messages: list[Message]) -> None:
-        """Batch upsert messages — fast path for scan worker."""
+        """Batch upsert messages — fast path for scan worker.
+
+        One executemany in one transaction per scan batch; rows are generated
+        as sqlite3 binds them rather than built into a list first.
+        """
         now = _now_iso()
         with _safe_commit(self._conn):
             self._conn.executemany(
                 """
                 INSERT INTO messages
                     (uid, folder_id, message_id, in_reply_to, thread_id,
-                     from_addr, to_addr, subject, date,
+                     from_addr, sender_email, to_addr, subject, date,
                      size_bytes, has_attachment, attachment_names, flags, cached_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 ON CONFLICT(uid, folder_id) DO UPDATE SET
                     message_id       = excluded.message_id,
                     in_reply_to      = excluded.in_reply_to,
                     thread_id        = excluded.thread_id,
                     from_addr        = excluded.from_addr,
+                    sender_email     = excluded.sender_email,
                     to_addr          = excluded.to_addr,
                     subject          = excluded.subject,
                     date             = excluded.date,
@@ -211,17 +353,17 @@ class MessageRepository:
                     flags            = excluded.flags,
                     cached_at        = excluded.cached_at
                 """,
-                [
+                (
                     (
                         m.uid, m.folder_id, m.message_id,
                         m.in_reply_to, m.thread_id,
-                        m.from_addr, m.to_addr, m.subject,
-                        m.date.isoformat() if m.date else None,
+                        m.from_addr, bare_email(m.from_addr), m.to_addr, m.subject,
+                        m.date_iso or None,
                         m.size_bytes, int(m.has_attachment),
                         m.attachment_names_json, m.flags_json, now,
                     )
                     for m in messages
-                ],
+                ),
             )
 
     def delete_uids(self, folder_id: int, uids: list[int]) -> None:
@@ -234,6 +376,17 @@ class MessageRepository:
                 [folder_id, *uids],
             )
 
+    def move_uids(self, src_folder_id: int, dst_folder_id: int, uids: list[int]) -> None:
+        """Re-point cached messages at their new folder after an IMAP move."""
+        if not uids:
+            return
+        placeholders = ",".join("?" * len(uids))
+        with _safe_commit(self._conn):
+            self._conn.execute(
+                f"UPDATE messages SET folder_id = ? WHERE folder_id = ? AND uid IN ({placeholders})",
+                [dst_folder_id, src_folder_id, *uids],
+            )
+
     def get_uids_for_folder(self, folder_id: int) -> set[int]:
         rows = self._conn.execute(
             "SELECT uid FROM messages WHERE folder_id = ?", (folder_id,)
@@ -253,72 +406,174 @@ class MessageRepository:
         has_attachment: bool | None = None,
         order_by: str = "size_bytes DESC",
         limit: int = 5000,
+        offset: int = 0,
     ) -> list[Message]:
-        clauses: list[str] = []
-        params: list[Any] = []
+        """Return matching messages as a list; see iter_messages."""
+        return list(self.iter_messages(
+            folder_ids=folder_ids,
+            from_filter=from_filter,
+            to_filter=to_filter,
+            subject_filter=subject_filter,
+            date_from=date_from,
+            date_to=date_to,
+            size_min=size_min,
+            size_max=size_max,
+            has_attachment=has_attachment,
+            order_by=order_by,
+            limit=limit,
+            offset=offset,
+        ))
+
+    def iter_messages(
+        self,
+        folder_ids: list[int] | None = None,
+        from_filter: str = "",
+        to_filter: str = "",
+        subject_filter: str = "",
+        date_from: str = "",
+        date_to: str = "",
+        size_min: int = 0,
+        size_max: int = 0,
+        has_attachment: bool | None = None,
+        order_by: str = "size_bytes DESC",
+        limit: int = 5000,
+        offset: int = 0,
+    ) -> Iterator[Message]:
+        """Yield matching messages straight off the cursor.
+
+        Rows are materialized in arraysize chunks by the sqlite3 C layer, so
+        callers that stop early (or page with islice) never hold the full
+        result set as both Row and Message objects.
+        """
+        sql, params = self._message_query(
+            folder_ids, from_filter, to_filter, subject_filter, date_from, date_to,
+            size_min, size_max, has_attachment, order_by, "rows",
+        )
+        params.append(limit)
+        params.append(offset)
+        cur = self._conn.execute(sql, params)
+        cur.arraysize = 512
+        for row in cur:
+            yield Message.from_row(dict(row))
+
+    def query_treemap_rows(
+        self,
+        folder_ids: list[int] | None = None,
+        order_by: str = "size_bytes DESC",
+        limit: int = 200,
+    ) -> list[tuple[int, str, str, int, int]]:
+        """Return (uid, subject, sender_email, folder_id, size_bytes) tuples for treemap tiles.
+
+        Same order as query_messages, but reads five columns into plain
+        tuples instead of building full Message objects.
+        """
+        sql, params = self._message_query(
+            folder_ids, "", "", "", "", "", 0, 0, None, order_by, "treemap",
+        )
+        cur = self._conn.cursor()
+        cur.row_factory = None  # plain tuples, not sqlite3.Row
+        return cur.execute(sql, [*params, limit]).fetchall()
 
+    def count_messages(
+        self,
+        folder_ids: list[int] | None = None,
+        from_filter: str = "",
+        to_filter: str = "",
+        subject_filter: str = "",
+        date_from: str = "",
+        date_to: str = "",
+        size_min: int = 0,
+        size_max: int = 0,
+        has_attachment: bool | None = None,
+        limit: int = 5000,
+    ) -> int:
+        """Return how many rows query_messages would return for these filters (at most limit)."""
+        sql, params = self._message_query(
+            folder_ids, from_filter, to_filter, subject_filter, date_from, date_to,
+            size_min, size_max, has_attachment, "size_bytes DESC", "count",
+        )
+        params.append(limit)
+        return self._conn.execute(sql, params).fetchone()[0]
+
+    def get_message_position(
+        self,
+        folder_id: int,
+        uid: int,
+        folder_ids: list[int] | None = None,
+        from_filter: str = "",
+        to_filter: str = "",
+        subject_filter: str = "",
+        date_from: str = "",
+        date_to: str = "",
+        size_min: int = 0,
+        size_max: int = 0,
+        has_attachment: bool | None = None,
+        limit: int = 5000,
+    ) -> int | None:
+        """Return the 0-based row of folder_id's uid in the default (size_bytes DESC) query_messages result.
+
+        Counts the rows ordered before it instead of fetching them.  Returns
+        None when no matching message has that (folder_id, uid) or it falls
+        past limit.
+        """
+        filters = (
+            folder_ids, from_filter, to_filter, subject_filter, date_from, date_to,
+            size_min, size_max, has_attachment, "size_bytes DESC",
+        )
+        sql, params = self._message_query(*filters, "target")
+        target = self._conn.execute(sql, [*params, folder_id, uid]).fetchone()
+        if target is None:
+            return None
+        msg_id, size = target
+        sql, params = self._message_query(*filters, "position")
+        position = self._conn.execute(sql, [*params, size, size, msg_id]).fetchone()[0]
+        return position if position < limit else None
+
+    def _message_query(
+        self,
+        folder_ids: list[int] | None,
+        from_filter: str,
+        to_filter: str,
+        subject_filter: str,
+        date_from: str,
+        date_to: str,
+        size_min: int,
+        size_max: int,
+        has_attachment: bool | None,
+        order_by: str,
+        kind: str,
+    ) -> tuple[str, list[Any]]:
+        """Return (sql, params) for a message query, minus the LIMIT/OFFSET values."""
+        params: list[Any] = []
         if folder_ids:
-            placeholders = ",".join("?" * len(folder_ids))
-            clauses.append(f"m.folder_id IN ({placeholders})")
+            folder_ids = _bucketed_ids(list(folder_ids))
             params.extend(folder_ids)
-
         if from_filter:
-            clauses.append("LOWER(m.from_addr) LIKE ?")
             params.append(f"%{from_filter.lower()}%")
-
         if to_filter:
-            clauses.append("LOWER(m.to_addr) LIKE ?")
             params.append(f"%{to_filter.lower()}%")
-
         if subject_filter:
-            clauses.append("LOWER(m.subject) LIKE ?")
             params.append(f"%{subject_filter.lower()}%")
-
         if date_from:
-            clauses.append("m.date >= ?")
             params.append(date_from)
-
         if date_to:
-            clauses.append("m.date <= ?")
             params.append(date_to)
-
         if size_min > 0:
-            clauses.append("m.size_bytes >= ?")
             params.append(size_min)
-
         if size_max > 0:
-            clauses.append("m.size_bytes <= ?")
             params.append(size_max)
 
-        if has_attachment is True:
-            clauses.append("m.has_attachment = 1")
-        elif has_attachment is False:
-            clauses.append("m.has_attachment = 0")
-
-        where = "WHERE " + " AND ".join(clauses) if clauses else ""
-
         # Validate order_by to prevent SQL injection
-        allowed_order = {
-            "size_bytes DESC", "size_bytes ASC",
-            "date DESC", "date ASC",
-            "from_addr ASC", "from_addr DESC",
-            "to_addr ASC", "to_addr DESC",
-            "subject ASC",
-        }
-        if order_by not in allowed_order:
+        if order_by not in _ALLOWED_ORDER:
             order_by = "size_bytes DESC"
 
-        sql = f"""
-            SELECT m.*, f.name AS folder_name
-            FROM messages m
-            JOIN folders f ON f.id = m.folder_id
-            {where}
-            ORDER BY m.{order_by}
-            LIMIT ?
-        """
-        params.append(limit)
-        rows = self._conn.execute(sql, params).fetchall()
-        return [Message.from_row(dict(r)) for r in rows]
+        sql = _query_messages_sql(
+            len(folder_ids) if folder_ids else 0,
+            bool(from_filter), bool(to_filter), bool(subject_filter),
+            bool(date_from), bool(date_to), size_min > 0, size_max > 0,
+            has_attachment, order_by, kind,
+        )
+        return sql, params
 
     def get_sender_summary(
         self, folder_ids: list[int] | None = None
@@ -332,6 +587,7 @@ class MessageRepository:
         clauses: list[str] = []
         params: list[Any] = []
         if folder_ids:
+            folder_ids = _bucketed_ids(list(folder_ids))
             placeholders = ",".join("?" * len(folder_ids))
             clauses.append(f"folder_id IN ({placeholders})")
             params.extend(folder_ids)
@@ -367,6 +623,7 @@ class MessageRepository:
         clauses: list[str] = []
         params: list[Any] = []
         if folder_ids:
+            folder_ids = _bucketed_ids(list(folder_ids))
             placeholders = ",".join("?" * len(folder_ids))
             clauses.append(f"folder_id IN ({placeholders})")
             params.extend(folder_ids)
@@ -403,6 +660,7 @@ class MessageRepository:
         clauses: list[str] = []
         params: list[Any] = []
         if folder_ids:
+            folder_ids = _bucketed_ids(list(folder_ids))
             placeholders = ",".join("?" * len(folder_ids))
             clauses.append(f"folder_id IN ({placeholders})")
             params.extend(folder_ids)
@@ -425,6 +683,48 @@ class MessageRepository:
         row = self._conn.execute(sql, all_params).fetchone()
         return (row[0], row[1]) if row else (0, 0)
 
+    def get_account_totals(
+        self, account_id: int, exclude_folder_id: int | None = None
+    ) -> dict[str, int]:
+        """Return raw and deduplicated totals for every folder of an account.
+
+        Keys: total_size, message_count, dedup_size, dedup_count.  Dedup keys
+        match get_dedup_total_size (message_id, else from_addr||subject||date,
+        with size), but all four figures come from one pass over the
+        account's messages.  exclude_folder_id leaves one folder out (All
+        Mail when SKIP_ALL_MAIL is set) without an IN list.
+        """
+        exclude = "AND m.folder_id != ?" if exclude_folder_id is not None else ""
+        params: list[Any] = [account_id]
+        if exclude_folder_id is not None:
+            params.append(exclude_folder_id)
+        sql = f"""
+            SELECT COALESCE(SUM(size_bytes * n), 0),
+                   COALESCE(SUM(n), 0),
+                   COALESCE(SUM(size_bytes), 0),
+                   COUNT(*)
+            FROM (
+                SELECT CASE WHEN m.message_id != '' THEN 'm' || m.message_id
+                            ELSE 'i' || (m.from_addr || m.subject || m.date)
+                       END AS dedup_key,
+                       m.size_bytes,
+                       COUNT(*) AS n
+                FROM messages m
+                JOIN folders f ON f.id = m.folder_id
+                WHERE f.account_id = ? {exclude}
+                GROUP BY dedup_key, m.size_bytes
+            )
+        """
+        total_size, message_count, dedup_size, dedup_count = (
+            self._conn.execute(sql, params).fetchone()
+        )
+        return {
+            "total_size": total_size,
+            "message_count": message_count,
+            "dedup_size": dedup_size,
+            "dedup_count": dedup_count,
+        }
+
     # ── Unlabelled (archived-only) queries ─────────────────────────────────
 
     def _unlabelled_not_exists(self, other_folder_ids: list[int]) -> tuple[str, list[Any]]:
@@ -433,6 +733,7 @@ class MessageRepository:
         Uses message_id for matching when available (reliable, globally unique).
         Falls back to identity tuple for messages without message_id.
         """
+        other_folder_ids = _bucketed_ids(list(other_folder_ids))
         placeholders = ",".join("?" * len(other_folder_ids))
         fragment = (
             "("
@@ -465,6 +766,7 @@ class MessageRepository:
         - itself (same message_id)
         Falls back to identity-tuple for messages without message_id.
         """
+        other_folder_ids = _bucketed_ids(list(other_folder_ids))
         placeholders = ",".join("?" * len(other_folder_ids))
         ids = list(other_folder_ids)
         fragment = (
@@ -500,6 +802,7 @@ class MessageRepository:
         thread_id exists in a labelled folder.
         Messages with thread_id == 0: fall back to message_id / identity-tuple.
         """
+        other_folder_ids = _bucketed_ids(list(other_folder_ids))
         placeholders = ",".join("?" * len(other_folder_ids))
         ids = list(other_folder_ids)
         # Build the fallback (no_thread) fragment for thread_id=0 messages
@@ -555,6 +858,69 @@ class MessageRepository:
         row = self._conn.execute(sql, [all_mail_folder_id, *ne_params]).fetchone()
         return (row[0], row[1]) if row else (0, 0)
 
+    def get_unlabelled_sender_summary(
+        self,
+        all_mail_folder_id: int,
+        other_folder_ids: list[int],
+        mode: str = "no_thread",
+        limit: int = 200,
+    ) -> list[dict[str, Any]]:
+        """Return per-sender aggregation of unlabelled messages.
+
+        Same row shape as get_sender_summary (sender_email, message_count,
+        total_size_bytes), grouped in SQLite rather than over fetched rows.
+        """
+        return self._unlabelled_address_summary(
+            "from_addr", "sender_email", all_mail_folder_id, other_folder_ids, mode, limit,
+        )
+
+    def get_unlabelled_receiver_summary(
+        self,
+        all_mail_folder_id: int,
+        other_folder_ids: list[int],
+        mode: str = "no_thread",
+        limit: int = 200,
+    ) -> list[dict[str, Any]]:
+        """Return per-receiver aggregation of unlabelled messages (see get_receiver_summary)."""
+        return self._unlabelled_address_summary(
+            "to_addr", "receiver_email", all_mail_folder_id, other_folder_ids, mode, limit,
+        )
+
+    def _unlabelled_address_summary(
+        self,
+        column: str,
+        alias: str,
+        all_mail_folder_id: int,
+        other_folder_ids: list[int],
+        mode: str,
+        limit: int,
+    ) -> list[dict[str, Any]]:
+        clauses: list[str] = ["m.folder_id = ?"]
+        params: list[Any] = [all_mail_folder_id]
+        if other_folder_ids:
+            not_exists, ne_params = self._get_unlabelled_not_exists(other_folder_ids, mode)
+            clauses.append(not_exists)
+            params.extend(ne_params)
+        sql = f"""
+            SELECT
+                CASE WHEN INSTR(m.{column}, '<') > 0
+                     THEN LOWER(SUBSTR(m.{column},
+                                       INSTR(m.{column}, '<') + 1,
+                                       INSTR(m.{column}, '>') - INSTR(m.{column}, '<') - 1))
+                     ELSE LOWER(m.{column})
+                END AS {alias},
+                COUNT(*)          AS message_count,
+                SUM(m.size_bytes) AS total_size_bytes
+            FROM messages m
+            WHERE {" AND ".join(clauses)}
+            GROUP BY {alias}
+            ORDER BY total_size_bytes DESC
+            LIMIT ?
+        """
+        params.append(limit)
+        rows = self._conn.execute(sql, params).fetchall()
+        return [dict(r) for r in rows]
+
     def query_unlabelled_messages(
         self,
         all_mail_folder_id: int,
@@ -611,14 +977,7 @@ class MessageRepository:
 
         where = "WHERE " + " AND ".join(clauses)
 
-        allowed_order = {
-            "size_bytes DESC", "size_bytes ASC",
-            "date DESC", "date ASC",
-            "from_addr ASC", "from_addr DESC",
-            "to_addr ASC", "to_addr DESC",
-            "subject ASC",
-        }
-        if order_by not in allowed_order:
+        if order_by not in _ALLOWED_ORDER:
             order_by = "size_bytes DESC"
 
         sql = f"""
@@ -626,7 +985,7 @@ class MessageRepository:
             FROM messages m
             JOIN folders f ON f.id = m.folder_id
             {where}
-            ORDER BY m.{order_by}
+            ORDER BY {_order_sql(order_by)}
             LIMIT ?
         """
         params.append(limit)
@@ -726,6 +1085,7 @@ class MessageRepository:
         skip_clause = ""
         skip_params: list[int] = []
         if skip_folder_ids:
+            skip_folder_ids = _bucketed_ids(list(skip_folder_ids))
             placeholders = ",".join("?" * len(skip_folder_ids))
             skip_clause = f"AND f.id NOT IN ({placeholders})"
             skip_params = list(skip_folder_ids)
@@ -815,6 +1175,7 @@ class MessageRepository:
         skip_clause = ""
         params: list[Any] = [account_id]
         if skip_folder_ids:
+            skip_folder_ids = _bucketed_ids(list(skip_folder_ids))
             placeholders = ",".join("?" * len(skip_folder_ids))
             skip_clause = f"AND f.id NOT IN ({placeholders})"
             params.extend(skip_folder_ids)
@@ -873,7 +1234,8 @@ class MessageRepository:
         rows = self._conn.execute(sql, params).fetchall()
 
         messages: list[Message] = []
-        group_sizes: dict[str, list[int]] = {}
+        group_totals: defaultdict[str, int] = defaultdict(int)
+        group_mins: dict[str, int] = {}
         for r in rows:
             row_dict = dict(r)
             folder_cnt = row_dict.pop("folder_cnt")
@@ -881,13 +1243,14 @@ class MessageRepository:
             msg = Message.from_row(row_dict)
             msg.tag = f"{folder_cnt} labels"
             messages.append(msg)
-            group_sizes.setdefault(grp_key, []).append(msg.size_bytes)
+            size = msg.size_bytes
+            group_totals[grp_key] += size
+            if size < group_mins.get(grp_key, size + 1):
+                group_mins[grp_key] = size
 
-        group_count = len(group_sizes)
+        group_count = len(group_totals)
         # Duplicate bytes = total of all copies minus one (the smallest) per group
-        total_duplicate_bytes = 0
-        for sizes in group_sizes.values():
-            total_duplicate_bytes += sum(sizes) - min(sizes)
+        total_duplicate_bytes = sum(group_totals.values()) - sum(group_mins.values())
 
         return messages, group_count, total_duplicate_bytes
 
@@ -924,7 +1287,7 @@ class MessageRepository:
                 (
                     msg.from_addr,
                     msg.subject,
-                    msg.date.isoformat() if msg.date else None,
+                    msg.date_iso or None,
                     msg.size_bytes,
                 ),
             ).fetchall()
@@ -976,7 +1339,7 @@ class MessageRepository:
                 (
                     msg.from_addr,
                     msg.subject,
-                    msg.date.isoformat() if msg.date else None,
+                    msg.date_iso or None,
                     msg.size_bytes,
                 ),
             ).fetchall()
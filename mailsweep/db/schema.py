@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import sqlite3
+import threading
 from pathlib import Path
 
 SCHEMA_SQL = """
@@ -21,6 +22,8 @@ CREATE TABLE IF NOT EXISTS folders (
     account_id      INTEGER NOT NULL REFERENCES accounts(id) ON DELETE CASCADE,
     name            TEXT    NOT NULL,
     uid_validity    INTEGER NOT NULL DEFAULT 0,
+    highest_modseq  INTEGER NOT NULL DEFAULT 0,
+    last_uid        INTEGER NOT NULL DEFAULT 0,
     message_count   INTEGER NOT NULL DEFAULT 0,
     total_size_bytes INTEGER NOT NULL DEFAULT 0,
     last_scanned_at TEXT,
@@ -35,6 +38,7 @@ CREATE TABLE IF NOT EXISTS messages (
     in_reply_to      TEXT    NOT NULL DEFAULT '',
     thread_id        INTEGER NOT NULL DEFAULT 0,
     from_addr        TEXT,
+    sender_email     TEXT    NOT NULL DEFAULT '',
     to_addr          TEXT,
     subject          TEXT,
     date             TEXT,
@@ -49,7 +53,7 @@ CREATE TABLE IF NOT EXISTS messages (
 CREATE INDEX IF NOT EXISTS idx_messages_size       ON messages(size_bytes DESC);
 CREATE INDEX IF NOT EXISTS idx_messages_from       ON messages(from_addr);
 CREATE INDEX IF NOT EXISTS idx_messages_date       ON messages(date);
-CREATE INDEX IF NOT EXISTS idx_messages_attachment ON messages(has_attachment) WHERE has_attachment=1;
+CREATE INDEX IF NOT EXISTS idx_messages_folder_attach ON messages(folder_id, size_bytes DESC) WHERE has_attachment=1;
 CREATE INDEX IF NOT EXISTS idx_messages_folder     ON messages(folder_id);
 CREATE INDEX IF NOT EXISTS idx_messages_msgid      ON messages(message_id);
 CREATE INDEX IF NOT EXISTS idx_messages_in_reply_to ON messages(in_reply_to);
@@ -59,21 +63,54 @@ CREATE INDEX IF NOT EXISTS idx_messages_identity   ON messages(from_addr, subjec
 
 
 def _migrate(conn: sqlite3.Connection) -> None:
-    """Add columns that may be missing in older databases."""
+    """Add columns that may be missing in older databases and drop retired indexes."""
     cur = conn.execute("PRAGMA table_info(messages)")
     existing = {row[1] for row in cur.fetchall()}
     if "in_reply_to" not in existing:
         conn.execute("ALTER TABLE messages ADD COLUMN in_reply_to TEXT NOT NULL DEFAULT ''")
     if "thread_id" not in existing:
         conn.execute("ALTER TABLE messages ADD COLUMN thread_id INTEGER NOT NULL DEFAULT 0")
+    if "sender_email" not in existing:
+        conn.execute("ALTER TABLE messages ADD COLUMN sender_email TEXT NOT NULL DEFAULT ''")
+        # Backfill with the same extraction get_sender_summary uses
+        conn.execute("""
+            UPDATE messages SET sender_email = COALESCE(
+                CASE WHEN INSTR(from_addr, '<') > 0
+                     THEN LOWER(SUBSTR(from_addr,
+                                       INSTR(from_addr, '<') + 1,
+                                       INSTR(from_addr, '>') - INSTR(from_addr, '<') - 1))
+                     ELSE LOWER(from_addr)
+                END, '')
+        """)
+    conn.execute("DROP INDEX IF EXISTS idx_messages_attachment")
+    folder_cols = {row[1] for row in conn.execute("PRAGMA table_info(folders)").fetchall()}
+    if "highest_modseq" not in folder_cols:
+        conn.execute("ALTER TABLE folders ADD COLUMN highest_modseq INTEGER NOT NULL DEFAULT 0")
+    if "last_uid" not in folder_cols:
+        conn.execute("ALTER TABLE folders ADD COLUMN last_uid INTEGER NOT NULL DEFAULT 0")
+        conn.execute(
+            "UPDATE folders SET last_uid ="
+            " (SELECT COALESCE(MAX(uid), 0) FROM messages WHERE folder_id = folders.id)"
+        )
+
+
+def _make_conn(path: str | Path) -> sqlite3.Connection:
+    """Open a connection with the per-connection pragmas every caller needs."""
+    conn = sqlite3.connect(str(path), check_same_thread=False, cached_statements=256)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.execute("PRAGMA busy_timeout=5000")
+    # WAL stays consistent with NORMAL sync (only the last commits can be
+    # lost on power failure), and fsyncs only at checkpoints
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
 
 
 def init_db(path: str | Path = ":memory:") -> sqlite3.Connection:
     """Create (or open) the SQLite database, apply schema, return connection."""
-    conn = sqlite3.connect(str(path), check_same_thread=False)
-    conn.row_factory = sqlite3.Row
+    conn = _make_conn(path)
     conn.execute("PRAGMA journal_mode=WAL")
-    conn.execute("PRAGMA foreign_keys=ON")
     # Migrate existing tables before applying full schema
     try:
         conn.execute("SELECT 1 FROM messages LIMIT 0")
@@ -83,3 +120,46 @@ def init_db(path: str | Path = ":memory:") -> sqlite3.Connection:
     conn.executescript(SCHEMA_SQL)
     conn.commit()
     return conn
+
+
+class ConnectionPool:
+    """One SQLite connection per thread, all opened on the same database file.
+
+    WAL mode lets the UI thread keep reading while a worker thread writes,
+    and lock waits are handled by SQLite's busy_timeout instead of every
+    thread serializing on a single shared connection.  Worker connections
+    are closed when their thread exits and drops the thread-local reference.
+
+    An in-memory database is private to its connection, so ":memory:" pools
+    hand the same connection to every thread.
+    """
+
+    def __init__(self, path: str | Path = ":memory:") -> None:
+        self._path = path
+        self._local = threading.local()
+        self._shared: sqlite3.Connection | None = None
+        conn = init_db(path)
+        if str(path) == ":memory:":
+            self._shared = conn
+        else:
+            self._local.conn = conn
+
+    def get(self) -> sqlite3.Connection:
+        """Return the calling thread's connection, opening it on first use."""
+        if self._shared is not None:
+            return self._shared
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = _make_conn(self._path)
+            self._local.conn = conn
+        return conn
+
+    def close(self) -> None:
+        """Close the calling thread's connection (the shared one for :memory:)."""
+        if self._shared is not None:
+            self._shared.close()
+            return
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
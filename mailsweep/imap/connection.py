@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import logging
+from functools import lru_cache
 from typing import TYPE_CHECKING
 
 from imapclient import IMAPClient
@@ -62,6 +63,12 @@ def _auth_password(client: IMAPClient, account: Account) -> None:
     logger.info("Authenticated %s@%s via password", account.username, account.host)
 
 
+@lru_cache(maxsize=32)
+def _xoauth2_bytes(username: str, access_token: str) -> bytes:
+    """Build the SASL XOAUTH2 initial response once per (user, token) pair."""
+    return f"user={username}\x01auth=Bearer {access_token}\x01\x01".encode()
+
+
 def _auth_oauth2_gmail(client: IMAPClient, account: Account) -> None:
     from mailsweep.imap.oauth2 import get_gmail_access_token
 
@@ -71,8 +78,8 @@ def _auth_oauth2_gmail(client: IMAPClient, account: Account) -> None:
             f"No Gmail OAuth2 token for {account.username}. "
             "Please re-authorize via Account Settings."
         )
-    auth_string = f"user={account.username}\x01auth=Bearer {access_token}\x01\x01"
-    client.authenticate("XOAUTH2", lambda x: auth_string)
+    auth_bytes = _xoauth2_bytes(account.username, access_token)
+    client.authenticate("XOAUTH2", lambda _: auth_bytes)
     logger.info("Authenticated %s via Gmail XOAUTH2", account.username)
 
 
@@ -85,8 +92,8 @@ def _auth_oauth2_outlook(client: IMAPClient, account: Account) -> None:
             f"No Outlook OAuth2 token for {account.username}. "
             "Please re-authorize via Account Settings."
         )
-    auth_string = f"user={account.username}\x01auth=Bearer {access_token}\x01\x01"
-    client.authenticate("XOAUTH2", lambda x: auth_string)
+    auth_bytes = _xoauth2_bytes(account.username, access_token)
+    client.authenticate("XOAUTH2", lambda _: auth_bytes)
     logger.info("Authenticated %s via Outlook XOAUTH2", account.username)
 
 
@@ -11,6 +11,8 @@ class Folder:
     account_id: int = 0
     name: str = ""
     uid_validity: int = 0
+    highest_modseq: int = 0  # CONDSTORE HIGHESTMODSEQ at the last scan (0 = unknown)
+    last_uid: int = 0  # highest cached UID, maintained by update_stats()
     message_count: int = 0
     total_size_bytes: int = 0
     last_scanned_at: datetime | None = None
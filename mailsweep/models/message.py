@@ -4,6 +4,49 @@ from __future__ import annotations
 import json
 from dataclasses import dataclass, field
 from datetime import datetime
+from typing import Any
+
+
+class _LazyIsoDate:
+    """Dataclass field descriptor for a datetime that may arrive as ISO-8601 text.
+
+    Rows from SQLite keep the raw string; it is only parsed the first time the
+    attribute is read, so rows that are merely displayed never pay for parsing.
+    """
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self._slot = f"_{name}_raw"
+
+    def __get__(self, obj: Any, objtype: type | None = None) -> datetime | None:
+        if obj is None:
+            return None  # dataclass default
+        raw = obj.__dict__.get(self._slot)
+        if isinstance(raw, str):
+            raw = datetime.fromisoformat(raw) if raw else None
+            obj.__dict__[self._slot] = raw
+        return raw
+
+    def __set__(self, obj: Any, value: datetime | str | None) -> None:
+        obj.__dict__[self._slot] = value
+
+    def iso(self, obj: Any) -> str:
+        """Return the value as ISO-8601 text without forcing a parse."""
+        raw = obj.__dict__.get(self._slot)
+        if isinstance(raw, str):
+            return raw
+        return raw.isoformat() if raw else ""
+
+
+def bare_email(addr: str) -> str:
+    """Return the lowercased address inside "Name <email>", or addr lowercased.
+
+    Matches the CASE/INSTR extraction the sender summaries run in SQL.
+    """
+    start = addr.find("<")
+    if start < 0:
+        return addr.lower()
+    end = addr.find(">", start)
+    return addr[start + 1:end if end > start else None].lower()
 
 
 @dataclass
@@ -17,17 +60,23 @@ class Message:
     from_addr: str = ""
     to_addr: str = ""
     subject: str = ""
-    date: datetime | None = None
+    date: datetime | None = _LazyIsoDate()  # type: ignore[assignment]
     size_bytes: int = 0
     has_attachment: bool = False
     attachment_names: list[str] = field(default_factory=list)
     flags: list[str] = field(default_factory=list)
-    cached_at: datetime | None = None
+    cached_at: datetime | None = _LazyIsoDate()  # type: ignore[assignment]
+    sender_email: str = ""  # bare_email(from_addr), stored at ingest
 
     # Transient fields for display — populated by joins / special queries
     folder_name: str = ""
     tag: str = ""
 
+    @property
+    def date_iso(self) -> str:
+        """ISO-8601 date text as stored in the DB ("" if unknown)."""
+        return type(self).__dict__["date"].iso(self)
+
     @property
     def attachment_names_json(self) -> str:
         return json.dumps(self.attachment_names)
@@ -48,11 +97,12 @@ class Message:
             from_addr=row["from_addr"] or "",
             to_addr=row.get("to_addr") or "",
             subject=row["subject"] or "",
-            date=datetime.fromisoformat(row["date"]) if row.get("date") else None,
+            date=row.get("date") or None,
             size_bytes=row["size_bytes"] or 0,
             has_attachment=bool(row["has_attachment"]),
             attachment_names=json.loads(row["attachment_names"] or "[]"),
             flags=json.loads(row["flags"] or "[]"),
-            cached_at=datetime.fromisoformat(row["cached_at"]) if row.get("cached_at") else None,
+            cached_at=row.get("cached_at") or None,
+            sender_email=row.get("sender_email") or "",
             folder_name=row.get("folder_name", ""),
         )
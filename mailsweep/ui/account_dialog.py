@@ -3,7 +3,8 @@ from __future__ import annotations
 
 import logging
 
-from PyQt6.QtCore import QObject, QThread, pyqtSignal
+from PyQt6.QtCore import QObject, Qt, QThread, QTimer, QUrl, pyqtSignal, pyqtSlot
+from PyQt6.QtGui import QDesktopServices
 from PyQt6.QtWidgets import (
     QCheckBox,
     QComboBox,
@@ -14,68 +15,82 @@ from PyQt6.QtWidgets import (
     QLabel,
     QLineEdit,
     QMessageBox,
-    QProgressDialog,
     QPushButton,
     QSpinBox,
     QVBoxLayout,
     QWidget,
 )
 
+from mailsweep.imap import oauth2
 from mailsweep.models.account import Account, AuthType
-from mailsweep.utils.keyring_store import set_password
+from mailsweep.utils.keyring_store import get_token, set_password
 
 logger = logging.getLogger(__name__)
 
+# Combobox data round-trips the enum members themselves, so the auth type
+# handler can compare by identity.
+_PW = AuthType.PASSWORD
+_GM = AuthType.OAUTH2_GMAIL
+_OL = AuthType.OAUTH2_OUTLOOK
+
+_AUTH_CHOICES = (
+    ("Password / App Password", _PW),
+    ("Gmail OAuth2", _GM),
+    ("Outlook OAuth2", _OL),
+)
+
 _GMAIL_HELP = """\
-<b>Gmail OAuth2 requires your own Google Cloud credentials.</b><br><br>
-<b>Simpler alternative:</b> Use <b>Auth Type: Password</b> with a
-<a href="https://myaccount.google.com/apppasswords">Gmail App Password</a>
-(requires 2-Step Verification enabled). This works without any setup.<br><br>
-<b>To use OAuth2:</b><br>
-1. Go to <a href="https://console.cloud.google.com/">Google Cloud Console</a><br>
-2. Create a project → APIs &amp; Services → Credentials<br>
-3. Create an <i>OAuth 2.0 Client ID</i> (Desktop app type)<br>
+Gmail OAuth2 requires your own Google Cloud credentials.
+
+Simpler alternative: use Auth Type "Password / App Password" with a Gmail \
+App Password (requires 2-Step Verification). This works without any setup.
+
+To use OAuth2:
+1. Open the Google Cloud Console
+2. Create a project → APIs & Services → Credentials
+3. Create an OAuth 2.0 Client ID (Desktop app type)
 4. Copy the Client ID and Client Secret below."""
 
 _GMAIL_APP_PASSWORD_HELP = """\
-<b>Gmail requires an App Password</b> (not your normal Google password).<br><br>
-1. Enable <a href="https://myaccount.google.com/signinoptions/two-step-verification">2-Step Verification</a>
-   on your Google account<br>
-2. Go to <a href="https://myaccount.google.com/apppasswords">App Passwords</a><br>
+Gmail requires an App Password (not your normal Google password).
+
+1. Enable 2-Step Verification on your Google account
+2. Open App Passwords
 3. Create one for "Mail" and paste the 16-character password above."""
 
 _OUTLOOK_HELP = """\
-<b>Outlook OAuth2 requires an Azure App Registration.</b><br><br>
-1. Go to <a href="https://portal.azure.com/">Azure Portal</a> →
-   Azure Active Directory → App registrations<br>
-2. New registration → choose <i>Accounts in any organizational directory
-   and personal Microsoft accounts</i><br>
-3. Add a Mobile/Desktop redirect URI: <code>https://login.microsoftonline.com/common/oauth2/nativeclient</code><br>
+Outlook OAuth2 requires an Azure App Registration.
+
+1. Open the Azure Portal → Azure Active Directory → App registrations
+2. New registration → choose "Accounts in any organizational directory \
+and personal Microsoft accounts"
+3. Add a Mobile/Desktop redirect URI:
+    https://login.microsoftonline.com/common/oauth2/nativeclient
 4. Copy the Application (client) ID below."""
 
+_APP_PASSWORDS_URL = "https://myaccount.google.com/apppasswords"
+_TWO_STEP_URL = "https://myaccount.google.com/signinoptions/two-step-verification"
+_CLOUD_CONSOLE_URL = "https://console.cloud.google.com/"
+_AZURE_PORTAL_URL = "https://portal.azure.com/"
+
 
 class _OAuthWorker(QObject):
-    """Runs the blocking OAuth browser flow on a background thread."""
+    """Runs the blocking OAuth browser flow on a background thread.
+
+    One worker lives on the dialog's OAuth thread and serves every Authorize
+    click; each request arrives as a queued call to start().
+    """
     success = pyqtSignal(str)   # access_token
     failure = pyqtSignal(str)   # error message
-    finished = pyqtSignal()
-
-    def __init__(self, auth_type: AuthType, username: str,
-                 client_id: str, client_secret: str = "") -> None:
-        super().__init__()
-        self._auth_type = auth_type
-        self._username = username
-        self._client_id = client_id
-        self._client_secret = client_secret
 
-    def run(self) -> None:
+    @pyqtSlot(object, str, str, str)
+    def start(self, auth_type: AuthType, username: str,
+              client_id: str, client_secret: str) -> None:
         try:
-            if self._auth_type == AuthType.OAUTH2_GMAIL:
-                from mailsweep.imap.oauth2 import authorize_gmail
-                token = authorize_gmail(self._username, self._client_id, self._client_secret)
+            if auth_type == AuthType.OAUTH2_GMAIL:
+                token = oauth2.authorize_gmail(username, client_id, client_secret)
             else:
-                from mailsweep.imap.oauth2 import authorize_outlook
-                token = authorize_outlook(self._username, self._client_id)
+                token = oauth2.authorize_outlook(username, client_id)
 
             if token:
                 self.success.emit(token)
@@ -84,29 +99,80 @@ class _OAuthWorker(QObject):
         except Exception as exc:
             logger.exception("OAuth worker error")
             self.failure.emit(str(exc))
-        finally:
-            self.finished.emit()
 
 
 class AccountDialog(QDialog):
     """Dialog for adding or editing an IMAP account."""
 
+    # Help topics shared by every dialog instance, keyed by _help_key:
+    # (plain text, [(link button title, url), ...])
+    _HELP_TOPICS = {
+        "gmail": (_GMAIL_HELP, [
+            ("Google Cloud Console", _CLOUD_CONSOLE_URL),
+            ("App Passwords", _APP_PASSWORDS_URL),
+        ]),
+        "outlook": (_OUTLOOK_HELP, [
+            ("Azure Portal", _AZURE_PORTAL_URL),
+        ]),
+        "app_password": (_GMAIL_APP_PASSWORD_HELP, [
+            ("2-Step Verification", _TWO_STEP_URL),
+            ("App Passwords", _APP_PASSWORDS_URL),
+        ]),
+    }
+
+    # auth_type, username, client_id, client_secret — queued to _OAuthWorker.start
+    _oauth_requested = pyqtSignal(object, str, str, str)
+
     def __init__(
         self, parent: QWidget | None = None, account: Account | None = None
     ) -> None:
         super().__init__(parent)
         self._account = account
         self._oauth_thread: QThread | None = None
-        self._oauth_progress: QProgressDialog | None = None
+        self._oauth_worker: _OAuthWorker | None = None
+        self._oauth_busy = False
         self.setWindowTitle("Edit Account" if account else "Add Account")
         self.setMinimumWidth(460)
+        # Widgets are built on first show (or first get_account()), not here
+        self._ui_built = False
+        self._oauth_built = False  # OAuth2 rows are only built once an OAuth type is picked
+        self._help_key: str | None = None  # topic currently shown in _help_box
+        self._help_widgets: dict[str, QWidget] = {}  # built per topic on first use
+        # Coalesces the resizes requested by rapid auth type / host changes
+        self._resize_timer = QTimer(self)
+        self._resize_timer.setSingleShot(True)
+        self._resize_timer.setInterval(0)
+        self._resize_timer.timeout.connect(self.adjustSize)
+
+    def setVisible(self, visible: bool) -> None:
+        # show(), open() and exec() all funnel through setVisible, and building
+        # here (before QDialog sizes itself) keeps the initial geometry right.
+        if visible:
+            self._ensure_ui()
+        super().setVisible(visible)
+
+    def _ensure_ui(self) -> None:
+        if self._ui_built:
+            return
+        self._ui_built = True
         self._build_ui()
-        if account:
-            self._populate(account)
+        if self._account:
+            self._populate(self._account)
 
     def _build_ui(self) -> None:
+        # Coalesce the per-row geometry updates into one pass at the end
+        self.setUpdatesEnabled(False)
+        try:
+            self._build_form()
+        finally:
+            self.setUpdatesEnabled(True)
+
+    def _build_form(self) -> None:
         layout = QVBoxLayout(self)
-        form = QFormLayout()
+        form = self._form = QFormLayout()
+        # Fix the policies up front rather than letting Qt derive them from the style
+        form.setRowWrapPolicy(QFormLayout.RowWrapPolicy.DontWrapRows)
+        form.setFieldGrowthPolicy(QFormLayout.FieldGrowthPolicy.AllNonFixedFieldsGrow)
 
         self._display_name = QLineEdit()
         self._display_name.setPlaceholderText("Work Gmail")
@@ -126,56 +192,34 @@ class AccountDialog(QDialog):
         self._username.setPlaceholderText("user@example.com")
         form.addRow("Username:", self._username)
 
+        # These widgets only emit on the GUI thread, so connect directly and
+        # skip the per-emit thread-affinity check of AutoConnection.
         self._auth_type = QComboBox()
-        self._auth_type.addItem("Password / App Password", AuthType.PASSWORD)
-        self._auth_type.addItem("Gmail OAuth2", AuthType.OAUTH2_GMAIL)
-        self._auth_type.addItem("Outlook OAuth2", AuthType.OAUTH2_OUTLOOK)
-        self._auth_type.currentIndexChanged.connect(self._on_auth_type_changed)
+        # One batched insert for the labels, then attach each row's AuthType
+        self._auth_type.addItems([label for label, _ in _AUTH_CHOICES])
+        self._auth_index = {}  # AuthType -> combobox row, so _populate needn't findData()
+        for idx, (_, auth_type) in enumerate(_AUTH_CHOICES):
+            self._auth_type.setItemData(idx, auth_type)
+            self._auth_index[auth_type] = idx
+        self._auth_type.currentIndexChanged.connect(
+            self._on_auth_type_changed, Qt.ConnectionType.DirectConnection
+        )
         form.addRow("Auth Type:", self._auth_type)
 
         # Password row
-        self._password_label = QLabel("Password:")
         self._password = QLineEdit()
         self._password.setEchoMode(QLineEdit.EchoMode.Password)
         self._password.setPlaceholderText("password or App Password")
-        form.addRow(self._password_label, self._password)
-
-        # Help label (hidden by default, shown for OAuth2)
-        self._help_label = QLabel()
-        self._help_label.setWordWrap(True)
-        self._help_label.setOpenExternalLinks(True)
-        self._help_label.setVisible(False)
-        self._help_label.setMaximumWidth(420)
-        form.addRow("", self._help_label)
-
-        # OAuth2 credential fields (hidden by default)
-        self._client_id_label = QLabel("Client ID:")
-        self._client_id_edit = QLineEdit()
-        self._client_id_edit.setPlaceholderText("paste from Google/Azure console")
-        self._client_id_label.setVisible(False)
-        self._client_id_edit.setVisible(False)
-        form.addRow(self._client_id_label, self._client_id_edit)
+        form.addRow("Password:", self._password)
 
-        self._client_secret_label = QLabel("Client Secret:")
-        self._client_secret_edit = QLineEdit()
-        self._client_secret_edit.setEchoMode(QLineEdit.EchoMode.Password)
-        self._client_secret_edit.setPlaceholderText("Gmail only — leave blank for Outlook")
-        self._client_secret_label.setVisible(False)
-        self._client_secret_edit.setVisible(False)
-        form.addRow(self._client_secret_label, self._client_secret_edit)
+        # Help row (hidden by default, shown for OAuth2 and Gmail app passwords)
+        self._help_box = QWidget()
+        self._help_layout = QVBoxLayout(self._help_box)
+        self._help_layout.setContentsMargins(0, 0, 0, 0)
+        form.addRow("", self._help_box)
+        form.setRowVisible(self._help_box, False)
 
-        # Authorize button row
-        self._authorize_label = QLabel("OAuth2:")
-        auth_row = QHBoxLayout()
-        self._authorize_btn = QPushButton("Authorize in Browser…")
-        self._authorize_btn.clicked.connect(self._on_authorize)
-        self._authorize_status = QLabel()
-        auth_row.addWidget(self._authorize_btn)
-        auth_row.addWidget(self._authorize_status)
-        self._authorize_label.setVisible(False)
-        self._authorize_btn.setVisible(False)
-        self._authorize_status.setVisible(False)
-        form.addRow(self._authorize_label, auth_row)
+        # OAuth2 credential rows are inserted here by _ensure_oauth_widgets()
 
         self._use_ssl = QCheckBox("Use SSL/TLS")
         self._use_ssl.setChecked(True)
@@ -186,16 +230,88 @@ class AccountDialog(QDialog):
         buttons = QDialogButtonBox(
             QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel
         )
-        buttons.accepted.connect(self._on_accept)
-        buttons.rejected.connect(self.reject)
+        buttons.accepted.connect(self._on_accept, Qt.ConnectionType.DirectConnection)
+        buttons.rejected.connect(self.reject, Qt.ConnectionType.DirectConnection)
         layout.addWidget(buttons)
 
+    def _ensure_oauth_widgets(self) -> None:
+        """Build the OAuth2 credential rows the first time an OAuth type is picked.
+
+        Password accounts (the common edit case) never construct them.
+        """
+        if self._oauth_built:
+            return
+        self._oauth_built = True
+        form = self._form
+        # The OAuth2 rows sit just above the SSL checkbox
+        row, _ = form.getWidgetPosition(self._use_ssl)
+
+        self._client_id_edit = QLineEdit()
+        self._client_id_edit.setPlaceholderText("paste from Google/Azure console")
+        form.insertRow(row, "Client ID:", self._client_id_edit)
+
+        self._client_secret_edit = QLineEdit()
+        self._client_secret_edit.setEchoMode(QLineEdit.EchoMode.Password)
+        self._client_secret_edit.setPlaceholderText("Gmail only — leave blank for Outlook")
+        form.insertRow(row + 1, "Client Secret:", self._client_secret_edit)
+
+        # Authorize button row
+        self._authorize_row = QHBoxLayout()
+        self._authorize_btn = QPushButton("Authorize in Browser…")
+        self._authorize_btn.clicked.connect(
+            self._on_authorize, Qt.ConnectionType.DirectConnection
+        )
+        self._authorize_status = QLabel()
+        self._authorize_row.addWidget(self._authorize_btn)
+        self._authorize_row.addWidget(self._authorize_status)
+        form.insertRow(row + 2, "OAuth2:", self._authorize_row)
+
+        # Animates _authorize_status while the browser flow is pending
+        self._spinner_step = 0
+        self._spinner_timer = QTimer(self)
+        self._spinner_timer.setInterval(500)
+        self._spinner_timer.timeout.connect(self._tick_spinner)
+
+    def _help_widget(self, key: str) -> QWidget:
+        """Return the help text and link buttons for *key*, building them once."""
+        widget = self._help_widgets.get(key)
+        if widget is not None:
+            return widget
+        text, links = self._HELP_TOPICS[key]
+        widget = QWidget()
+        vbox = QVBoxLayout(widget)
+        vbox.setContentsMargins(0, 0, 0, 0)
+
+        # Plain text keeps QLabel off the rich-text (QTextDocument) path
+        label = QLabel(text)
+        label.setTextFormat(Qt.TextFormat.PlainText)
+        label.setWordWrap(True)
+        label.setMaximumWidth(420)
+        label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+        vbox.addWidget(label)
+
+        link_row = QHBoxLayout()
+        for title, url in links:
+            btn = QPushButton(title)
+            btn.setFlat(True)
+            btn.setCursor(Qt.CursorShape.PointingHandCursor)
+            btn.setToolTip(url)
+            btn.clicked.connect(lambda _checked=False, u=QUrl(url): QDesktopServices.openUrl(u))
+            link_row.addWidget(btn)
+        link_row.addStretch()
+        vbox.addLayout(link_row)
+
+        widget.setVisible(False)
+        self._help_layout.addWidget(widget)
+        self._help_widgets[key] = widget
+        return widget
+
     def _populate(self, account: Account) -> None:
         self._display_name.setText(account.display_name)
         self._host.setText(account.host)
         self._port.setValue(account.port)
         self._username.setText(account.username)
-        idx = self._auth_type.findData(account.auth_type)
+        idx = self._auth_index.get(account.auth_type, -1)
         if idx >= 0:
             self._auth_type.setCurrentIndex(idx)
         self._use_ssl.setChecked(account.use_ssl)
@@ -204,33 +320,39 @@ class AccountDialog(QDialog):
         host = self._host.text().strip()
         return not host or "gmail" in host.lower()
 
+    @pyqtSlot()
     def _on_auth_type_changed(self) -> None:
         auth_type = self._auth_type.currentData()
-        is_password = auth_type == AuthType.PASSWORD
-        is_gmail = auth_type == AuthType.OAUTH2_GMAIL
-        is_outlook = auth_type == AuthType.OAUTH2_OUTLOOK
+        is_password = auth_type is _PW
+        is_gmail = auth_type is _GM
+        is_outlook = auth_type is _OL
         is_oauth = is_gmail or is_outlook
 
-        self._password_label.setVisible(is_password)
-        self._password.setVisible(is_password)
+        form = self._form
+        form.setRowVisible(self._password, is_password)
 
         if is_oauth:
-            self._help_label.setVisible(True)
-            self._help_label.setText(_GMAIL_HELP if is_gmail else _OUTLOOK_HELP)
+            help_key = "gmail" if is_gmail else "outlook"
         elif is_password and self._is_gmail_host():
-            self._help_label.setVisible(True)
-            self._help_label.setText(_GMAIL_APP_PASSWORD_HELP)
+            help_key = "app_password"
         else:
-            self._help_label.setVisible(False)
+            help_key = None
+        # Host edits re-run this handler per keystroke; only swap the help
+        # widget when the topic actually changes.
+        if help_key != self._help_key:
+            if self._help_key is not None:
+                self._help_widgets[self._help_key].setVisible(False)
+            if help_key is not None:
+                self._help_widget(help_key).setVisible(True)
+            self._help_key = help_key
+        form.setRowVisible(self._help_box, help_key is not None)
 
-        self._client_id_label.setVisible(is_oauth)
-        self._client_id_edit.setVisible(is_oauth)
-        self._client_secret_label.setVisible(is_gmail)
-        self._client_secret_edit.setVisible(is_gmail)
-
-        self._authorize_label.setVisible(is_oauth)
-        self._authorize_btn.setVisible(is_oauth)
-        self._authorize_status.setVisible(is_oauth)
+        if is_oauth:
+            self._ensure_oauth_widgets()
+        if self._oauth_built:
+            form.setRowVisible(self._client_id_edit, is_oauth)
+            form.setRowVisible(self._client_secret_edit, is_gmail)
+            form.setRowVisible(self._authorize_row, is_oauth)
 
         # Auto-fill host for known providers
         if is_gmail and not self._host.text():
@@ -240,10 +362,11 @@ class AccountDialog(QDialog):
             self._host.setText("outlook.office365.com")
             self._port.setValue(993)
 
-        self.adjustSize()
+        self._resize_timer.start()
 
+    @pyqtSlot()
     def _on_authorize(self) -> None:
-        if self._oauth_thread and self._oauth_thread.isRunning():
+        if self._oauth_busy:
             return
 
         auth_type = self._auth_type.currentData()
@@ -264,39 +387,78 @@ class AccountDialog(QDialog):
                                 "Gmail OAuth2 requires a Client Secret.")
             return
 
-        # Run the blocking browser flow in a background thread
-        worker = _OAuthWorker(auth_type, username, client_id, client_secret)
+        # Run the blocking browser flow on the dialog's OAuth thread
+        self._ensure_oauth_thread()
+        self._oauth_busy = True
+        self._authorize_btn.setEnabled(False)
+        self._authorize_status.setStyleSheet("")
+        self._spinner_step = 0
+        self._tick_spinner()
+        self._spinner_timer.start()
+
+        self._oauth_requested.emit(auth_type, username, client_id, client_secret)
+
+    def _ensure_oauth_thread(self) -> None:
+        """Start the OAuth thread and its worker on the first Authorize click.
+
+        Both are kept for the dialog's lifetime so retries reuse them.
+        """
+        if self._oauth_thread is not None:
+            return
         thread = QThread(self)
+        worker = _OAuthWorker()
         worker.moveToThread(thread)
 
-        thread.started.connect(worker.run)
-        worker.finished.connect(thread.quit)
-        worker.finished.connect(worker.deleteLater)
-        thread.finished.connect(thread.deleteLater)
+        self._oauth_requested.connect(worker.start)
         worker.success.connect(self._on_oauth_success)
         worker.failure.connect(self._on_oauth_failure)
+        thread.finished.connect(worker.deleteLater)
 
         self._oauth_thread = thread
-        self._authorize_btn.setEnabled(False)
-        self._authorize_status.setText("Opening browser…")
-        self._authorize_status.setVisible(True)
-
+        self._oauth_worker = worker
         thread.start()
 
+    def _stop_oauth_thread(self) -> None:
+        thread = self._oauth_thread
+        if thread is None:
+            return
+        thread.quit()
+        # A browser flow still in progress can't be interrupted; don't block
+        # the UI on it — the thread exits once the flow returns.
+        if not self._oauth_busy:
+            thread.wait()
+        self._oauth_thread = None
+        self._oauth_worker = None
+
+    def done(self, result: int) -> None:
+        # accept(), reject() and closing the window all end up here
+        self._stop_oauth_thread()
+        super().done(result)
+
+    @pyqtSlot()
+    def _tick_spinner(self) -> None:
+        self._spinner_step = self._spinner_step % 3 + 1
+        self._authorize_status.setText("Opening browser" + "." * self._spinner_step)
+
+    @pyqtSlot(str)
     def _on_oauth_success(self, token: str) -> None:
+        self._spinner_timer.stop()
         self._authorize_btn.setEnabled(True)
         self._authorize_status.setText("Authorized!")
         self._authorize_status.setStyleSheet("color: green; font-weight: bold;")
-        self._oauth_thread = None
+        self._oauth_busy = False
 
+    @pyqtSlot(str)
     def _on_oauth_failure(self, error: str) -> None:
+        self._spinner_timer.stop()
         self._authorize_btn.setEnabled(True)
         self._authorize_status.setText("Failed")
         self._authorize_status.setStyleSheet("color: red;")
-        self._oauth_thread = None
+        self._oauth_busy = False
         QMessageBox.critical(self, "Authorization Failed",
                              f"OAuth2 authorization failed:\n\n{error}")
 
+    @pyqtSlot()
     def _on_accept(self) -> None:
         host = self._host.text().strip()
         username = self._username.text().strip()
@@ -311,8 +473,10 @@ class AccountDialog(QDialog):
                 set_password(username, host, password)
         elif auth_type in (AuthType.OAUTH2_GMAIL, AuthType.OAUTH2_OUTLOOK):
             # Verify a token was actually obtained
-            from mailsweep.utils.keyring_store import get_token
-            prefix = "gmail" if auth_type == AuthType.OAUTH2_GMAIL else "outlook"
+            prefix = (
+                oauth2.GMAIL_TOKEN_KEY_PREFIX if auth_type == AuthType.OAUTH2_GMAIL
+                else oauth2.OUTLOOK_TOKEN_KEY_PREFIX
+            )
             if not get_token(f"{prefix}:{username}"):
                 reply = QMessageBox.question(
                     self, "Not Authorized",
@@ -326,12 +490,14 @@ class AccountDialog(QDialog):
         self.accept()
 
     def get_account(self) -> Account:
+        self._ensure_ui()
+        username = self._username.text().strip()
         return Account(
             id=self._account.id if self._account else None,
-            display_name=self._display_name.text().strip() or self._username.text().strip(),
+            display_name=self._display_name.text().strip() or username,
             host=self._host.text().strip(),
             port=self._port.value(),
-            username=self._username.text().strip(),
+            username=username,
             auth_type=self._auth_type.currentData(),
             use_ssl=self._use_ssl.isChecked(),
         )
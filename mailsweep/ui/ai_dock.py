@@ -4,7 +4,8 @@ from __future__ import annotations
 import logging
 import re
 
-from PyQt6.QtCore import QObject, Qt, QThread, pyqtSignal
+from PyQt6.QtCore import QObject, Qt, QThread, QTimer, pyqtSignal, pyqtSlot
+from PyQt6.QtGui import QColor, QTextCharFormat, QTextCursor
 from PyQt6.QtWidgets import (
     QComboBox,
     QDockWidget,
@@ -19,7 +20,15 @@ from PyQt6.QtWidgets import (
 
 from typing import NamedTuple
 
-from mailsweep.ai.providers import PROVIDER_MODELS, PROVIDER_PRESETS, fetch_model_list
+import mailsweep.config as cfg
+from mailsweep.ai.providers import (
+    NO_KEY_PROVIDERS,
+    PROVIDER_MODELS,
+    PROVIDER_PRESETS,
+    fetch_model_list,
+)
+from mailsweep.ai.formatting import escape_html, format_response, history_window
+from mailsweep.workers.ai_worker import AiWorker
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +47,24 @@ _MOVE_RE = re.compile(
     re.IGNORECASE,
 )
 
+# Paragraphs kept in the chat view; older ones are evicted as new ones arrive
+_MAX_CHAT_BLOCKS = 500
+
+# Static HTML around chat messages, concatenated per use
+_USER_PRE, _USER_POST = '<p style="color: #1565c0;"><b>You:</b> ', "</p>"
+_AI_COLOR = "#2e7d32"
+_AI_PRE, _AI_POST = f'<p style="color: {_AI_COLOR};"><b>AI:</b><br>', "</p>"
+_SYSTEM_PRE, _SYSTEM_POST = '<p style="color: #e65100;"><i>', "</i></p>"
+
+
+class _ModelFetcher(QObject):
+    """Fetches a provider's model list on the dock's background fetch thread."""
+    done = pyqtSignal(list)
+
+    @pyqtSlot(str, str)
+    def fetch(self, base_url: str, api_key: str) -> None:
+        self.done.emit(fetch_model_list(base_url, api_key))
+
 
 class AiDockWidget(QDockWidget):
     """Dockable AI chat panel for mailbox analysis."""
@@ -46,6 +73,10 @@ class AiDockWidget(QDockWidget):
     apply_moves = pyqtSignal(list)  # list[AiMoveOp]
     # Request context from main window
     context_requested = pyqtSignal()
+    # Queued to the long-lived workers on the dock's background threads:
+    # user_message, history, context, provider_type, base_url, api_key, model
+    _ai_requested = pyqtSignal(str, object, str, str, str, str, str)
+    _models_requested = pyqtSignal(str, str)  # base_url, api_key
 
     def __init__(self, parent=None) -> None:
         super().__init__("AI Assistant", parent)
@@ -57,8 +88,24 @@ class AiDockWidget(QDockWidget):
         self._history: list[dict] = []
         self._context: str = ""
         self._last_response: str = ""
+        self._pending_ops: list[AiMoveOp] | None = None  # parsed from _last_response
+        self._thinking_cursor: QTextCursor | None = None  # set while "Thinking…" is shown
+        self._stream_cursor: QTextCursor | None = None  # start of the reply being streamed
+        self._stream_format = QTextCharFormat()
+        self._stream_format.setForeground(QColor(_AI_COLOR))
+        # Background threads and workers are started on first use and reused
         self._ai_thread: QThread | None = None
-        self._ai_worker = None
+        self._ai_worker: AiWorker | None = None
+        self._ai_busy = False
+        self._refresh_thread: QThread | None = None
+        self._refresh_worker: _ModelFetcher | None = None
+        self._refreshing = False
+        self._model_items: set[str] = set()  # texts currently in _model_combo
+        # Coalesces settings writes from consecutive sends into one save
+        self._save_timer = QTimer(self)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(1000)
+        self._save_timer.timeout.connect(self._flush_settings)
         self._build_ui()
 
     def _build_ui(self) -> None:
@@ -78,6 +125,8 @@ class AiDockWidget(QDockWidget):
         provider_row.addWidget(QLabel("Model:"))
         self._model_combo = QComboBox()
         self._model_combo.setEditable(True)
+        # Typed names stay in the edit field only, so _model_items mirrors the list
+        self._model_combo.setInsertPolicy(QComboBox.InsertPolicy.NoInsert)
         self._model_combo.setMinimumWidth(250)
         provider_row.addWidget(self._model_combo)
         self._refresh_btn = QPushButton("Refresh")
@@ -106,6 +155,10 @@ class AiDockWidget(QDockWidget):
         self._chat_browser = QTextBrowser()
         self._chat_browser.setOpenExternalLinks(False)
         self._chat_browser.setMinimumHeight(200)
+        # Drop the oldest paragraphs past this point so layout cost stays bounded
+        self._chat_browser.document().setMaximumBlockCount(_MAX_CHAT_BLOCKS)
+        # Messages are inserted at the end through this cursor (see _append_chat)
+        self._chat_cursor = QTextCursor(self._chat_browser.document())
         layout.addWidget(self._chat_browser, stretch=1)
 
         # ── Apply suggestions button ─────────────────────────────────────────
@@ -150,7 +203,6 @@ class AiDockWidget(QDockWidget):
 
     def _load_from_config(self) -> None:
         """Load AI settings from config module."""
-        import mailsweep.config as cfg
         idx = self._provider_combo.findText(cfg.AI_PROVIDER)
         if idx >= 0:
             self._provider_combo.setCurrentIndex(idx)
@@ -171,17 +223,25 @@ class AiDockWidget(QDockWidget):
         self._update_key_visibility()
 
     def _populate_model_combo(self, provider: str) -> None:
-        self._model_combo.clear()
         models = PROVIDER_MODELS.get(provider, [])
+        self._model_items = set(models)
+        # One repaint and no per-item signals for the whole rebuild
+        self._model_combo.setUpdatesEnabled(False)
+        self._model_combo.blockSignals(True)
+        self._model_combo.clear()
         if models:
-            self._model_combo.addItems(models)
+            self._model_combo.insertItems(0, models)
+        self._model_combo.blockSignals(False)
+        self._model_combo.setUpdatesEnabled(True)
 
     def _update_key_visibility(self) -> None:
-        hide = self._provider_combo.currentText() in ("ollama", "lm-studio")
+        hide = self._provider_combo.currentText() in NO_KEY_PROVIDERS
         self._key_label.setVisible(not hide)
         self._key_edit.setVisible(not hide)
 
     def _on_refresh_models(self) -> None:
+        if self._refreshing:
+            return  # one fetch at a time; the button re-enables when it lands
         base_url = self._url_edit.text().strip()
         api_key = self._key_edit.text().strip()
         if not base_url:
@@ -189,38 +249,36 @@ class AiDockWidget(QDockWidget):
         self._refresh_btn.setEnabled(False)
         self._refresh_btn.setText("…")
 
-        class _Fetcher(QObject):
-            done = pyqtSignal(list)
-            def __init__(self, url, key):
-                super().__init__()
-                self._url = url
-                self._key = key
-            def run(self):
-                self.done.emit(fetch_model_list(self._url, self._key))
-
-        thread = QThread(self)
-        worker = _Fetcher(base_url, api_key)
-        worker.moveToThread(thread)
-        thread.started.connect(worker.run)
-        worker.done.connect(lambda models: self._on_models_fetched(models))
-        worker.done.connect(thread.quit)
-        worker.done.connect(worker.deleteLater)
-        thread.finished.connect(thread.deleteLater)
-        self._refresh_thread = thread
-        self._refresh_worker = worker
-        thread.start()
+        if self._refresh_thread is None:
+            thread = QThread(self)
+            worker = _ModelFetcher()
+            worker.moveToThread(thread)
+            self._models_requested.connect(worker.fetch)
+            worker.done.connect(self._on_models_fetched)
+            thread.finished.connect(worker.deleteLater)
+            self._refresh_thread = thread
+            self._refresh_worker = worker
+            thread.start()
+        self._refreshing = True
+        self._models_requested.emit(base_url, api_key)
 
     def _on_models_fetched(self, models: list[str]) -> None:
+        self._refreshing = False
         self._refresh_btn.setEnabled(True)
         self._refresh_btn.setText("Refresh")
         if not models:
             return
+        new_models = [m for m in dict.fromkeys(models) if m not in self._model_items]
+        if not new_models:
+            return
         current = self._model_combo.currentText()
-        existing = {self._model_combo.itemText(i) for i in range(self._model_combo.count())}
-        for m in models:
-            if m not in existing:
-                self._model_combo.addItem(m)
+        self._model_combo.setUpdatesEnabled(False)
+        self._model_combo.blockSignals(True)
+        self._model_combo.insertItems(self._model_combo.count(), new_models)
+        self._model_items.update(new_models)
         self._model_combo.setCurrentText(current)
+        self._model_combo.blockSignals(False)
+        self._model_combo.setUpdatesEnabled(True)
 
     def set_context(self, context: str) -> None:
         """Set the DB context string (called by main_window)."""
@@ -234,7 +292,7 @@ class AiDockWidget(QDockWidget):
         self._send_message(text)
 
     def _send_message(self, text: str) -> None:
-        if self._ai_thread and self._ai_thread.isRunning():
+        if self._ai_busy:
             self._append_chat("system", "Please wait — still processing previous request…")
             return
 
@@ -250,138 +308,193 @@ class AiDockWidget(QDockWidget):
         # Request fresh context from main window
         self.context_requested.emit()
 
+        # Prior turns only — the worker appends the new user message itself
+        history = history_window(self._history)
         self._append_chat("user", text)
 
         # Save current settings back to config
         self._save_to_config(provider, base_url, api_key, model)
 
-        from mailsweep.workers.ai_worker import AiWorker
-
-        worker = AiWorker(
-            user_message=text,
-            history=list(self._history),
-            context=self._context,
-            provider_type=provider,
-            base_url=base_url,
-            api_key=api_key,
-            model=model,
+        self._ensure_ai_worker()
+        self._ai_busy = True
+        self._send_btn.setEnabled(False)
+        self._ai_requested.emit(
+            text, history, self._context, provider, base_url, api_key, model,
         )
+
+    def _ensure_ai_worker(self) -> None:
+        """Start the AI thread and its worker for the first request."""
+        if self._ai_thread is not None:
+            return
         thread = QThread(self)
+        worker = AiWorker()
         worker.moveToThread(thread)
 
         # Connect signals — worker lives in thread, slots in main thread,
         # so AutoConnection correctly resolves to QueuedConnection.
-        thread.started.connect(worker.run)
+        self._ai_requested.connect(worker.run)
         worker.thinking.connect(self._on_thinking)
+        worker.token_ready.connect(self._on_token)
         worker.response_ready.connect(self._on_response)
         worker.error.connect(self._on_error)
-        worker.finished.connect(thread.quit)
-        worker.finished.connect(worker.deleteLater)
-        thread.finished.connect(thread.deleteLater)
-        thread.finished.connect(self._on_thread_done)
+        worker.finished.connect(self._on_request_done)
+        thread.finished.connect(worker.deleteLater)
 
         self._ai_worker = worker
         self._ai_thread = thread
-        self._send_btn.setEnabled(False)
         thread.start()
 
+    def shutdown(self) -> None:
+        """Save pending settings and stop the background threads.
+
+        Called when the main window closes.
+        """
+        if self._save_timer.isActive():
+            self._save_timer.stop()
+            self._flush_settings()
+        for thread, busy in (
+            (self._ai_thread, self._ai_busy),
+            (self._refresh_thread, self._refreshing),
+        ):
+            if thread is None:
+                continue
+            thread.quit()
+            # An LLM call or model fetch in flight can't be interrupted;
+            # don't hold up shutdown on it.
+            if not busy:
+                thread.wait()
+
     def _save_to_config(self, provider: str, base_url: str, api_key: str, model: str) -> None:
-        import mailsweep.config as cfg
+        if (provider, base_url, api_key, model) == (
+            cfg.AI_PROVIDER, cfg.AI_BASE_URL, cfg.AI_API_KEY, cfg.AI_MODEL,
+        ):
+            return  # nothing changed since the last save
         cfg.AI_PROVIDER = provider
         cfg.AI_BASE_URL = base_url
         cfg.AI_API_KEY = api_key
         cfg.AI_MODEL = model
+        # Write to disk (and keyring) once sends go quiet, not on every send
+        self._save_timer.start()
+
+    def _flush_settings(self) -> None:
         cfg.save_settings()
 
     def _on_thinking(self) -> None:
-        # Save cursor position so we can reliably remove "Thinking…" later
-        self._thinking_cursor_pos = self._chat_browser.document().characterCount()
         self._append_chat("system", "Thinking…")
+        # Keep a cursor at the start of the "Thinking…" paragraph so
+        # _remove_last_system can drop exactly that paragraph. Unlike a saved
+        # offset, a cursor follows blocks evicted from the top of the document.
+        cursor = QTextCursor(self._chat_cursor)
+        cursor.movePosition(QTextCursor.MoveOperation.StartOfBlock)
+        self._thinking_cursor = cursor
+
+    def _on_token(self, chunk: str) -> None:
+        """Show the next chunk of a streamed reply as plain text."""
+        scrollbar = self._chat_browser.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum()
+        if self._stream_cursor is None:
+            self._remove_last_system()
+            self._insert_chat_html(_AI_PRE + _AI_POST)
+            cursor = QTextCursor(self._chat_cursor)
+            cursor.movePosition(QTextCursor.MoveOperation.StartOfBlock)
+            self._stream_cursor = cursor
+        # Append at the end of the reply's own paragraph, which stays put even
+        # if a system notice has been added below it meanwhile. Line separators
+        # keep the reply a single paragraph.
+        cursor = QTextCursor(self._stream_cursor)
+        cursor.movePosition(QTextCursor.MoveOperation.EndOfBlock)
+        cursor.insertText(chunk.replace("\n", "\u2028"), self._stream_format)
+        if at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
 
     def _on_response(self, text: str) -> None:
-        # Remove the "Thinking…" message
+        # Replace the "Thinking…" message or the streamed plain text with the
+        # formatted reply; markdown only renders reliably on the whole text.
+        if self._stream_cursor is not None:
+            self._remove_paragraph(self._stream_cursor)
+            self._stream_cursor = None
         self._remove_last_system()
         self._append_chat("assistant", text)
         self._history.append({"role": "assistant", "content": text})
         self._last_response = text
-        # Enable apply button if MOVE lines found
-        moves = _MOVE_RE.findall(text)
-        self._apply_btn.setEnabled(bool(moves))
+        self._pending_ops = None
+        # Enable apply button if MOVE lines found; _on_apply parses them
+        self._apply_btn.setEnabled(_MOVE_RE.search(text) is not None)
 
     def _on_error(self, msg: str) -> None:
         self._remove_last_system()
+        self._stream_cursor = None  # keep any partial reply on screen
         # Remove the failed user message from history so context doesn't grow
         if self._history and self._history[-1]["role"] == "user":
             self._history.pop()
         self._append_chat("system", f"Error: {msg}")
 
-    def _on_thread_done(self) -> None:
-        self._ai_thread = None
-        self._ai_worker = None
+    def _on_request_done(self) -> None:
+        self._ai_busy = False
         self._send_btn.setEnabled(True)
 
     def _on_clear(self) -> None:
         """Reset chat history and display."""
         self._history.clear()
         self._last_response = ""
+        self._pending_ops = None
+        self._thinking_cursor = None
+        self._stream_cursor = None
         self._chat_browser.clear()
         self._apply_btn.setEnabled(False)
 
     def _on_apply(self) -> None:
-        moves = _MOVE_RE.findall(self._last_response)
-        if not moves:
-            return
-        ops = [AiMoveOp(sender=m[0], src_folder=m[1], dst_folder=m[2], reason=m[3]) for m in moves]
-        self.apply_moves.emit(ops)
+        # Parse the MOVE lines once per response; repeat clicks reuse the ops
+        if self._pending_ops is None:
+            self._pending_ops = [
+                AiMoveOp(sender=m[0], src_folder=m[1], dst_folder=m[2], reason=m[3])
+                for m in _MOVE_RE.findall(self._last_response)
+            ]
+        if self._pending_ops:
+            self.apply_moves.emit(self._pending_ops)
 
     def _append_chat(self, role: str, text: str) -> None:
         if role == "user":
             self._history.append({"role": "user", "content": text})
-            html = f'<p style="color: #1565c0;"><b>You:</b> {_escape(text)}</p>'
+            html = _USER_PRE + escape_html(text) + _USER_POST
         elif role == "assistant":
             # Convert markdown-ish text to basic HTML
-            html = f'<p style="color: #2e7d32;"><b>AI:</b><br>{_format_response(text)}</p>'
+            html = _AI_PRE + format_response(text) + _AI_POST
         else:
-            html = f'<p style="color: #e65100;"><i>{_escape(text)}</i></p>'
-        self._chat_browser.append(html)
+            html = _SYSTEM_PRE + escape_html(text) + _SYSTEM_POST
+        self._insert_chat_html(html)
+
+    def _insert_chat_html(self, html: str) -> None:
+        """Insert *html* as a new paragraph at the end of the chat, in one edit block."""
+        scrollbar = self._chat_browser.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum()
+        cursor = self._chat_cursor
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.beginEditBlock()
+        if not self._chat_browser.document().isEmpty():
+            cursor.insertBlock()
+        cursor.insertHtml(html)
+        cursor.endEditBlock()
+        # Follow the conversation like QTextBrowser.append() does
+        if at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
 
     def _remove_last_system(self) -> None:
         """Remove the 'Thinking…' message added by _on_thinking()."""
-        pos = getattr(self, "_thinking_cursor_pos", None)
-        if pos is None:
+        if self._thinking_cursor is None:
             return
-        cursor = self._chat_browser.textCursor()
-        # Select from saved position to end and remove
-        cursor.setPosition(max(pos - 1, 0))
-        cursor.movePosition(cursor.MoveOperation.End, cursor.MoveMode.KeepAnchor)
+        self._remove_paragraph(self._thinking_cursor)
+        self._thinking_cursor = None
+
+    def _remove_paragraph(self, cursor: QTextCursor) -> None:
+        """Remove the chat paragraph starting at *cursor*."""
+        start = cursor.position()
+        end = start + cursor.block().length() - 1
+        if start > 0:
+            # Take the paragraph break before it along with the text
+            cursor.setPosition(start - 1)
+        elif cursor.block().next().isValid():
+            end += 1  # first paragraph: take the break after it instead
+        cursor.setPosition(end, QTextCursor.MoveMode.KeepAnchor)
         cursor.removeSelectedText()
-        self._thinking_cursor_pos = None
-
-
-def _escape(text: str) -> str:
-    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-
-
-def _format_response(text: str) -> str:
-    """Basic markdown → HTML conversion for AI responses."""
-    text = _escape(text)
-    # Bold
-    text = re.sub(r"\*\*(.+?)\*\*", r"<b>\1</b>", text)
-    # Code blocks
-    text = re.sub(
-        r"```(.*?)```",
-        r'<pre style="background:#e8e8e8; padding:4px; color:#333;">\1</pre>',
-        text,
-        flags=re.DOTALL,
-    )
-    # Inline code
-    text = re.sub(r"`([^`]+)`", r'<code style="background:#e8e8e8; color:#333;">\1</code>', text)
-    # MOVE lines — highlight them
-    text = re.sub(
-        r"(MOVE:.*)",
-        r'<span style="color: #bf360c; font-weight: bold;">\1</span>',
-        text,
-    )
-    # Newlines
-    text = text.replace("\n", "<br>")
-    return text
+
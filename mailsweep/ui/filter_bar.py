@@ -1,7 +1,7 @@
 """Filter bar — sender, subject, date range, size range, has-attachment filter."""
 from __future__ import annotations
 
-from PyQt6.QtCore import QDate, Qt, pyqtSignal
+from PyQt6.QtCore import QDate, Qt, QTimer, pyqtSignal
 from PyQt6.QtWidgets import (
     QCheckBox,
     QDateEdit,
@@ -14,14 +14,28 @@ from PyQt6.QtWidgets import (
 )
 
 
+FILTER_DEBOUNCE_MS = 300  # quiet period before an edit re-runs the query
+_EPOCH = QDate(2000, 1, 1)  # "From" date meaning no lower bound
+
+
+def _mb_to_bytes(megabytes: float) -> int:
+    """Convert a one-decimal MB spin box value to bytes using integer math."""
+    return round(megabytes * 10) * (1024 * 1024) // 10
+
+
 class FilterBar(QWidget):
     """
-    Horizontal filter bar.  Emits filter_changed when Apply is clicked.
+    Horizontal filter bar.  Emits filter_changed when Apply is clicked, on Enter,
+    and once the fields have been left alone for FILTER_DEBOUNCE_MS after an edit.
     """
     filter_changed = pyqtSignal(dict)  # filter kwargs for MessageRepository.query_messages
 
     def __init__(self, parent: QWidget | None = None) -> None:
         super().__init__(parent)
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(FILTER_DEBOUNCE_MS)
+        self._debounce.timeout.connect(self._emit_filter)
         self._build_ui()
 
     def _build_ui(self) -> None:
@@ -50,7 +64,7 @@ class FilterBar(QWidget):
         layout.addWidget(QLabel("Date:"))
         self._date_from = QDateEdit()
         self._date_from.setCalendarPopup(True)
-        self._date_from.setDate(QDate(2000, 1, 1))
+        self._date_from.setDate(_EPOCH)
         self._date_from.setFixedWidth(110)
         layout.addWidget(self._date_from)
 
@@ -95,52 +109,39 @@ class FilterBar(QWidget):
         self._to_edit.returnPressed.connect(self._emit_filter)
         self._subject_edit.returnPressed.connect(self._emit_filter)
 
-    def _emit_filter(self) -> None:
-        kwargs: dict = {}
+        # Filter as you type: a burst of edits re-runs the query once
+        for edit in (self._from_edit, self._to_edit, self._subject_edit):
+            edit.textChanged.connect(self._debounce.start)
+        self._date_from.dateChanged.connect(self._debounce.start)
+        self._date_to.dateChanged.connect(self._debounce.start)
+        self._size_min.valueChanged.connect(self._debounce.start)
+        self._size_max.valueChanged.connect(self._debounce.start)
+        self._has_attachment.toggled.connect(self._debounce.start)
 
-        from_text = self._from_edit.text().strip()
-        if from_text:
-            kwargs["from_filter"] = from_text
-
-        to_text = self._to_edit.text().strip()
-        if to_text:
-            kwargs["to_filter"] = to_text
-
-        subject_text = self._subject_edit.text().strip()
-        if subject_text:
-            kwargs["subject_filter"] = subject_text
-
-        date_from = self._date_from.date()
-        if date_from > QDate(2000, 1, 1):
-            kwargs["date_from"] = date_from.toString("yyyy-MM-dd")
-
-        date_to = self._date_to.date()
-        if date_to < QDate.currentDate():
-            kwargs["date_to"] = date_to.toString("yyyy-MM-dd")
-
-        size_min = self._size_min.value()
-        if size_min > 0:
-            kwargs["size_min"] = int(size_min * 1024 * 1024)
-
-        size_max = self._size_max.value()
-        if size_max > 0:
-            kwargs["size_max"] = int(size_max * 1024 * 1024)
-
-        if self._has_attachment.isChecked():
-            kwargs["has_attachment"] = True
-
-        self.filter_changed.emit(kwargs)
+    def _emit_filter(self) -> None:
+        self._debounce.stop()  # an immediate apply supersedes any pending one
+        self.filter_changed.emit(self.get_filter_kwargs())
 
     def clear_filters(self) -> None:
         """Reset all filter fields without emitting a signal."""
+        fields = (
+            self._from_edit, self._to_edit, self._subject_edit, self._date_from,
+            self._date_to, self._size_min, self._size_max, self._has_attachment,
+        )
+        # Silence per-field change signals so the reset doesn't arm the debounce
+        for w in fields:
+            w.blockSignals(True)
         self._from_edit.clear()
         self._to_edit.clear()
         self._subject_edit.clear()
-        self._date_from.setDate(QDate(2000, 1, 1))
+        self._date_from.setDate(_EPOCH)
         self._date_to.setDate(QDate.currentDate())
         self._size_min.setValue(0)
         self._size_max.setValue(0)
         self._has_attachment.setChecked(False)
+        for w in fields:
+            w.blockSignals(False)
+        self._debounce.stop()  # drop an edit still waiting from before the reset
 
     def _clear_and_emit(self) -> None:
         self.clear_filters()
@@ -169,17 +170,17 @@ class FilterBar(QWidget):
         if subject_text:
             kwargs["subject_filter"] = subject_text
         date_from = self._date_from.date()
-        if date_from > QDate(2000, 1, 1):
-            kwargs["date_from"] = date_from.toString("yyyy-MM-dd")
+        if date_from > _EPOCH:
+            kwargs["date_from"] = date_from.toString(Qt.DateFormat.ISODate)
         date_to = self._date_to.date()
         if date_to < QDate.currentDate():
-            kwargs["date_to"] = date_to.toString("yyyy-MM-dd")
+            kwargs["date_to"] = date_to.toString(Qt.DateFormat.ISODate)
         size_min = self._size_min.value()
         if size_min > 0:
-            kwargs["size_min"] = int(size_min * 1024 * 1024)
+            kwargs["size_min"] = _mb_to_bytes(size_min)
         size_max = self._size_max.value()
         if size_max > 0:
-            kwargs["size_max"] = int(size_max * 1024 * 1024)
+            kwargs["size_max"] = _mb_to_bytes(size_max)
         if self._has_attachment.isChecked():
             kwargs["has_attachment"] = True
         return kwargs
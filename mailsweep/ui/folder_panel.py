@@ -1,11 +1,13 @@
-"""Folder panel — QTreeWidget showing folder hierarchy with size badges."""
+"""Folder panel — QTreeView + FolderTreeModel showing folder hierarchy with size badges."""
 from __future__ import annotations
 
-from PyQt6.QtCore import Qt, pyqtSignal
+from dataclasses import dataclass, field
+
+from PyQt6.QtCore import QAbstractItemModel, QModelIndex, Qt, pyqtSignal
 from PyQt6.QtGui import QFont
 from PyQt6.QtWidgets import (
-    QTreeWidget,
-    QTreeWidgetItem,
+    QAbstractItemView,
+    QTreeView,
     QWidget,
 )
 
@@ -16,8 +18,245 @@ FOLDER_ID_ROLE = Qt.ItemDataRole.UserRole
 ALL_FOLDERS_ID = -1  # Sentinel meaning "show all"
 UNLABELLED_ID = -2   # Sentinel for virtual "Unlabelled" folder
 
+COLUMNS = ["Folder", "Size"]
+COL_NAME = 0
+COL_SIZE = 1
+
+
+@dataclass(eq=False)
+class FolderNode:
+    """One row of the folder tree; intermediate path segments have folder_id None."""
+    name: str
+    size_text: str = ""
+    folder_id: int | None = None
+    font: QFont | None = None
+    path: str = ""
+    parent: FolderNode | None = None
+    children: list[FolderNode] = field(default_factory=list)
+    row: int = 0
+    loaded: int = 0  # children exposed to the view so far (see fetchMore)
+
+    def add_child(self, child: FolderNode) -> FolderNode:
+        child.parent = self
+        child.row = len(self.children)
+        self.children.append(child)
+        return child
+
+
+def _folder_sort_key(folder: Folder) -> tuple[int, str]:
+    """INBOX first, then the [Gmail] group, then everything else, each by name."""
+    name_lower = folder.name.lower()
+    if name_lower == "inbox":
+        return (0, "")
+    if name_lower.startswith(("[gmail]", "[google mail]")):
+        return (1, folder.name)
+    return (2, folder.name)
+
+
+class FolderTreeModel(QAbstractItemModel):
+    """Model over a tree of FolderNodes, indexed by folder ID for O(1) updates.
+
+    The whole tree is built up front, but a node's children only become rows
+    when the view first expands it (canFetchMore/fetchMore), so Qt never lays
+    out branches nobody has opened.
+    """
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self._bold = QFont()
+        self._bold.setBold(True)
+        self._italic = QFont()
+        self._italic.setItalic(True)
+        self._root = FolderNode("")
+        self._by_id: dict[int, FolderNode] = {}
+        self._by_path: dict[str, FolderNode] = {}
+        self._add_all_node(self._root)
+        self._root.loaded = len(self._root.children)
+
+    # ── QAbstractItemModel interface ──────────────────────────────────────────
+
+    def index(self, row: int, column: int, parent=QModelIndex()) -> QModelIndex:
+        if not self.hasIndex(row, column, parent):
+            return QModelIndex()
+        node = parent.internalPointer() if parent.isValid() else self._root
+        return self.createIndex(row, column, node.children[row])
+
+    def parent(self, index: QModelIndex) -> QModelIndex:
+        if not index.isValid():
+            return QModelIndex()
+        parent = index.internalPointer().parent
+        if parent is None or parent is self._root:
+            return QModelIndex()
+        return self.createIndex(parent.row, 0, parent)
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        if parent.column() > 0:
+            return 0
+        node = parent.internalPointer() if parent.isValid() else self._root
+        return node.loaded
+
+    def hasChildren(self, parent=QModelIndex()) -> bool:
+        if parent.column() > 0:
+            return False
+        node = parent.internalPointer() if parent.isValid() else self._root
+        return bool(node.children)
+
+    def canFetchMore(self, parent: QModelIndex) -> bool:
+        node = parent.internalPointer() if parent.isValid() else self._root
+        return node.loaded < len(node.children)
+
+    def fetchMore(self, parent: QModelIndex) -> None:
+        node = parent.internalPointer() if parent.isValid() else self._root
+        if node.loaded >= len(node.children):
+            return
+        self.beginInsertRows(parent, node.loaded, len(node.children) - 1)
+        node.loaded = len(node.children)
+        self.endInsertRows()
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return len(COLUMNS)
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return COLUMNS[section]
+        return None
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        node: FolderNode = index.internalPointer()
+        col = index.column()
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            return node.name if col == COL_NAME else node.size_text
+
+        if col != COL_NAME:
+            return None
+        if role == FOLDER_ID_ROLE:
+            return node.folder_id
+        if role == Qt.ItemDataRole.FontRole:
+            return node.font
+        return None
+
+    # ── Public API ─────────────────────────────────────────────────────────────
+
+    def populate(
+        self,
+        folders: list[Folder],
+        dedup_total: int | None = None,
+        unlabelled_stats: tuple[int, int] | None = None,
+    ) -> None:
+        """Rebuild the tree from a flat list of folders (see FolderPanel.populate)."""
+        root = FolderNode("")
+        by_id: dict[int, FolderNode] = {}
+
+        total_size = dedup_total if dedup_total is not None else sum(f.total_size_bytes for f in folders)
+        self._add_all_node(root).size_text = human_size(total_size)
+
+        # Virtual "Unlabelled" item (archived-only Gmail messages)
+        if unlabelled_stats is not None:
+            count, size = unlabelled_stats
+            if count > 0:
+                root.add_child(FolderNode(
+                    f"Unlabelled ({count:,})", human_size(size), UNLABELLED_ID, self._italic,
+                ))
+
+        ordered = sorted(folders, key=_folder_sort_key)
+
+        nodes_by_path: dict[str, FolderNode] = {}
+
+        if not any("/" in f.name for f in ordered):
+            # Flat account: every folder is a top-level leaf, no path bookkeeping
+            for folder in ordered:
+                node = root.add_child(FolderNode(folder.name, path=folder.name))
+                self._fill_leaf(node, folder, by_id)
+        else:
+            for folder in ordered:
+                parts = folder.name.split("/")
+                last = len(parts) - 1
+                parent_node = root
+                path_key = ""
+
+                for depth, part in enumerate(parts):
+                    path_key = path_key + "/" + part if depth else part
+                    if path_key in nodes_by_path:
+                        parent_node = nodes_by_path[path_key]
+                        continue
+
+                    node = parent_node.add_child(FolderNode(part, path=path_key))
+                    if depth == last:
+                        self._fill_leaf(node, folder, by_id)
+                    nodes_by_path[path_key] = node
+                    parent_node = node
+
+        root.loaded = len(root.children)
+        self.beginResetModel()
+        self._root = root
+        self._by_id = by_id
+        self._by_path = nodes_by_path
+        self.endResetModel()
+
+    def index_for_folder(self, folder_id: int, column: int = COL_NAME) -> QModelIndex:
+        """Return the index of the row for folder_id, or an invalid index.
+
+        Fetches any ancestors the view has not loaded yet so the row exists.
+        """
+        node = self._by_id.get(folder_id)
+        if node is None:
+            return QModelIndex()
+        self._load_ancestors(node)
+        return self.createIndex(node.row, column, node)
 
-class FolderPanel(QTreeWidget):
+    def index_for_path(self, path: str) -> QModelIndex:
+        """Return the index for a folder path if that row is loaded, else an invalid index."""
+        node = self._by_path.get(path)
+        if node is None or not self._is_loaded(node):
+            return QModelIndex()
+        return self.createIndex(node.row, COL_NAME, node)
+
+    def default_expanded_paths(self) -> list[str]:
+        """Top-level INBOX and [Gmail] branches, which start out expanded."""
+        return [
+            node.path for node in self._root.children
+            if node.children and node.path.lower() in ("inbox", "[gmail]", "[google mail]")
+        ]
+
+    def set_folder_size(self, folder_id: int, size_bytes: int) -> None:
+        node = self._by_id.get(folder_id)
+        if node is None:
+            return
+        node.size_text = human_size(size_bytes)
+        if self._is_loaded(node):
+            idx = self.createIndex(node.row, COL_SIZE, node)
+            self.dataChanged.emit(idx, idx, [Qt.ItemDataRole.DisplayRole])
+
+    def _fill_leaf(self, node: FolderNode, folder: Folder, by_id: dict[int, FolderNode]) -> None:
+        node.size_text = human_size(folder.total_size_bytes)
+        node.folder_id = folder.id
+        node.font = self._bold if folder.name.lower() == "inbox" else None
+        if folder.id is not None:
+            by_id[folder.id] = node
+
+    def _is_loaded(self, node: FolderNode) -> bool:
+        while node.parent is not None:
+            if node.row >= node.parent.loaded:
+                return False
+            node = node.parent
+        return True
+
+    def _load_ancestors(self, node: FolderNode) -> None:
+        chain: list[FolderNode] = []
+        while node.parent is not None and node.parent is not self._root:
+            node = node.parent
+            chain.append(node)
+        for ancestor in reversed(chain):
+            self.fetchMore(self.createIndex(ancestor.row, COL_NAME, ancestor))
+
+    def _add_all_node(self, root: FolderNode) -> FolderNode:
+        return root.add_child(FolderNode("All Folders", "", ALL_FOLDERS_ID, self._bold))
+
+
+class FolderPanel(QTreeView):
     """
     Shows folder tree with size badges.
     Emits folder_selected(folder_ids) when user clicks a folder.
@@ -27,20 +266,15 @@ class FolderPanel(QTreeWidget):
 
     def __init__(self, parent: QWidget | None = None) -> None:
         super().__init__(parent)
-        self.setHeaderLabels(["Folder", "Size"])
-        self.setColumnWidth(0, 180)
-        self.setColumnWidth(1, 80)
-        self.setSelectionMode(QTreeWidget.SelectionMode.SingleSelection)
-        self.itemClicked.connect(self._on_item_clicked)
-        self._add_all_item()
-
-    def _add_all_item(self) -> None:
-        all_item = QTreeWidgetItem(["All Folders", ""])
-        all_item.setData(0, FOLDER_ID_ROLE, ALL_FOLDERS_ID)
-        font = QFont()
-        font.setBold(True)
-        all_item.setFont(0, font)
-        self.addTopLevelItem(all_item)
+        self._model = FolderTreeModel(self)
+        self.setModel(self._model)
+        self.setColumnWidth(COL_NAME, 180)
+        self.setColumnWidth(COL_SIZE, 80)
+        self.setUniformRowHeights(True)  # one height probe instead of one per row
+        self.setAnimated(False)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.clicked.connect(self._on_index_clicked)
+        self._populated = False
 
     def populate(
         self,
@@ -54,76 +288,40 @@ class FolderPanel(QTreeWidget):
         If dedup_total is given, use it for "All Folders" size (avoids double-counting).
         If unlabelled_stats is (count, size) and count > 0, insert a virtual
         "Unlabelled" item after "All Folders".
+        The INBOX and [Gmail] branches start expanded; later refreshes keep
+        whichever branches the user has open.
         """
-        self.clear()
-        self._add_all_item()
+        # Keep the user's expanded branches across refreshes; start with the defaults
+        expanded = self._expanded_paths() if self._populated else None
+        self._populated = True
 
-        total_size = dedup_total if dedup_total is not None else sum(f.total_size_bytes for f in folders)
-        all_item = self.topLevelItem(0)
-        if all_item:
-            all_item.setText(1, human_size(total_size))
+        # Reset and expand with painting off so the tree is laid out once
+        self.setUpdatesEnabled(False)
+        self._model.populate(folders, dedup_total=dedup_total, unlabelled_stats=unlabelled_stats)
+        if expanded is None:
+            expanded = self._model.default_expanded_paths()
+        for path in expanded:  # parents come before children, so each row is loaded
+            index = self._model.index_for_path(path)
+            if index.isValid():
+                self._model.fetchMore(index)  # now, not at next layout, so nested paths resolve
+                self.expand(index)
+        self.setUpdatesEnabled(True)
 
-        # Virtual "Unlabelled" item (archived-only Gmail messages)
-        if unlabelled_stats is not None:
-            count, size = unlabelled_stats
-            if count > 0:
-                label = f"Unlabelled ({count:,})"
-                item = QTreeWidgetItem([label, human_size(size)])
-                item.setData(0, FOLDER_ID_ROLE, UNLABELLED_ID)
-                font = QFont()
-                font.setItalic(True)
-                item.setFont(0, font)
-                self.addTopLevelItem(item)
-
-        # Partition into 3 buckets
-        inbox: list[Folder] = []
-        gmail: list[Folder] = []
-        rest: list[Folder] = []
-
-        for f in folders:
-            name_lower = f.name.lower()
-            if name_lower == "inbox":
-                inbox.append(f)
-            elif name_lower.startswith("[gmail]") or name_lower.startswith("[google mail]"):
-                gmail.append(f)
-            else:
-                rest.append(f)
-
-        ordered = inbox + sorted(gmail, key=lambda f: f.name) + sorted(rest, key=lambda f: f.name)
-
-        items_by_path: dict[str, QTreeWidgetItem] = {}
-
-        for folder in ordered:
-            parts = folder.name.split("/")
-            parent_item: QTreeWidgetItem | QTreeWidget = self
-
-            for depth, part in enumerate(parts):
-                path_key = "/".join(parts[: depth + 1])
-                if path_key in items_by_path:
-                    parent_item = items_by_path[path_key]
-                    continue
-
-                is_leaf = depth == len(parts) - 1
-                item = QTreeWidgetItem([part, human_size(folder.total_size_bytes) if is_leaf else ""])
-                item.setData(0, FOLDER_ID_ROLE, folder.id if is_leaf else None)
-
-                if is_leaf:
-                    font = item.font(0)
-                    font.setBold(folder.name.lower() == "inbox")
-                    item.setFont(0, font)
-
-                if isinstance(parent_item, QTreeWidget):
-                    parent_item.addTopLevelItem(item)
-                else:
-                    parent_item.addChild(item)
-
-                items_by_path[path_key] = item
-                parent_item = item
-
-        self.expandAll()
-
-    def _on_item_clicked(self, item: QTreeWidgetItem, column: int) -> None:
-        fid = item.data(0, FOLDER_ID_ROLE)
+    def _expanded_paths(self) -> list[str]:
+        """Paths of expanded branches, parents first, descending only into expanded rows."""
+        paths: list[str] = []
+        stack = [QModelIndex()]
+        while stack:
+            parent = stack.pop()
+            for row in range(self._model.rowCount(parent)):
+                index = self._model.index(row, COL_NAME, parent)
+                if self.isExpanded(index):
+                    paths.append(index.internalPointer().path)
+                    stack.append(index)
+        return paths
+
+    def _on_index_clicked(self, index: QModelIndex) -> None:
+        fid = index.siblingAtColumn(COL_NAME).data(FOLDER_ID_ROLE)
         if fid == ALL_FOLDERS_ID:
             self.folder_selected.emit([])
         elif fid == UNLABELLED_ID:
@@ -134,38 +332,12 @@ class FolderPanel(QTreeWidget):
 
     def update_folder_size(self, folder_id: int, size_bytes: int) -> None:
         """Update the size badge for a single folder."""
-        root = self.invisibleRootItem()
-        self._update_item_size(root, folder_id, size_bytes)
+        self._model.set_folder_size(folder_id, size_bytes)
 
     def select_folder(self, folder_id: int) -> None:
         """Programmatically select a folder by ID in the tree."""
-        item = self._find_item(self.invisibleRootItem(), folder_id)
-        if item:
-            self.setCurrentItem(item)
-            self._on_item_clicked(item, 0)
-
-    def _find_item(self, parent: QTreeWidgetItem, folder_id: int) -> QTreeWidgetItem | None:
-        for i in range(parent.childCount()):
-            child = parent.child(i)
-            if child is None:
-                continue
-            if child.data(0, FOLDER_ID_ROLE) == folder_id:
-                return child
-            found = self._find_item(child, folder_id)
-            if found:
-                return found
-        return None
-
-    def _update_item_size(
-        self, parent: QTreeWidgetItem, folder_id: int, size_bytes: int
-    ) -> bool:
-        for i in range(parent.childCount()):
-            child = parent.child(i)
-            if child is None:
-                continue
-            if child.data(0, FOLDER_ID_ROLE) == folder_id:
-                child.setText(1, human_size(size_bytes))
-                return True
-            if self._update_item_size(child, folder_id, size_bytes):
-                return True
-        return False
+        index = self._model.index_for_folder(folder_id)
+        if index.isValid():
+            self.scrollTo(index)  # expands collapsed parents
+            self.setCurrentIndex(index)
+            self._on_index_clicked(index)
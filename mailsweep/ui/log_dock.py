@@ -1,9 +1,13 @@
 """Log viewer dock widget — live-tailing app log with color by level."""
 from __future__ import annotations
 
+import html
 import logging
-from PyQt6.QtCore import Qt, pyqtSignal, QObject
-from PyQt6.QtGui import QColor, QTextCharFormat, QTextCursor
+from itertools import groupby
+from operator import itemgetter
+
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QObject
+from PyQt6.QtGui import QColor
 from PyQt6.QtWidgets import (
     QDockWidget,
     QPlainTextEdit,
@@ -21,6 +25,17 @@ _LEVEL_COLORS = {
     logging.ERROR: QColor(255, 80, 80),
     logging.CRITICAL: QColor(255, 0, 0),
 }
+_DEFAULT_COLOR = QColor(220, 220, 220)
+
+# Opening tag for a run of same-level lines; <pre> keeps the formatter's column padding
+_LEVEL_PREFIXES = {
+    level: f'<pre style="color:{color.name()}">' for level, color in _LEVEL_COLORS.items()
+}
+_DEFAULT_PREFIX = f'<pre style="color:{_DEFAULT_COLOR.name()}">'
+
+# Records arriving within this window are written to the view in one go
+_FLUSH_INTERVAL_MS = 50
+_MAX_LOG_LINES = 5000  # view scrollback; older lines are discarded
 
 
 class _SignalEmitter(QObject):
@@ -28,20 +43,46 @@ class _SignalEmitter(QObject):
 
 
 class QtLogHandler(logging.Handler):
-    """logging.Handler that emits a Qt signal for each log record."""
+    """logging.Handler that emits a Qt signal for each log record.
+
+    At most MAX_BACKLOG records are in flight to the GUI thread at once; the
+    receiver reports each one via record_delivered(). Records beyond that are
+    dropped and counted, and the count is prefixed to the next record sent.
 
-    def __init__(self) -> None:
+    Each handler has its own emitter, so a receiver only sees (and reports
+    delivery for) its own handler's records.  Pass the receiving widget as
+    parent so the emitter is freed along with it.
+    """
+
+    MAX_BACKLOG = 500
+
+    def __init__(self, parent: QObject | None = None) -> None:
         super().__init__()
-        self._emitter = _SignalEmitter()
+        self._emitter = _SignalEmitter(parent)
         self.log_record = self._emitter.log_record
+        self._backlog = 0   # emitted but not yet delivered; guarded by self.lock
+        self._dropped = 0
 
     def emit(self, record: logging.LogRecord) -> None:
+        # Called by Handler.handle() with self.lock held
+        if self._backlog >= self.MAX_BACKLOG:
+            self._dropped += 1
+            return
         try:
             msg = self.format(record)
-            self._emitter.log_record.emit(record.levelno, msg)
+            if self._dropped:
+                msg = f"[dropped {self._dropped}] {msg}"
+                self._dropped = 0
+            self._backlog += 1
+            self.log_record.emit(record.levelno, msg)
         except Exception:
             self.handleError(record)
 
+    def record_delivered(self) -> None:
+        """Mark one emitted record as received by the GUI thread."""
+        with self.lock:
+            self._backlog -= 1
+
 
 class LogDockWidget(QDockWidget):
     def __init__(self, parent=None) -> None:
@@ -51,6 +92,12 @@ class LogDockWidget(QDockWidget):
             QDockWidget.DockWidgetFeature.DockWidgetClosable |
             QDockWidget.DockWidgetFeature.DockWidgetFloatable
         )
+        self._pending: list[tuple[int, str]] = []  # (level, message) awaiting _flush
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(_FLUSH_INTERVAL_MS)
+        self._flush_timer.timeout.connect(self._flush)
+        self.visibilityChanged.connect(self._on_visibility_changed)
         self._build_ui()
         self._install_handler()
 
@@ -69,7 +116,7 @@ class LogDockWidget(QDockWidget):
 
         self._text = QPlainTextEdit()
         self._text.setReadOnly(True)
-        self._text.setMaximumBlockCount(5000)
+        self._text.setMaximumBlockCount(_MAX_LOG_LINES)
         self._text.setStyleSheet(
             "QPlainTextEdit { background-color: #1e1e1e; }"
         )
@@ -82,10 +129,14 @@ class LogDockWidget(QDockWidget):
         self.setWidget(container)
 
     def _install_handler(self) -> None:
-        self._handler = QtLogHandler()
+        self._handler = QtLogHandler(self)
+        self._handler.setLevel(logging.INFO)
         formatter = logging.Formatter("%(asctime)s %(levelname)-8s %(name)s: %(message)s")
         self._handler.setFormatter(formatter)
-        self._handler.log_record.connect(self._append_log)
+        # Records may come from worker threads; always hop to the GUI thread
+        self._handler.log_record.connect(
+            self._append_log, Qt.ConnectionType.QueuedConnection
+        )
         logging.getLogger().addHandler(self._handler)
         self.destroyed.connect(self._remove_handler)
 
@@ -93,14 +144,38 @@ class LogDockWidget(QDockWidget):
         logging.getLogger().removeHandler(self._handler)
 
     def _append_log(self, level: int, message: str) -> None:
-        color = _LEVEL_COLORS.get(level, QColor(220, 220, 220))
-        fmt = QTextCharFormat()
-        fmt.setForeground(color)
-        cursor = self._text.textCursor()
-        cursor.movePosition(QTextCursor.MoveOperation.End)
-        cursor.insertText(message + "\n", fmt)
-        self._text.setTextCursor(cursor)
-        self._text.ensureCursorVisible()
+        self._handler.record_delivered()
+        self._pending.append((level, message))
+        if not self.isVisible():
+            # Nothing to paint; keep only what the view could show once opened
+            if len(self._pending) > 2 * _MAX_LOG_LINES:
+                del self._pending[:-_MAX_LOG_LINES]
+            return
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def _on_visibility_changed(self, visible: bool) -> None:
+        if visible and self._pending:
+            self._flush_timer.start()
+
+    def _flush(self) -> None:
+        """Write buffered records as one HTML append, one <pre> per run of same-level lines.
+
+        appendHtml lets QPlainTextEdit trim to maximumBlockCount and keep following
+        the bottom by itself, without moving the widget's text cursor.
+        """
+        if not self.isVisible():
+            return  # hidden since the timer started; flushed when shown again
+        pending, self._pending = self._pending[-_MAX_LOG_LINES:], []
+        if not pending:
+            return
+        parts: list[str] = []
+        for level, group in groupby(pending, key=itemgetter(0)):
+            parts.append(_LEVEL_PREFIXES.get(level, _DEFAULT_PREFIX))
+            parts.append(html.escape("\n".join(message for _, message in group), quote=False))
+            parts.append("</pre>")
+        self._text.appendHtml("".join(parts))
 
     def _clear(self) -> None:
+        self._pending.clear()
         self._text.clear()
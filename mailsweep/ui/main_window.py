@@ -2,9 +2,11 @@
 from __future__ import annotations
 
 import logging
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Iterator
 
-from PyQt6.QtCore import QThread, Qt
+from PyQt6.QtCore import QThread, QTimer, Qt, pyqtSignal
 from PyQt6.QtGui import QIcon
 from PyQt6.QtWidgets import (
     QComboBox,
@@ -27,14 +29,14 @@ from PyQt6.QtWidgets import (
 import mailsweep.config as cfg
 from mailsweep.config import DB_PATH
 from mailsweep.db.repository import AccountRepository, FolderRepository, MessageRepository
-from mailsweep.db.schema import init_db
+from mailsweep.db.schema import ConnectionPool
 from mailsweep.models.account import Account
 from mailsweep.models.folder import Folder
 from mailsweep.models.message import Message
 from mailsweep.ui.account_dialog import AccountDialog
 from mailsweep.ui.filter_bar import FilterBar
 from mailsweep.ui.folder_panel import UNLABELLED_ID, FolderPanel
-from mailsweep.ui.message_table import MessageTableView
+from mailsweep.ui.message_table import DEFAULT_PAGE_ORDER, MessageTableView
 from mailsweep.ui.progress_panel import ProgressPanel
 from mailsweep.ui.treemap_widget import (
     VIEW_FOLDERS,
@@ -46,25 +48,34 @@ from mailsweep.ui.treemap_widget import (
 )
 from mailsweep.utils.size_fmt import human_size
 from mailsweep.workers.qt_scan_worker import QtScanWorker
+from mailsweep.workers.folder_list_worker import FolderListWorker
+from mailsweep.workers.treemap_worker import TreemapWorker
 
 logger = logging.getLogger(__name__)
 
 
 class MainWindow(QMainWindow):
+    # Queued to the TreemapWorker: request id, receivers, folder_ids, unlabelled args
+    _treemap_summary_requested = pyqtSignal(int, bool, object, object)
+    _server_state_requested = pyqtSignal(int, object)
+    _imap_close_requested = pyqtSignal(object)
+
     def __init__(self) -> None:
         super().__init__()
         self.setWindowTitle("MailSweep")
         self.resize(1280, 800)
 
         # DB
-        self._conn = init_db(DB_PATH)
-        self._account_repo = AccountRepository(self._conn)
-        self._folder_repo = FolderRepository(self._conn)
-        self._msg_repo = MessageRepository(self._conn)
+        self._db = ConnectionPool(DB_PATH)
+        self._account_repo = AccountRepository(self._db)
+        self._folder_repo = FolderRepository(self._db)
+        self._msg_repo = MessageRepository(self._db)
 
         # State
         self._current_account: Account | None = None
-        self._current_folder_ids: list[int] = []
+        self._current_folder_ids: list[int] = []  # assign via _set_current_folder_ids
+        self._current_folder_key: tuple[int, ...] = ()  # sorted ids, key for _folder_show_to
+        self._msg_query: tuple[list[int], dict] | None = None  # (folder_ids, filters) being paged
         self._scan_thread: QThread | None = None
         self._scan_worker: QtScanWorker | None = None
         self._op_thread: QThread | None = None
@@ -77,6 +88,41 @@ class MainWindow(QMainWindow):
         self._is_closing = False
         self._special_view: callable | None = None  # re-run after delete/move
         self._folder_show_to: dict[tuple[int, ...], bool] = {}  # folder_ids → show_to
+        self._all_mail_id_cache: dict[int, int | None] = {}  # account_id → All Mail folder id
+        self._folders_cache: list[Folder] | None = None  # current account's folders
+        self._folder_by_id: dict[int, Folder] = {}  # built alongside _folders_cache
+        # path prefix ("" or "a/b/") -> direct child segment -> folders under it
+        self._folder_levels: dict[str, dict[str, list[Folder]]] = {}
+        self._folder_by_name: dict[str, Folder] = {}
+        self._folder_name_map_cache: dict[int, dict[int, str]] = {}  # account_id → {folder_id: name}
+        self._refresh_ctx: dict[tuple, object] | None = None  # see _shared_refresh
+        # Folder list + quota fetches run on a background thread started on first use
+        self._server_state_thread: QThread | None = None
+        self._server_state_worker: FolderListWorker | None = None
+        self._server_state_request_id = 0  # results tagged with an older id are stale
+
+        # Treemap rebuilds run on the next event-loop tick so the message table
+        # paints first; restarting an active timer collapses repeat requests.
+        self._treemap_timer = QTimer(self)
+        self._treemap_timer.setSingleShot(True)
+        self._treemap_timer.setInterval(0)
+        self._treemap_timer.timeout.connect(self._refresh_treemap)
+        # Folders finishing mid-scan refresh the treemap and size label (and
+        # batches the paged message table) at most once per interval instead
+        # of once per folder or batch
+        self._scan_refresh_timer = QTimer(self)
+        self._scan_refresh_timer.setSingleShot(True)
+        self._scan_refresh_timer.setInterval(200)
+        self._scan_refresh_timer.timeout.connect(self._refresh_scan_views)
+        self._scan_pages_stale = False  # scan batches landed in the paged query
+        self._scan_label = ""  # folder(s) the scan is working on
+        self._scan_progress = (0, 0)  # (done, total) summed over the scan's folders
+        self._scan_folders_stale = False  # scanned folders changed the treemap totals
+        # Sender/receiver aggregation runs on a background thread started on first use
+        self._treemap_thread: QThread | None = None
+        self._treemap_worker: TreemapWorker | None = None
+        self._treemap_request_id = 0  # results tagged with an older id are stale
+        self._treemap_summary_key = ""  # email column of the pending summary rows
 
         self._build_ui()
         self._load_accounts()
@@ -262,31 +308,75 @@ class MainWindow(QMainWindow):
         acc = self._account_combo.itemData(idx)
         if isinstance(acc, Account):
             self._current_account = acc
-            self._fetch_folder_list()
-            self._fetch_quota()
-            self._refresh_folder_panel()
-            self._refresh_treemap()
-            self._reload_messages()
-            self._refresh_size_label()
-            self._update_correspondent_column()
+            self._folders_cache = None
+            self._quota_usage = self._quota_bytes = None
+            self._fetch_server_state()  # paint from the DB now; server state follows
+            with self._shared_refresh():
+                totals = self._refresh_folder_panel()
+                self._reload_messages()
+                self._schedule_treemap_refresh()
+                self._refresh_size_label(totals)
+                self._update_correspondent_column()
 
-    def _fetch_folder_list(self) -> None:
-        """Connect to the server and pull the folder list into the DB (no message fetch)."""
-        if not self._current_account or not self._current_account.id:
+    def _fetch_server_state(self) -> None:
+        """Queue a folder list and storage quota fetch on the server-state thread.
+
+        _on_server_state applies the result once the IMAP round trips finish.
+        """
+        account = self._current_account
+        if not account or not account.id:
             return
-        from mailsweep.imap.connection import IMAPConnectionError, connect, list_folders
-        try:
-            client = connect(self._current_account)
-            folder_names = list_folders(client)
-            client.logout()
-        except IMAPConnectionError as exc:
-            logger.warning("Could not fetch folder list: %s", exc)
+        if self._server_state_thread is None:
+            thread = QThread(self)
+            worker = FolderListWorker()
+            worker.moveToThread(thread)
+            self._server_state_requested.connect(worker.run)
+            self._imap_close_requested.connect(worker.close_clients)
+            worker.finished.connect(self._on_server_state)
+            thread.finished.connect(worker.deleteLater)
+            self._server_state_thread = thread
+            self._server_state_worker = worker
+            thread.start()
+        self._server_state_request_id += 1
+        self._server_state_requested.emit(self._server_state_request_id, account)
+
+    def _on_server_state(
+        self,
+        request_id: int,
+        account_id: int,
+        folder_names: list[str],
+        quota: tuple[int | None, int | None],
+    ) -> None:
+        if request_id != self._server_state_request_id or self._is_closing:
+            return  # superseded by a later account switch
+        if not self._current_account or self._current_account.id != account_id:
             return
-
+        self._quota_usage, self._quota_bytes = quota
+        with self._shared_refresh():
+            totals = None
+            if self._store_folder_list(account_id, folder_names):
+                totals = self._refresh_folder_panel()
+                self._schedule_treemap_refresh()
+            self._refresh_size_label(totals)
+
+    def _close_imap_clients(self, account_id: int | None) -> None:
+        """Have the server-state worker log out its cached clients for account_id."""
+        if self._server_state_thread is not None:
+            self._imap_close_requested.emit(account_id)
+
+    def _store_folder_list(self, account_id: int, folder_names: list[str]) -> bool:
+        """Add any server folders missing from the DB; return True if any were added."""
+        added = False
         for name in folder_names:
-            if not self._folder_repo.get_by_name(self._current_account.id, name):
-                f = Folder(account_id=self._current_account.id, name=name)
+            if not self._folder_repo.get_by_name(account_id, name):
+                f = Folder(account_id=account_id, name=name)
                 self._folder_repo.upsert(f)
+                added = True
+        if added:
+            self._all_mail_id_cache.pop(account_id, None)
+            self._folder_name_map_cache.pop(account_id, None)
+            self._folders_cache = None
+        return added
 
     def _on_add_account(self) -> None:
         dlg = AccountDialog(self)
@@ -306,6 +396,8 @@ class MainWindow(QMainWindow):
         dlg = AccountDialog(self, self._current_account)
         if dlg.exec() == QDialog.DialogCode.Accepted:
             self._account_repo.upsert(dlg.get_account())
+            if self._current_account.id is not None:
+                self._close_imap_clients(self._current_account.id)  # credentials may have changed
             self._load_accounts()
 
     def _on_remove_account(self) -> None:
@@ -320,17 +412,90 @@ class MainWindow(QMainWindow):
         if reply == QMessageBox.StandardButton.Yes:
             assert self._current_account.id is not None
             self._account_repo.delete(self._current_account.id)
+            self._close_imap_clients(self._current_account.id)
+            self._all_mail_id_cache.pop(self._current_account.id, None)
+            self._folder_name_map_cache.pop(self._current_account.id, None)
             self._current_account = None
+            self._folders_cache = None
             self._load_accounts()
 
     # ── Folder panel ──────────────────────────────────────────────────────────
 
+    @contextmanager
+    def _shared_refresh(self) -> Iterator[None]:
+        """Let the refresh methods called inside share query results.
+
+        Panels refreshed together often ask for the same aggregate (the folder
+        panel and size label both need the deduplicated mailbox total); inside
+        this block each distinct query runs once.  Painting is suspended for
+        the block too, so the panels' model resets land in a single repaint.
+        """
+        self._refresh_ctx = {}
+        repaint = self.updatesEnabled()
+        self.setUpdatesEnabled(False)
+        try:
+            yield
+        finally:
+            self._refresh_ctx = None
+            if repaint:
+                self.setUpdatesEnabled(True)
+
+    def _mailbox_totals(self) -> tuple[int, int]:
+        """Return the current account's deduplicated (size, count).
+
+        Covers the same folders as _filter_folders(), memoized for the
+        duration of a _shared_refresh.
+        """
+        if not self._current_account or not self._current_account.id:
+            return 0, 0
+        exclude = self._find_all_mail_id() if cfg.SKIP_ALL_MAIL else None
+        key = ("totals", self._current_account.id, exclude)
+        ctx = self._refresh_ctx
+        if ctx is not None and key in ctx:
+            return ctx[key]
+        totals = self._msg_repo.get_account_totals(self._current_account.id, exclude)
+        result = totals["dedup_size"], totals["dedup_count"]
+        if ctx is not None:
+            ctx[key] = result
+        return result
+
+    def _all_folders(self) -> list[Folder]:
+        """Return the current account's folders, fetching them on first use.
+
+        Set _folders_cache to None wherever folder rows change; the next call
+        refetches and rebuilds the by-id, by-name and path-level indexes from
+        the same pass.
+        """
+        if self._folders_cache is None:
+            if not self._current_account or not self._current_account.id:
+                return []
+            folders = self._folder_repo.get_by_account(self._current_account.id)
+            self._folders_cache = folders
+            self._folder_by_id = {f.id: f for f in folders if f.id is not None}
+            self._folder_by_name = {f.name: f for f in folders}
+            levels: dict[str, dict[str, list[Folder]]] = {}
+            for f in folders:
+                # Register f under every ancestor prefix: "a/b/c" lands in
+                # levels[""]["a"], levels["a/"]["b"] and levels["a/b/"]["c"]
+                prefix = ""
+                for segment in f.name.split("/"):
+                    levels.setdefault(prefix, {}).setdefault(segment, []).append(f)
+                    prefix += segment + "/"
+            self._folder_levels = levels
+        return self._folders_cache
+
     def _find_all_mail_id(self) -> int | None:
-        """Return the All Mail folder ID for the current account, or None."""
+        """Return the All Mail folder ID for the current account, or None.
+
+        Cached per account; folder-list syncs and account removal drop the entry.
+        """
         if not self._current_account or not self._current_account.id:
             return None
-        f = self._folder_repo.find_all_mail_folder(self._current_account.id)
-        return f.id if f and f.id is not None else None
+        account_id = self._current_account.id
+        if account_id not in self._all_mail_id_cache:
+            f = self._folder_repo.find_all_mail_folder(account_id)
+            self._all_mail_id_cache[account_id] = f.id if f and f.id is not None else None
+        return self._all_mail_id_cache[account_id]
 
     def _filter_folders(self, folders: list[Folder]) -> list[Folder]:
         """Remove All Mail from the list when SKIP_ALL_MAIL is enabled."""
@@ -346,32 +511,38 @@ class MainWindow(QMainWindow):
         am_id = self._find_all_mail_id()
         return [fid for fid in folder_ids if fid != am_id] if am_id is not None else folder_ids
 
-    def _refresh_folder_panel(self) -> None:
+    def _refresh_folder_panel(self) -> tuple[int, int] | None:
+        """Repopulate the folder tree; return the (size, count) mailbox totals it showed.
+
+        Pass the totals on to _refresh_size_label so it need not recompute them.
+        """
         if not self._current_account:
-            return
+            return None
         assert self._current_account.id is not None
-        folders = self._folder_repo.get_by_account(self._current_account.id)
+        self._folders_cache = None
+        folders = self._all_folders()
         display_folders = self._filter_folders(folders)
         folder_ids = [f.id for f in display_folders if f.id is not None]
-        dedup_size, dedup_count = self._msg_repo.get_dedup_total_size(folder_ids) if folder_ids else (0, 0)
+        dedup_size, dedup_count = self._mailbox_totals()
 
         # Compute unlabelled stats for Gmail accounts (only when All Mail is enabled)
         unlabelled_stats: tuple[int, int] | None = None
         if not cfg.SKIP_ALL_MAIL:
-            all_mail = self._folder_repo.find_all_mail_folder(self._current_account.id)
-            if all_mail and all_mail.id is not None:
-                other_ids = [fid for fid in folder_ids if fid != all_mail.id]
-                count, size = self._msg_repo.get_unlabelled_stats(all_mail.id, other_ids, mode=cfg.UNLABELLED_MODE)
+            am_id = self._find_all_mail_id()
+            if am_id is not None:
+                other_ids = [fid for fid in folder_ids if fid != am_id]
+                count, size = self._msg_repo.get_unlabelled_stats(am_id, other_ids, mode=cfg.UNLABELLED_MODE)
                 unlabelled_stats = (count, size)
 
         self._folder_panel.populate(display_folders, dedup_total=dedup_size, unlabelled_stats=unlabelled_stats)
+        return dedup_size, dedup_count
 
     def _on_folder_selected(self, folder_ids: list[int]) -> None:
-        self._current_folder_ids = folder_ids
+        self._set_current_folder_ids(folder_ids)
         self._special_view = None
         self._update_correspondent_column()
         self._reload_messages()
-        self._refresh_treemap()
+        self._schedule_treemap_refresh()
 
     _SENT_NAMES = {"sent", "sent mail", "sent items"}
 
@@ -381,8 +552,12 @@ class MainWindow(QMainWindow):
             return False
         if folder_ids == [UNLABELLED_ID]:
             return False
+        by_id = self._folder_by_id
+        missing = [fid for fid in folder_ids if fid not in by_id]
+        if missing:
+            by_id = {**by_id, **{f.id: f for f in self._folder_repo.get_by_ids(missing)}}
         for fid in folder_ids:
-            folder = self._folder_repo.get_by_id(fid)
+            folder = by_id.get(fid)
             if not folder:
                 return False
             # Check the leaf name (last path component) and full name
@@ -392,8 +567,12 @@ class MainWindow(QMainWindow):
                 return False
         return True
 
+    def _set_current_folder_ids(self, folder_ids: list[int]) -> None:
+        self._current_folder_ids = folder_ids
+        self._current_folder_key = tuple(sorted(folder_ids))
+
     def _update_correspondent_column(self) -> None:
-        key = tuple(sorted(self._current_folder_ids))
+        key = self._current_folder_key
         if key in self._folder_show_to:
             show_to = self._folder_show_to[key]
         else:
@@ -402,13 +581,13 @@ class MainWindow(QMainWindow):
 
     def _on_show_to_toggled(self, show_to: bool) -> None:
         """Remember the user's manual From/To choice for the current folder."""
-        key = tuple(sorted(self._current_folder_ids))
-        self._folder_show_to[key] = show_to
+        self._folder_show_to[self._current_folder_key] = show_to
 
     # ── Message table ─────────────────────────────────────────────────────────
 
     def _reload_messages(self) -> None:
         self._msg_table.set_show_role(False)
+        self._msg_query = None
         if not self._current_account:
             self._msg_table.clear()
             return
@@ -427,13 +606,36 @@ class MainWindow(QMainWindow):
             folder_ids = self._current_folder_ids
         else:
             # All folders for this account
-            folders = self._folder_repo.get_by_account(self._current_account.id)
+            folders = self._all_folders()
             folder_ids = self._filter_folder_ids([f.id for f in folders if f.id is not None])
 
         filter_kwargs = self._filter_bar.get_filter_kwargs()
-        messages = self._msg_repo.query_messages(folder_ids=folder_ids, **filter_kwargs)
-        self._msg_table.set_messages(messages)
-        self._update_status(f"{len(messages)} messages")
+        total = self._msg_repo.count_messages(
+            folder_ids=folder_ids, limit=cfg.MESSAGE_TABLE_MAX_ROWS, **filter_kwargs,
+        )
+        msg_repo = self._msg_repo
+
+        def load_page(offset: int, limit: int, order_by: str) -> list[Message]:
+            return msg_repo.query_messages(
+                folder_ids=folder_ids, order_by=order_by, offset=offset, limit=limit,
+                **filter_kwargs,
+            )
+
+        self._msg_table.set_message_pages(load_page, total)
+        self._msg_query = (folder_ids, filter_kwargs)
+        self._update_status(f"{total} messages")
+
+    def _select_message(self, folder_id: int, uid: int) -> bool:
+        """Select the folder's uid in the message table, locating its row in SQL when paging."""
+        row = None
+        # get_message_position counts rows in the default (size) order only
+        if self._msg_query is not None and self._msg_table.page_order == DEFAULT_PAGE_ORDER:
+            folder_ids, filter_kwargs = self._msg_query
+            row = self._msg_repo.get_message_position(
+                folder_id, uid, folder_ids=folder_ids, limit=cfg.MESSAGE_TABLE_MAX_ROWS,
+                **filter_kwargs,
+            )
+        return self._msg_table.select_by_uid(uid, folder_id, row)
 
     def _on_filter_changed(self, kwargs: dict) -> None:
         self._reload_messages()
@@ -442,13 +644,12 @@ class MainWindow(QMainWindow):
         """Query messages that exist only in All Mail (no other labels)."""
         if not self._current_account or not self._current_account.id:
             return []
-        all_mail = self._folder_repo.find_all_mail_folder(self._current_account.id)
-        if not all_mail or all_mail.id is None:
+        am_id = self._find_all_mail_id()
+        if am_id is None:
             return []
-        folders = self._folder_repo.get_by_account(self._current_account.id)
-        other_ids = [f.id for f in folders if f.id is not None and f.id != all_mail.id]
+        other_ids = [f.id for f in self._all_folders() if f.id is not None and f.id != am_id]
         return self._msg_repo.query_unlabelled_messages(
-            all_mail.id, other_ids, mode=cfg.UNLABELLED_MODE, **filter_kwargs
+            am_id, other_ids, mode=cfg.UNLABELLED_MODE, **filter_kwargs
         )
 
     # ── Treemap ───────────────────────────────────────────────────────────────
@@ -459,11 +660,17 @@ class MainWindow(QMainWindow):
             return self._current_folder_ids
         if not self._current_account or not self._current_account.id:
             return []
-        folders = self._folder_repo.get_by_account(self._current_account.id)
-        return self._filter_folder_ids([f.id for f in folders if f.id is not None])
+        return self._filter_folder_ids([f.id for f in self._all_folders() if f.id is not None])
+
+    def _schedule_treemap_refresh(self) -> None:
+        """Rebuild the treemap once control returns to the event loop."""
+        if not self._treemap_timer.isActive():
+            self._treemap_timer.start()
 
     def _refresh_treemap(self) -> None:
-        if not self._current_account:
+        self._treemap_timer.stop()  # a direct refresh satisfies any pending one
+        self._treemap_request_id += 1  # supersede any summary still in flight
+        if not self._current_account or self._is_closing:
             return
         assert self._current_account.id is not None
         mode = self._treemap.view_mode
@@ -475,9 +682,9 @@ class MainWindow(QMainWindow):
                 messages = self._query_unlabelled(order_by="size_bytes DESC", limit=200)
                 items = [
                     TreemapItem(
-                        key=f"msg:{m.uid}",
+                        key=f"msg:{m.folder_id}:{m.uid}",
                         label=m.subject or "(no subject)",
-                        sublabel=m.from_addr.split("<")[-1].rstrip(">") if m.from_addr and "<" in m.from_addr else (m.from_addr or ""),
+                        sublabel=m.sender_email,
                         size_bytes=m.size_bytes,
                     )
                     for m in messages if m.size_bytes > 0
@@ -485,46 +692,20 @@ class MainWindow(QMainWindow):
             else:
                 items = self._treemap_folder_items()
 
-        elif mode == VIEW_SENDERS:
-            if is_unlabelled:
-                messages = self._query_unlabelled(order_by="size_bytes DESC", limit=5000)
-                items = self._aggregate_messages_by_field(messages, "from_addr")
-            else:
-                folder_ids = self._get_active_folder_ids()
-                rows = self._msg_repo.get_sender_summary(folder_ids=folder_ids or None)
-                items = [
-                    TreemapItem(
-                        key=row["sender_email"],
-                        label=row["sender_email"],
-                        sublabel=f"{row['message_count']} msgs",
-                        size_bytes=row["total_size_bytes"],
-                    )
-                    for row in rows if row["total_size_bytes"] > 0
-                ]
-
-        elif mode == VIEW_RECEIVERS:
-            if is_unlabelled:
-                messages = self._query_unlabelled(order_by="size_bytes DESC", limit=5000)
-                items = self._aggregate_messages_by_field(messages, "to_addr")
-            else:
-                folder_ids = self._get_active_folder_ids()
-                rows = self._msg_repo.get_receiver_summary(folder_ids=folder_ids or None)
-                items = [
-                    TreemapItem(
-                        key=row["receiver_email"],
-                        label=row["receiver_email"],
-                        sublabel=f"{row['message_count']} msgs",
-                        size_bytes=row["total_size_bytes"],
-                    )
-                    for row in rows if row["total_size_bytes"] > 0
-                ]
+        elif mode in (VIEW_SENDERS, VIEW_RECEIVERS):
+            # Aggregation can scan the whole mailbox; items arrive via _on_treemap_summary
+            self._request_treemap_summary(mode == VIEW_RECEIVERS, is_unlabelled)
+            return
 
         elif mode == VIEW_MESSAGES:
             if is_unlabelled:
-                messages = self._query_unlabelled(order_by="size_bytes DESC", limit=200)
+                rows = [
+                    (m.uid, m.subject, m.sender_email, m.folder_id, m.size_bytes)
+                    for m in self._query_unlabelled(order_by="size_bytes DESC", limit=200)
+                ]
             else:
                 folder_ids = self._get_active_folder_ids()
-                messages = self._msg_repo.query_messages(
+                rows = self._msg_repo.query_treemap_rows(
                     folder_ids=folder_ids or None,
                     order_by="size_bytes DESC",
                     limit=200,
@@ -532,12 +713,12 @@ class MainWindow(QMainWindow):
             folder_map = self._build_folder_name_map()
             items = [
                 TreemapItem(
-                    key=str(m.uid),
-                    label=m.subject or "(no subject)",
-                    sublabel=folder_map.get(m.folder_id, ""),
-                    size_bytes=m.size_bytes,
+                    key=f"{folder_id}:{uid}",
+                    label=subject or "(no subject)",
+                    sublabel=folder_map.get(folder_id, ""),
+                    size_bytes=size,
                 )
-                for m in messages if m.size_bytes > 0
+                for uid, subject, _sender, folder_id, size in rows if size > 0
             ]
 
         else:
@@ -545,30 +726,52 @@ class MainWindow(QMainWindow):
 
         self._treemap.set_data(items)
 
-    def _aggregate_messages_by_field(
-        self, messages: list[Message], field: str,
-    ) -> list[TreemapItem]:
-        """Aggregate messages by a sender/receiver field for treemap display."""
-        import re
-        groups: dict[str, tuple[int, int]] = {}  # email → (count, size)
-        for m in messages:
-            addr = getattr(m, field) or ""
-            # Extract email from "Name <email>" format
-            match = re.search(r"<([^>]+)>", addr)
-            email = match.group(1).lower() if match else addr.lower()
-            count, size = groups.get(email, (0, 0))
-            groups[email] = (count + 1, size + m.size_bytes)
-        items = [
+    def _request_treemap_summary(self, receivers: bool, is_unlabelled: bool) -> None:
+        """Queue a sender/receiver aggregation on the treemap worker thread."""
+        folder_ids: list[int] | None = None
+        unlabelled: tuple[int, list[int], str] | None = None
+        if is_unlabelled:
+            am_id = self._find_all_mail_id()
+            if am_id is None:
+                self._treemap.set_data([])
+                return
+            other_ids = [f.id for f in self._all_folders() if f.id is not None and f.id != am_id]
+            unlabelled = (am_id, other_ids, cfg.UNLABELLED_MODE)
+        else:
+            folder_ids = self._get_active_folder_ids() or None
+
+        if self._treemap_thread is None:
+            thread = QThread(self)
+            worker = TreemapWorker(self._msg_repo)
+            worker.moveToThread(thread)
+            self._treemap_summary_requested.connect(worker.run)
+            worker.summary_ready.connect(self._on_treemap_summary)
+            thread.finished.connect(worker.deleteLater)
+            self._treemap_thread = thread
+            self._treemap_worker = worker
+            thread.start()
+        self._treemap_summary_key = "receiver_email" if receivers else "sender_email"
+        self._treemap_summary_requested.emit(
+            self._treemap_request_id, receivers, folder_ids, unlabelled,
+        )
+
+    def _on_treemap_summary(self, request_id: int, rows: list) -> None:
+        if request_id != self._treemap_request_id or self._is_closing:
+            return  # the view changed while this query ran
+        self._treemap.set_data(self._summary_items(rows, self._treemap_summary_key))
+
+    @staticmethod
+    def _summary_items(rows: list[dict], email_key: str) -> list[TreemapItem]:
+        """Turn sender/receiver summary rows into treemap items."""
+        return [
             TreemapItem(
-                key=email,
-                label=email,
-                sublabel=f"{count} msgs",
-                size_bytes=size,
+                key=row[email_key],
+                label=row[email_key],
+                sublabel=f"{row['message_count']} msgs",
+                size_bytes=row["total_size_bytes"],
             )
-            for email, (count, size) in groups.items() if size > 0
+            for row in rows if row["total_size_bytes"] > 0
         ]
-        items.sort(key=lambda x: x.size_bytes, reverse=True)
-        return items
 
     def _treemap_folder_items(self) -> list[TreemapItem]:
         """Build treemap items for Folders view with drill-down support.
@@ -578,26 +781,25 @@ class MainWindow(QMainWindow):
         - Leaf folder selected → show top messages by size
         """
         assert self._current_account and self._current_account.id
-        all_folders = self._filter_folders(self._folder_repo.get_by_account(self._current_account.id))
+        self._all_folders()  # make sure the path-level index is built
 
         if not self._current_folder_ids:
             # Show top-level: group by first path component
-            return self._treemap_folder_level(all_folders, prefix="")
+            return self._treemap_folder_level(prefix="")
 
         # A specific folder is selected — find it
-        selected = self._folder_repo.get_by_id(self._current_folder_ids[0])
+        selected = self._folder_by_id.get(self._current_folder_ids[0])
         if not selected:
-            return self._treemap_folder_level(all_folders, prefix="")
+            return self._treemap_folder_level(prefix="")
 
         # Find direct children of this folder
-        child_items = self._treemap_folder_level(all_folders, prefix=selected.name + "/")
+        child_items = self._treemap_folder_level(prefix=selected.name + "/")
 
         if child_items:
             return child_items
 
         # Leaf folder — show top messages by size
-        folder_map = self._build_folder_name_map()
-        messages = self._msg_repo.query_messages(
+        rows = self._msg_repo.query_treemap_rows(
             folder_ids=self._current_folder_ids,
             order_by="size_bytes DESC",
             limit=200,
@@ -605,42 +807,40 @@ class MainWindow(QMainWindow):
         # Tag these with "msg:" prefix so click handler knows they're messages
         return [
             TreemapItem(
-                key=f"msg:{m.uid}",
-                label=m.subject or "(no subject)",
-                sublabel=m.from_addr.split("<")[-1].rstrip(">") if "<" in m.from_addr else m.from_addr,
-                size_bytes=m.size_bytes,
+                key=f"msg:{folder_id}:{uid}",
+                label=subject or "(no subject)",
+                sublabel=sender_email,
+                size_bytes=size,
             )
-            for m in messages if m.size_bytes > 0
+            for uid, subject, sender_email, folder_id, size in rows if size > 0
         ]
 
-    def _treemap_folder_level(
-        self, all_folders: list[Folder], prefix: str
-    ) -> list[TreemapItem]:
+    def _treemap_folder_level(self, prefix: str) -> list[TreemapItem]:
         """Return treemap items for direct children at a given folder path level.
 
         Groups child folders that are themselves parents into a single tile
-        whose size is the sum of all descendants.
+        whose size is the sum of all descendants.  Reads the path-level index
+        built by _all_folders(), so only folders under prefix are visited.
         """
-        # Collect direct children (one level below prefix)
-        children: dict[str, list[Folder]] = {}
-        for f in all_folders:
-            if not f.name.startswith(prefix):
-                continue
-            rest = f.name[len(prefix):]
-            if not rest:
-                continue  # skip the folder itself
-            top = rest.split("/")[0]
-            children.setdefault(top, []).append(f)
+        skip_id = self._find_all_mail_id() if cfg.SKIP_ALL_MAIL else None
+        children = self._folder_levels.get(prefix, {})
 
         items: list[TreemapItem] = []
         for child_name, group in children.items():
+            if skip_id is not None:
+                group = [f for f in group if f.id != skip_id]
+                if not group:
+                    continue
             full_path = prefix + child_name
             total_size = sum(f.total_size_bytes for f in group)
             total_msgs = sum(f.message_count for f in group)
             if total_size <= 0:
                 continue
-            # Find the folder ID for this exact path (may be a namespace with no ID)
-            exact = next((f for f in group if f.name == full_path), None)
+            # The folder whose path is exactly the child (absent for
+            # namespace-only paths)
+            exact = self._folder_by_name.get(full_path)
+            if exact is not None and exact.id == skip_id:
+                exact = None
             key = str(exact.id) if exact and exact.id is not None else f"path:{full_path}"
             is_group = len(group) > 1 or (exact is None)
             sublabel = f"{total_msgs:,} msgs" if total_msgs else ""
@@ -656,27 +856,27 @@ class MainWindow(QMainWindow):
 
     def _on_treemap_folder_clicked(self, folder_id: int) -> None:
         """Handle click on a treemap tile that has a real folder_id."""
-        self._current_folder_ids = [folder_id]
+        self._set_current_folder_ids([folder_id])
         self._folder_panel.select_folder(folder_id)
         self._reload_messages()
-        self._refresh_treemap()  # drill down into this folder
+        self._schedule_treemap_refresh()  # drill down into this folder
 
     def _on_treemap_folder_key_clicked(self, key: str) -> None:
         """Handle clicks on treemap tiles with special keys (path: or msg:)."""
         if key.startswith("msg:"):
-            # Message tile in a leaf folder drill-down
+            # Message tile in a leaf folder drill-down: "msg:folder_id:uid"
             try:
-                uid = int(key[4:])
+                folder_id, uid = (int(part) for part in key[4:].split(":"))
                 self._filter_bar.clear_filters()
                 self._reload_messages()
-                self._msg_table.select_by_uid(uid)
+                self._select_message(folder_id, uid)
             except ValueError:
                 pass
         elif key.startswith("path:"):
             # Namespace folder (e.g. "[Gmail]") — find a child folder to select
             path = key[5:]
             if self._current_account and self._current_account.id:
-                all_folders = self._folder_repo.get_by_account(self._current_account.id)
+                all_folders = self._all_folders()
                 # Find any child folder to get its ID for selection
                 children = [f for f in all_folders
                             if f.name.startswith(path + "/") and f.id is not None]
@@ -684,13 +884,13 @@ class MainWindow(QMainWindow):
                     # Select the namespace folder by finding its exact entry
                     exact = next((f for f in all_folders if f.name == path and f.id is not None), None)
                     if exact:
-                        self._current_folder_ids = [exact.id]
+                        self._set_current_folder_ids([exact.id])
                         self._folder_panel.select_folder(exact.id)
                     else:
                         # No exact folder — use all children as the scope
-                        self._current_folder_ids = [f.id for f in children]
+                        self._set_current_folder_ids([f.id for f in children])
                     self._reload_messages()
-                    self._refresh_treemap()
+                    self._schedule_treemap_refresh()
 
     def _on_treemap_sender_clicked(self, from_addr: str) -> None:
         self._filter_bar.set_from_filter(from_addr)
@@ -700,11 +900,11 @@ class MainWindow(QMainWindow):
         self._filter_bar.set_to_filter(to_addr)
         self._reload_messages()
 
-    def _on_treemap_message_clicked(self, uid: int) -> None:
+    def _on_treemap_message_clicked(self, folder_id: int, uid: int) -> None:
         # Clear filters so the message is visible in the table, then select it
         self._filter_bar.clear_filters()
         self._reload_messages()
-        if not self._msg_table.select_by_uid(uid):
+        if not self._select_message(folder_id, uid):
             self._update_status(f"Message UID {uid} not found in current view")
 
     def _on_treemap_view_changed(self, mode: int) -> None:
@@ -749,6 +949,9 @@ class MainWindow(QMainWindow):
             if db_folder.name not in server_names:
                 logger.info("Pruning deleted folder: %s", db_folder.name)
                 self._folder_repo.delete(db_folder.id)
+        self._all_mail_id_cache.pop(self._current_account.id, None)
+        self._folder_name_map_cache.pop(self._current_account.id, None)
+        self._folders_cache = None
 
         self._refresh_folder_panel()
         self._start_scan(self._filter_folders(folders))
@@ -832,6 +1035,9 @@ class MainWindow(QMainWindow):
             if db_folder.name not in server_names:
                 logger.info("Pruning deleted folder: %s", db_folder.name)
                 self._folder_repo.delete(db_folder.id)
+        self._all_mail_id_cache.pop(self._current_account.id, None)
+        self._folder_name_map_cache.pop(self._current_account.id, None)
+        self._folders_cache = None
 
         self._refresh_folder_panel()
         self._start_scan(self._filter_folders(folders), force_full=True)
@@ -839,6 +1045,7 @@ class MainWindow(QMainWindow):
     def _start_scan(self, folders: list[Folder], force_full: bool = False) -> None:
         """Common scan launcher used by both Scan All and Scan Selected."""
         assert self._current_account is not None
+        self._scan_progress = (0, 0)
         self._scan_btn.setEnabled(False)
         self._scan_selected_btn.setEnabled(False)
 
@@ -867,30 +1074,71 @@ class MainWindow(QMainWindow):
         self._scan_thread = thread
         thread.start()
 
-    def _on_scan_folder_started(self, folder_name: str) -> None:
-        self._progress_panel.set_running(f"Scanning {folder_name}…")
+    def _on_scan_folder_started(self, label: str) -> None:
+        self._scan_label = label
+        if self._scan_progress[1] > 0:
+            self._show_scan_progress()
+        else:
+            self._progress_panel.set_running(f"Scanning {label}…")
+
+    def _show_scan_progress(self) -> None:
+        done, total = self._scan_progress
+        self._progress_panel.set_progress(
+            done, total, f"Scanning {self._scan_label}… {done}/{total}",
+        )
 
     def _on_scan_batch(self, messages: list[Message], done: int, total: int) -> None:
         if messages:
-            self._msg_table.append_messages(messages)
+            if self._msg_query is None:
+                self._msg_table.append_messages(messages)
+            else:
+                # Already upserted, so the paged query will return them; appending
+                # would duplicate rows and shift every later page's OFFSET
+                self._scan_pages_stale = True
+                if not self._scan_refresh_timer.isActive():
+                    self._scan_refresh_timer.start()
         if total > 0:
-            self._progress_panel.set_progress(done, total, f"Scanning… {done}/{total}")
+            self._scan_progress = (done, total)
+            self._show_scan_progress()
 
     def _on_scan_folder_done(self, folder: Folder) -> None:
+        self._folders_cache = None
         self._folder_panel.update_folder_size(folder.id, folder.total_size_bytes)
-        self._refresh_treemap()
-        self._refresh_size_label()
+        self._scan_folders_stale = True
+        if not self._scan_refresh_timer.isActive():
+            self._scan_refresh_timer.start()
+
+    def _refresh_scan_views(self) -> None:
+        """Catch the message pages, treemap and size label up with the scan so far."""
+        if self._is_closing:
+            return
+        if self._scan_pages_stale and self._msg_query is not None:
+            folder_ids, filter_kwargs = self._msg_query
+            total = self._msg_repo.count_messages(
+                folder_ids=folder_ids, limit=cfg.MESSAGE_TABLE_MAX_ROWS, **filter_kwargs,
+            )
+            self._msg_table.refresh_pages(total)
+            self._update_status(f"{total} messages")
+        self._scan_pages_stale = False
+        if self._scan_folders_stale:
+            self._scan_folders_stale = False
+            with self._shared_refresh():
+                self._refresh_treemap()
+                self._refresh_size_label()
 
     def _on_scan_all_done(self) -> None:
+        self._scan_refresh_timer.stop()  # the full refresh below supersedes it
+        self._scan_pages_stale = self._scan_folders_stale = False
         self._progress_panel.set_done("Scan complete")
         self._scan_btn.setEnabled(True)
         self._scan_selected_btn.setEnabled(True)
         self._scan_worker = None
         self._scan_thread = None
-        self._reload_messages()
-        self._refresh_folder_panel()
-        self._refresh_treemap()
-        self._refresh_size_label()
+        with self._shared_refresh():
+            self._reload_messages()
+            totals = self._refresh_folder_panel()
+            self._refresh_treemap()
+            self._refresh_size_label(totals)
 
     def _on_scan_error(self, msg: str) -> None:
         self._progress_panel.set_error(msg)
@@ -912,10 +1160,20 @@ class MainWindow(QMainWindow):
         return selected
 
     def _build_folder_name_map(self) -> dict[int, str]:
+        """Return {folder_id: name} for the current account.
+
+        Cached per account and only dropped when folders are added, pruned or
+        the account is removed, so stat-only updates during scans keep it.
+        """
         if not self._current_account or not self._current_account.id:
             return {}
-        folders = self._folder_repo.get_by_account(self._current_account.id)
-        return {f.id: f.name for f in folders if f.id is not None}
+        account_id = self._current_account.id
+        name_map = self._folder_name_map_cache.get(account_id)
+        if name_map is None:
+            self._all_folders()
+            name_map = {fid: f.name for fid, f in self._folder_by_id.items()}
+            self._folder_name_map_cache[account_id] = name_map
+        return name_map
 
     def _on_extract_messages(self, messages: list[Message]) -> None:
         """Context menu handler for extract attachments."""
@@ -1223,6 +1481,7 @@ class MainWindow(QMainWindow):
             for folder_id, uids in self._op_processed.items():
                 self._msg_repo.delete_uids(folder_id, uids)
                 self._folder_repo.update_stats(folder_id)
+            self._folders_cache = None
         self._op_processed = {}
 
         if self._op_needs_rescan and affected_folder_ids:
@@ -1235,13 +1494,14 @@ class MainWindow(QMainWindow):
                 self._start_scan(folders)
                 return  # _on_scan_all_done will refresh UI
 
-        if self._special_view:
-            self._special_view()
-        else:
-            self._reload_messages()
-        self._refresh_folder_panel()
-        self._refresh_treemap()
-        self._refresh_size_label()
+        with self._shared_refresh():
+            if self._special_view:
+                self._special_view()
+            else:
+                self._reload_messages()
+            totals = self._refresh_folder_panel()
+            self._refresh_treemap()
+            self._refresh_size_label(totals)
 
     # ── Find Detached Duplicates ─────────────────────────────────────────────
 
@@ -1391,7 +1651,7 @@ class MainWindow(QMainWindow):
             return
         from mailsweep.ai.context import build_mailbox_context
         ctx = build_mailbox_context(
-            self._conn,
+            self._db.get(),
             account_id=self._current_account.id,
             folder_ids=self._current_folder_ids if self._current_folder_ids else None,
         )
@@ -1405,9 +1665,9 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "No Account", "No account selected.")
             return
 
-        # Build folder name → id map
-        folders = self._folder_repo.get_by_account(self._current_account.id)
-        name_to_id = {f.name: f.id for f in folders if f.id is not None}
+        # Folder name → Folder, from the index _all_folders() keeps
+        self._all_folders()
+        folder_by_name = self._folder_by_name
 
         # Resolve each AI suggestion (sender + src_folder) to concrete MoveOps
         from mailsweep.workers.move_worker import MoveOp
@@ -1415,11 +1675,12 @@ class MainWindow(QMainWindow):
         ops: list[MoveOp] = []
         summary_lines: list[str] = []
         for ai_op in ai_ops:
-            src_id = name_to_id.get(ai_op.src_folder)
-            if src_id is None:
+            src_folder = folder_by_name.get(ai_op.src_folder)
+            if src_folder is None or src_folder.id is None:
                 summary_lines.append(f"  SKIP: folder \"{ai_op.src_folder}\" not found")
                 continue
-            if ai_op.dst_folder not in name_to_id:
+            src_id = src_folder.id
+            if ai_op.dst_folder not in folder_by_name:
                 summary_lines.append(f"  SKIP: destination \"{ai_op.dst_folder}\" not found")
                 continue
             messages = self._msg_repo.query_messages(
@@ -1464,12 +1725,11 @@ class MainWindow(QMainWindow):
         worker.moveToThread(thread)
 
         account = self._current_account
-        conn = self._conn
         folder_repo = self._folder_repo
         msg_repo = self._msg_repo
 
         thread.started.connect(
-            lambda: worker.run(account, ops, conn, folder_repo, msg_repo)
+            lambda: worker.run(account, ops, folder_repo, msg_repo)
         )
         worker.progress.connect(
             lambda done, total, msg: self._progress_panel.set_progress(done, total, msg)
@@ -1489,13 +1749,15 @@ class MainWindow(QMainWindow):
         self._progress_panel.set_done(f"Moved {count} message(s)")
         self._move_thread = None
         self._move_worker = None
-        if self._special_view:
-            self._special_view()
-        else:
-            self._reload_messages()
-        self._refresh_folder_panel()
-        self._refresh_treemap()
-        self._refresh_size_label()
+        self._folders_cache = None
+        with self._shared_refresh():
+            if self._special_view:
+                self._special_view()
+            else:
+                self._reload_messages()
+            totals = self._refresh_folder_panel()
+            self._refresh_treemap()
+            self._refresh_size_label(totals)
 
     def _on_move_to_folder(self) -> None:
         """Toolbar handler: move checked/selected messages to a chosen folder."""
@@ -1560,12 +1822,11 @@ class MainWindow(QMainWindow):
         worker.moveToThread(thread)
 
         account = self._current_account
-        conn = self._conn
         folder_repo = self._folder_repo
         msg_repo = self._msg_repo
 
         thread.started.connect(
-            lambda: worker.run(account, ops, conn, folder_repo, msg_repo)
+            lambda: worker.run(account, ops, folder_repo, msg_repo)
         )
         worker.progress.connect(
             lambda done, total, msg: self._progress_panel.set_progress(done, total, msg)
@@ -1591,10 +1852,12 @@ class MainWindow(QMainWindow):
     def _update_status(self, msg: str) -> None:
         self.statusBar().showMessage(msg, 3000)
 
-    def _refresh_size_label(self) -> None:
+    def _refresh_size_label(self, mailbox_totals: tuple[int, int] | None = None) -> None:
         """Update the persistent total-size / quota label in the status bar.
 
         Shows: Google storage quota (includes Drive+Photos) | Mailbox dedup size
+        mailbox_totals is the (size, count) pair _refresh_folder_panel just
+        computed; without it the dedup total is queried here.
         """
         if not self._current_account or not self._current_account.id:
             self._size_label.setText("")
@@ -1609,45 +1872,12 @@ class MainWindow(QMainWindow):
             parts.append(f"Google: {hs(self._quota_usage)} / {hs(self._quota_bytes)} ({pct:.2f}%)")
 
         # Deduplicated mailbox size (avoids Gmail label double-counting)
-        folders = self._folder_repo.get_by_account(self._current_account.id)
-        folder_ids = self._filter_folder_ids([f.id for f in folders if f.id is not None])
-        if folder_ids:
-            dedup_size, dedup_count = self._msg_repo.get_dedup_total_size(folder_ids)
-            if dedup_size > 0:
-                parts.append(f"Mail: {hs(dedup_size)} ({dedup_count:,} msgs)")
+        dedup_size, dedup_count = mailbox_totals or self._mailbox_totals()
+        if dedup_size > 0:
+            parts.append(f"Mail: {hs(dedup_size)} ({dedup_count:,} msgs)")
 
         self._size_label.setText("  " + "  |  ".join(parts) + "  " if parts else "")
 
-    def _fetch_quota(self) -> None:
-        """Try to get IMAP QUOTA and store the limit in bytes."""
-        if not self._current_account:
-            return
-        from mailsweep.imap.connection import IMAPConnectionError, connect
-        try:
-            client = connect(self._current_account)
-            # get_quota_root returns (MailboxQuotaRoots, [Quota, ...])
-            # Quota is typically a namedtuple-like with quota_root, resource, usage, limit
-            result = client.get_quota_root("INBOX")
-            if result and len(result) >= 2:
-                quotas = result[1]  # list of Quota objects
-                for q in quotas:
-                    # q might be a tuple (root, resource, usage, limit) or have named attrs
-                    if hasattr(q, "resource") and hasattr(q, "limit"):
-                        if q.resource.upper() == "STORAGE":
-                            self._quota_usage = q.usage * 1024  # STORAGE is in KB
-                            self._quota_bytes = q.limit * 1024
-                            break
-                    elif isinstance(q, (list, tuple)) and len(q) >= 4:
-                        resource = q[1] if isinstance(q[1], str) else str(q[1])
-                        if resource.upper() == "STORAGE":
-                            self._quota_usage = int(q[2]) * 1024
-                            self._quota_bytes = int(q[3]) * 1024
-                            break
-            client.logout()
-        except Exception as exc:
-            logger.debug("Could not fetch quota: %s", exc)
-            self._quota_bytes = None
-
     def _on_about(self) -> None:
         from PyQt6.QtWidgets import QApplication, QDialogButtonBox
 
@@ -1689,7 +1919,18 @@ class MainWindow(QMainWindow):
 
     def closeEvent(self, event) -> None:
         self._is_closing = True
+        self._treemap_timer.stop()
+        self._scan_refresh_timer.stop()
+        if self._treemap_thread is not None:
+            self._treemap_thread.quit()
+            self._treemap_thread.wait()
         if self._scan_worker:
             self._scan_worker.cancel()
-        self._conn.close()
+        if self._server_state_thread is not None:
+            self._server_state_thread.quit()
+            self._server_state_thread.wait()
+            if self._server_state_worker is not None:
+                self._server_state_worker.close_clients()  # thread stopped; call directly
+        self._ai_dock.shutdown()
+        self._db.close()
         super().closeEvent(event)
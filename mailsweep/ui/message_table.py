@@ -1,8 +1,11 @@
 """Message table — QTableView + MessageTableModel + QSortFilterProxyModel."""
 from __future__ import annotations
 
+from typing import Callable
+
 from PyQt6.QtCore import (
     QAbstractTableModel,
+    QItemSelectionModel,
     QModelIndex,
     QSortFilterProxyModel,
     Qt,
@@ -30,15 +33,36 @@ COL_FOLDER = 5
 COL_ATTACHMENTS = 6
 COL_ROLE = 7
 
+FETCH_BATCH = 200  # rows materialized per fetchMore() when paging from the DB
+DEFAULT_PAGE_ORDER = "size_bytes DESC"
+# Columns the paged query can sort in SQL; the rest are sorted in the proxy
+_PAGE_ORDER_COLUMNS = {
+    COL_CORRESPONDENT: "from_addr",
+    COL_SUBJECT: "subject",
+    COL_DATE: "date",
+    COL_SIZE: "size_bytes",
+}
+
 
 class MessageTableModel(QAbstractTableModel):
-    """Model that holds a flat list of Message objects."""
+    """Model that holds a flat list of Message objects.
+
+    Rows come either from set_messages() (a ready list) or set_message_pages(),
+    which pulls FETCH_BATCH rows at a time through canFetchMore/fetchMore as
+    the view scrolls, so only the rows the user reaches are ever built.  Paged
+    rows are sorted by the loader's ORDER BY (see sort_pages()), since a
+    proxy sort would only order the pages loaded so far.
+    """
 
     def __init__(self, parent=None) -> None:
         super().__init__(parent)
         self._messages: list[Message] = []
         self._checked: set[int] = set()  # indices
         self._show_to: bool = False
+        self._page_loader: Callable[[int, int, str], list[Message]] | None = None  # (offset, limit, order_by)
+        self._page_order = DEFAULT_PAGE_ORDER
+        self._source_total = 0  # rows the page loader can supply
+        self._source_loaded = 0  # rows already pulled from it
 
     # ── QAbstractTableModel interface ─────────────────────────────────────────
 
@@ -48,6 +72,17 @@ class MessageTableModel(QAbstractTableModel):
     def columnCount(self, parent=QModelIndex()) -> int:
         return len(COLUMNS)
 
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        return (
+            not parent.isValid()
+            and self._page_loader is not None
+            and self._source_loaded < self._source_total
+        )
+
+    def fetchMore(self, parent=QModelIndex()) -> None:
+        if self.canFetchMore(parent):
+            self._fetch(FETCH_BATCH)
+
     def headerData(self, section: int, orientation: Qt.Orientation, role=Qt.ItemDataRole.DisplayRole):
         if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
             if section == COL_CORRESPONDENT:
@@ -129,8 +164,93 @@ class MessageTableModel(QAbstractTableModel):
         self.beginResetModel()
         self._messages = list(messages)
         self._checked.clear()
+        self._page_loader = None
+        self._source_total = self._source_loaded = 0
+        self.endResetModel()
+
+    def set_message_pages(
+        self, loader: Callable[[int, int, str], list[Message]], total: int,
+    ) -> None:
+        """Show total rows supplied on demand by loader(offset, limit, order_by).
+
+        Pages keep the current sort order (see sort_pages()).
+        """
+        self.beginResetModel()
+        self._messages = []
+        self._checked.clear()
+        self._page_loader = loader
+        self._source_total = total
+        self._source_loaded = 0
         self.endResetModel()
 
+    @property
+    def is_paged(self) -> bool:
+        return self._page_loader is not None
+
+    @property
+    def page_order(self) -> str:
+        """The ORDER BY the page loader is called with."""
+        return self._page_order
+
+    def sort_pages(self, column: int, order: Qt.SortOrder) -> bool:
+        """Re-page the rows in column's SQL order; False if the column has none.
+
+        Only handles paged rows; the caller sorts everything else in memory.
+        """
+        field = _PAGE_ORDER_COLUMNS.get(column)
+        if self._page_loader is None or field is None:
+            return False
+        if column == COL_CORRESPONDENT and self._show_to:
+            field = "to_addr"
+        direction = "ASC" if order == Qt.SortOrder.AscendingOrder else "DESC"
+        page_order = f"{field} {direction}"
+        if page_order != self._page_order:
+            self.beginResetModel()
+            self._page_order = page_order
+            self._messages = []
+            self._checked.clear()
+            self._source_loaded = 0
+            self.endResetModel()
+        return True
+
+    def refresh_pages(self, total: int) -> None:
+        """Re-read the loaded pages after rows were added to or removed from the query.
+
+        Keeps as many rows loaded as before and carries check marks over by
+        message id, since rows may have shifted position.
+        """
+        if self._page_loader is None:
+            return
+        checked_ids = {
+            self._messages[i].id for i in self._checked if i < len(self._messages)
+        }
+        limit = min(self._source_loaded, total)
+        self.beginResetModel()
+        self._messages = self._page_loader(0, limit, self._page_order) if limit else []
+        self._source_loaded = len(self._messages)
+        self._source_total = total if len(self._messages) == limit else self._source_loaded
+        self._checked = {i for i, m in enumerate(self._messages) if m.id in checked_ids}
+        self.endResetModel()
+
+    def fetch_all(self) -> None:
+        """Pull every remaining row from the page loader in one call."""
+        if self.canFetchMore():
+            self._fetch(self._source_total - self._source_loaded)
+
+    def fetch_through(self, row: int) -> None:
+        """Pull paged rows until source row `row` is loaded (or the pages run out)."""
+        if self.canFetchMore() and row >= self._source_loaded:
+            self._fetch(row + 1 - self._source_loaded)
+
+    def _fetch(self, limit: int) -> None:
+        assert self._page_loader is not None
+        limit = min(limit, self._source_total - self._source_loaded)
+        page = self._page_loader(self._source_loaded, limit, self._page_order)
+        self._source_loaded += len(page)
+        if len(page) < limit:
+            self._source_total = self._source_loaded  # rows vanished since counting
+        self.append_messages(page)
+
     def append_messages(self, messages: list[Message]) -> None:
         if not messages:
             return
@@ -151,6 +271,7 @@ class MessageTableModel(QAbstractTableModel):
         return messages
 
     def check_all(self) -> None:
+        self.fetch_all()
         self._checked = set(range(len(self._messages)))
         self.dataChanged.emit(
             self.index(0, COL_CHECK),
@@ -198,7 +319,7 @@ class MessageTableModel(QAbstractTableModel):
             case 2:
                 return msg.subject or ""
             case 3:
-                return msg.date.strftime("%Y-%m-%d") if msg.date else ""
+                return msg.date_iso[:10]
             case 4:
                 return human_size(msg.size_bytes)
             case 5:
@@ -213,6 +334,19 @@ class MessageTableModel(QAbstractTableModel):
         return ""
 
 
+class _MessageSortProxy(QSortFilterProxyModel):
+    """Sorts paged rows through the source model's SQL order, the rest in memory."""
+
+    def sort(self, column: int, order: Qt.SortOrder = Qt.SortOrder.AscendingOrder) -> None:
+        source = self.sourceModel()
+        if isinstance(source, MessageTableModel) and source.is_paged:
+            if source.sort_pages(column, order):
+                super().sort(-1)  # keep the source (SQL) order
+                return
+            source.fetch_all()  # no SQL order for this column — sort every row here
+        super().sort(column, order)
+
+
 class MessageTableView(QTableView):
     """
     Configured QTableView with context menu actions for bulk operations.
@@ -231,7 +365,7 @@ class MessageTableView(QTableView):
     def __init__(self, parent: QWidget | None = None) -> None:
         super().__init__(parent)
         self._model = MessageTableModel()
-        self._proxy = QSortFilterProxyModel()
+        self._proxy = _MessageSortProxy()
         self._proxy.setSourceModel(self._model)
         self._proxy.setSortCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
         self._proxy.setSortRole(Qt.ItemDataRole.UserRole + 1)
@@ -244,6 +378,8 @@ class MessageTableView(QTableView):
     def _configure_view(self) -> None:
         self.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        # Start in the order the paged query defaults to (size descending)
+        self.horizontalHeader().setSortIndicator(COL_SIZE, Qt.SortOrder.DescendingOrder)
         self.setSortingEnabled(True)
         self.setAlternatingRowColors(True)
         self.setShowGrid(False)
@@ -338,22 +474,73 @@ class MessageTableView(QTableView):
 
     def set_messages(self, messages: list[Message]) -> None:
         self._model.set_messages(messages)
+        self._resort()
+
+    def set_message_pages(
+        self, loader: Callable[[int, int, str], list[Message]], total: int,
+    ) -> None:
+        """Page total rows in from loader(offset, limit, order_by) as the view scrolls."""
+        self._model.set_message_pages(loader, total)
+        self._resort()
+
+    @property
+    def page_order(self) -> str:
+        """The ORDER BY paged rows are loaded in."""
+        return self._model.page_order
 
     def append_messages(self, messages: list[Message]) -> None:
         self._model.append_messages(messages)
 
+    def refresh_pages(self, total: int) -> None:
+        """Re-read the paged rows in place, keeping the scroll position and selection."""
+        if not self._model.is_paged:
+            return
+        selected_ids = {m.id for m in self._selected_messages()}
+        scroll = self.verticalScrollBar().value()
+        self._model.refresh_pages(total)
+        if selected_ids:
+            flags = QItemSelectionModel.SelectionFlag.Select | QItemSelectionModel.SelectionFlag.Rows
+            for row in range(self._proxy.rowCount()):
+                idx = self._proxy.index(row, 0)
+                msg = idx.data(Qt.ItemDataRole.UserRole)
+                if isinstance(msg, Message) and msg.id in selected_ids:
+                    self.selectionModel().select(idx, flags)
+        self.verticalScrollBar().setValue(scroll)
+
     def get_checked_messages(self) -> list[Message]:
         return self._model.get_checked_messages()
 
     def get_selected_messages(self) -> list[Message]:
         return self._selected_messages()
 
-    def select_by_uid(self, uid: int) -> bool:
-        """Find and select/scroll-to a message by its UID. Returns True if found."""
+    def select_by_uid(self, uid: int, folder_id: int, source_row: int | None = None) -> bool:
+        """Find and select/scroll-to a folder's message by UID. Returns True if found.
+
+        UIDs are only unique within a folder, so both must match.  source_row
+        is the message's position in the paged query when the caller already
+        knows it; only rows up to it are fetched.
+        """
+        if source_row is not None:
+            self._model.fetch_through(source_row)
+            idx = self._model.index(source_row, 0)
+            msg = idx.data(Qt.ItemDataRole.UserRole)
+            if isinstance(msg, Message) and msg.uid == uid and msg.folder_id == folder_id:
+                proxy_idx = self._proxy.mapFromSource(idx)
+                self.selectRow(proxy_idx.row())
+                self.scrollTo(proxy_idx, QAbstractItemView.ScrollHint.PositionAtCenter)
+                return True
+        if self._select_loaded_uid(uid, folder_id):
+            return True
+        if not self._model.canFetchMore():
+            return False
+        self._model.fetch_all()
+        return self._select_loaded_uid(uid, folder_id)
+
+    def _select_loaded_uid(self, uid: int, folder_id: int) -> bool:
         for row in range(self._proxy.rowCount()):
             idx = self._proxy.index(row, 0)
             msg = idx.data(Qt.ItemDataRole.UserRole)
-            if isinstance(msg, Message) and msg.uid == uid:
+            if isinstance(msg, Message) and msg.uid == uid and msg.folder_id == folder_id:
                 self.selectRow(row)
                 self.scrollTo(idx, QAbstractItemView.ScrollHint.PositionAtCenter)
                 return True
@@ -362,6 +549,13 @@ class MessageTableView(QTableView):
     def set_show_to(self, show_to: bool) -> None:
         """Toggle the correspondent column between From and To."""
         self._model.set_show_to(show_to)
+        if self._model.is_paged and self.horizontalHeader().sortIndicatorSection() == COL_CORRESPONDENT:
+            self._resort()  # the SQL order follows the shown column
+
+    def _resort(self) -> None:
+        """Apply the header's sort indicator to freshly set rows."""
+        hh = self.horizontalHeader()
+        self._proxy.sort(hh.sortIndicatorSection(), hh.sortIndicatorOrder())
 
     def _manual_toggle(self, show_to: bool) -> None:
         """User toggled via header context menu — apply and notify."""
@@ -21,7 +21,12 @@ from PyQt6.QtWidgets import (
 )
 
 import mailsweep.config as cfg
-from mailsweep.ai.providers import PROVIDER_MODELS, PROVIDER_PRESETS, fetch_model_list
+from mailsweep.ai.providers import (
+    NO_KEY_PROVIDERS,
+    PROVIDER_MODELS,
+    PROVIDER_PRESETS,
+    fetch_model_list,
+)
 
 
 class SettingsDialog(QDialog):
@@ -45,6 +50,14 @@ class SettingsDialog(QDialog):
         self._chunk_size.setSingleStep(50)
         form.addRow("Scan batch size:", self._chunk_size)
 
+        self._scan_connections = QSpinBox()
+        self._scan_connections.setRange(1, 8)
+        self._scan_connections.setToolTip(
+            "IMAP connections used in parallel when scanning several folders. "
+            "Lower this if the server limits simultaneous connections."
+        )
+        form.addRow("Scan connections:", self._scan_connections)
+
         self._max_rows = QSpinBox()
         self._max_rows.setRange(100, 50000)
         self._max_rows.setSingleStep(1000)
@@ -122,6 +135,7 @@ class SettingsDialog(QDialog):
 
     def _populate(self) -> None:
         self._chunk_size.setValue(cfg.SCAN_BATCH_SIZE)
+        self._scan_connections.setValue(cfg.SCAN_CONNECTIONS)
         self._max_rows.setValue(cfg.MESSAGE_TABLE_MAX_ROWS)
         self._save_dir_edit.setText(str(cfg.DEFAULT_SAVE_DIR))
 
@@ -156,7 +170,7 @@ class SettingsDialog(QDialog):
             self._ai_model.addItems(models)
 
     def _update_key_visibility(self) -> None:
-        hide = self._ai_provider.currentText() in ("ollama", "lm-studio")
+        hide = self._ai_provider.currentText() in NO_KEY_PROVIDERS
         self._ai_api_key_label.setVisible(not hide)
         self._ai_api_key.setVisible(not hide)
 
@@ -211,6 +225,7 @@ class SettingsDialog(QDialog):
 
     def _on_accept(self) -> None:
         cfg.SCAN_BATCH_SIZE = self._chunk_size.value()
+        cfg.SCAN_CONNECTIONS = self._scan_connections.value()
         cfg.MESSAGE_TABLE_MAX_ROWS = self._max_rows.value()
         save_path = Path(self._save_dir_edit.text().strip())
         save_path.mkdir(parents=True, exist_ok=True)
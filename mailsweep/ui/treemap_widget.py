@@ -1,6 +1,8 @@
 """Treemap widget — squarify layout painted with QPainter. Click to filter."""
 from __future__ import annotations
 
+import heapq
+from operator import attrgetter
 from typing import NamedTuple
 
 from PyQt6.QtCore import QRectF, Qt, pyqtSignal
@@ -15,6 +17,7 @@ from PyQt6.QtGui import (
 )
 from PyQt6.QtWidgets import QComboBox, QHBoxLayout, QLabel, QVBoxLayout, QWidget
 
+import mailsweep.config as cfg
 from mailsweep.utils.size_fmt import human_size
 
 try:
@@ -50,6 +53,9 @@ VIEW_SENDERS = 1
 VIEW_MESSAGES = 2
 VIEW_RECEIVERS = 3
 
+_OTHER_KEY = "other:"  # aggregate tile for items too small to draw; not clickable
+_item_size = attrgetter("size_bytes")
+
 
 class _TreemapCanvas(QWidget):
     """Internal paint surface for the treemap tiles."""
@@ -57,14 +63,24 @@ class _TreemapCanvas(QWidget):
 
     def __init__(self, parent: QWidget | None = None) -> None:
         super().__init__(parent)
-        self._items: list[TreemapItem] = []
+        self._items: list[TreemapItem] = []  # largest first, at most TREEMAP_MAX_NODES
+        self._dropped_bytes = 0  # size of the items set_data cut to stay under the cap
+        self._dropped_count = 0
         self._rects: list[tuple[QRectF, TreemapItem]] = []
         self._hovered_key: str | None = None
         self.setMinimumHeight(100)
         self.setMouseTracking(True)
 
     def set_data(self, items: list[TreemapItem]) -> None:
-        self._items = [i for i in items if i.size_bytes > 0]
+        items = [i for i in items if i.size_bytes > 0]
+        if len(items) > cfg.TREEMAP_MAX_NODES:
+            kept = heapq.nlargest(cfg.TREEMAP_MAX_NODES, items, key=_item_size)
+            self._dropped_bytes = sum(map(_item_size, items)) - sum(map(_item_size, kept))
+            self._dropped_count = len(items) - len(kept)
+            self._items = kept
+        else:
+            self._items = sorted(items, key=_item_size, reverse=True)
+            self._dropped_bytes = self._dropped_count = 0
         self._compute_rects()
         self.update()
 
@@ -73,15 +89,32 @@ class _TreemapCanvas(QWidget):
         if not self._items or not _HAS_SQUARIFY:
             return
 
-        items_sorted = sorted(self._items, key=lambda x: x.size_bytes, reverse=True)
-        values = [i.size_bytes for i in items_sorted]
-        total = sum(values)
+        total = sum(i.size_bytes for i in self._items) + self._dropped_bytes
         if total == 0:
             return
 
         w = max(self.width(), 1)
         h = max(self.height(), 1)
 
+        # Tiles that would cover less than one pixel join the "Other" tile;
+        # items are largest first, so they form a tail
+        min_bytes = total / (w * h)
+        shown = len(self._items)
+        while shown and self._items[shown - 1].size_bytes < min_bytes:
+            shown -= 1
+        items_sorted = self._items[:shown]
+        other_bytes = total - sum(i.size_bytes for i in items_sorted)
+        if other_bytes >= min_bytes:
+            other_count = len(self._items) - shown + self._dropped_count
+            items_sorted.append(TreemapItem(
+                key=_OTHER_KEY,
+                label="Other",
+                sublabel=f"{other_count:,} smaller items",
+                size_bytes=other_bytes,
+            ))
+            items_sorted.sort(key=_item_size, reverse=True)
+        values = [i.size_bytes for i in items_sorted]
+
         normalized = squarify.normalize_sizes(values, w, h)
         rects = squarify.squarify(normalized, 0, 0, w, h)
 
@@ -195,7 +228,8 @@ class _TreemapCanvas(QWidget):
             pos = event.position()
             for rect, item in self._rects:
                 if rect.contains(pos):
-                    self.item_clicked.emit(item.key)
+                    if item.key != _OTHER_KEY:
+                        self.item_clicked.emit(item.key)
                     break
         super().mousePressEvent(event)
 
@@ -206,10 +240,10 @@ class TreemapWidget(QWidget):
     Emits typed signals depending on view mode.
     """
     folder_clicked = pyqtSignal(int)     # folder_id
-    folder_key_clicked = pyqtSignal(str) # raw key (folder_id, "path:...", or "msg:...")
+    folder_key_clicked = pyqtSignal(str) # raw key (folder_id, "path:...", or "msg:folder_id:uid")
     sender_clicked = pyqtSignal(str)     # from_addr
     receiver_clicked = pyqtSignal(str)   # to_addr
-    message_clicked = pyqtSignal(int)    # message uid
+    message_clicked = pyqtSignal(int, int)  # folder_id, message uid
     view_mode_changed = pyqtSignal(int)  # VIEW_FOLDERS / VIEW_SENDERS / VIEW_MESSAGES / VIEW_RECEIVERS
 
     def __init__(self, parent: QWidget | None = None) -> None:
@@ -255,8 +289,10 @@ class TreemapWidget(QWidget):
         elif self._view_mode == VIEW_RECEIVERS:
             self.receiver_clicked.emit(key)
         elif self._view_mode == VIEW_MESSAGES:
+            # "folder_id:uid" — UIDs are only unique within a folder
+            folder_id, _, uid = key.partition(":")
             try:
-                self.message_clicked.emit(int(key))
+                self.message_clicked.emit(int(folder_id), int(uid))
             except ValueError:
                 pass
 
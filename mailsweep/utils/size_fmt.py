@@ -1,9 +1,15 @@
 """Human-readable size formatting."""
 from __future__ import annotations
 
+from functools import lru_cache
 
+
+@lru_cache(maxsize=4096)
 def human_size(num_bytes: int | float, suffix: str = "B", decimals: int = 1) -> str:
-    """Convert bytes to a human-readable string like '2.3 MB'."""
+    """Convert bytes to a human-readable string like '2.3 MB'.
+
+    Results are memoized: folder and message sizes repeat across tree and table refreshes.
+    """
     for unit in ("", "K", "M", "G", "T", "P", "E", "Z"):
         if abs(num_bytes) < 1024.0:
             if unit == "":
@@ -34,64 +34,57 @@ Rules for MOVE suggestions:
 
 
 class AiWorker(QObject):
-    """Runs LLM chat in a background thread.
+    """Runs LLM chat requests in a background thread.
 
-    Usage (moveToThread pattern — matches QtScanWorker):
-        worker = AiWorker(message, history, context, provider, url, key, model)
+    One worker serves every request from a chat panel; each request arrives
+    as a queued call to run() (moveToThread pattern — matches QtScanWorker):
+        worker = AiWorker()
         thread = QThread()
         worker.moveToThread(thread)
-        thread.started.connect(worker.run)
-        worker.finished.connect(thread.quit)
+        request_signal.connect(worker.run)
+        worker.finished.connect(on_request_done)
         ...
         thread.start()
+        request_signal.emit(message, history, context, provider, url, key, model)
     """
 
-    response_ready = pyqtSignal(str)    # AI response text
+    token_ready = pyqtSignal(str)       # next chunk of the streamed response
+    response_ready = pyqtSignal(str)    # complete AI response text
     error = pyqtSignal(str)             # error message
     thinking = pyqtSignal()             # started processing
-    finished = pyqtSignal()
+    finished = pyqtSignal()             # request done (success or error)
 
-    def __init__(
+    @pyqtSlot(str, object, str, str, str, str, str)
+    def run(
         self,
         user_message: str,
-        history: list[dict],
+        history: tuple[dict, ...],
         context: str,
         provider_type: str,
         base_url: str,
         api_key: str,
         model: str,
-        parent: QObject | None = None,
     ) -> None:
-        super().__init__(parent)
-        self._user_message = user_message
-        self._history = list(history)
-        self._context = context
-        self._provider_type = provider_type
-        self._base_url = base_url
-        self._api_key = api_key
-        self._model = model
-
-    @pyqtSlot()
-    def run(self) -> None:
-        """Send user_message (with history and DB context) to the LLM."""
+        """Send user_message (with history and DB context) to the LLM.
+
+        history is a read-only snapshot of the earlier turns, taken on the GUI thread.
+        """
         self.thinking.emit()
         try:
-            provider = create_provider(
-                self._provider_type, self._base_url,
-                self._api_key, self._model,
-            )
+            provider = create_provider(provider_type, base_url, api_key, model)
         except LLMError as exc:
             self.error.emit(str(exc))
             self.finished.emit()
             return
 
-        system = SYSTEM_PROMPT.format(context=self._context)
-        messages = self._history + [
-            {"role": "user", "content": self._user_message}
-        ]
+        system = SYSTEM_PROMPT.format(context=context)
+        messages = [*history, {"role": "user", "content": user_message}]
 
+        chunks: list[str] = []
         try:
-            reply = provider.chat(messages, system=system)
+            for chunk in provider.chat_stream(messages, system=system):
+                chunks.append(chunk)
+                self.token_ready.emit(chunk)
         except LLMError as exc:
             self.error.emit(str(exc))
             self.finished.emit()
@@ -101,5 +94,5 @@ class AiWorker(QObject):
             self.finished.emit()
             return
 
-        self.response_ready.emit(reply)
+        self.response_ready.emit("".join(chunks))
         self.finished.emit()
@@ -0,0 +1,119 @@
+"""FolderListWorker — background QObject for the folder list and quota fetches."""
+from __future__ import annotations
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from imapclient import IMAPClient
+from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
+
+from mailsweep.imap.connection import IMAPConnectionError, connect, list_folders
+from mailsweep.models.account import Account
+
+logger = logging.getLogger(__name__)
+
+
+class FolderListWorker(QObject):
+    """Pulls an account's folder names and storage quota from the server.
+
+    Lives on a long-lived QThread owned by the main window; each account
+    switch arrives as a queued call to run().  Logged-in clients are kept
+    per (account, purpose) and checked with NOOP before reuse, so repeat
+    switches skip the TLS + LOGIN round trips.
+    """
+
+    finished = pyqtSignal(int, int, list, object)  # request id, account id, names, (usage, limit)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._clients: dict[tuple[int, str], IMAPClient] = {}
+
+    @pyqtSlot(int, object)
+    def run(self, request_id: int, account: Account) -> None:
+        """Fetch folder names and quota concurrently and emit them with request_id.
+
+        Both calls are dominated by connection setup when no cached client is
+        alive, so they run on two connections opened side by side.
+        """
+        assert account.id is not None
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="imap") as pool:
+            names_future = pool.submit(self._fetch_folder_list, account)
+            quota_future = pool.submit(self._fetch_quota, account)
+        self.finished.emit(request_id, account.id, names_future.result(), quota_future.result())
+
+    @pyqtSlot(object)
+    def close_clients(self, account_id: int | None = None) -> None:
+        """Log out cached clients for account_id, or for every account."""
+        for key in list(self._clients):
+            if account_id is None or key[0] == account_id:
+                self._logout(self._clients.pop(key))
+
+    def _client(self, account: Account, purpose: str) -> IMAPClient:
+        """Return a logged-in client, reconnecting if the cached one is gone.
+
+        Raises IMAPConnectionError if connecting fails.
+        """
+        assert account.id is not None
+        key = (account.id, purpose)
+        client = self._clients.pop(key, None)
+        if client is not None:
+            try:
+                client.noop()
+            except Exception as exc:
+                logger.debug("Cached IMAP connection for %s is stale: %s", account.username, exc)
+                client = None
+        if client is None:
+            client = connect(account)
+        self._clients[key] = client
+        return client
+
+    def _discard(self, account: Account, purpose: str) -> None:
+        """Drop a cached client after an error so the next call reconnects."""
+        client = self._clients.pop((account.id, purpose), None)
+        if client is not None:
+            self._logout(client)
+
+    @staticmethod
+    def _logout(client: IMAPClient) -> None:
+        try:
+            client.logout()
+        except Exception:
+            pass
+
+    def _fetch_folder_list(self, account: Account) -> list[str]:
+        """Return the server's folder names (no message fetch)."""
+        try:
+            return list_folders(self._client(account, "folders"))
+        except IMAPConnectionError as exc:
+            logger.warning("Could not fetch folder list: %s", exc)
+        except Exception as exc:
+            logger.warning("Could not fetch folder list: %s", exc)
+            self._discard(account, "folders")
+        return []
+
+    def _fetch_quota(self, account: Account) -> tuple[int | None, int | None]:
+        """Return (usage, limit) in bytes from IMAP QUOTA, or (None, None)."""
+        try:
+            client = self._client(account, "quota")
+            # get_quota_root returns (MailboxQuotaRoots, [Quota, ...])
+            # Quota is typically a namedtuple-like with quota_root, resource, usage, limit
+            result = client.get_quota_root("INBOX")
+            quota: tuple[int | None, int | None] = (None, None)
+            if result and len(result) >= 2:
+                quotas = result[1]  # list of Quota objects
+                for q in quotas:
+                    # q might be a tuple (root, resource, usage, limit) or have named attrs
+                    if hasattr(q, "resource") and hasattr(q, "limit"):
+                        if q.resource.upper() == "STORAGE":
+                            quota = (q.usage * 1024, q.limit * 1024)  # STORAGE is in KB
+                            break
+                    elif isinstance(q, (list, tuple)) and len(q) >= 4:
+                        resource = q[1] if isinstance(q[1], str) else str(q[1])
+                        if resource.upper() == "STORAGE":
+                            quota = (int(q[2]) * 1024, int(q[3]) * 1024)
+                            break
+            return quota
+        except Exception as exc:
+            logger.debug("Could not fetch quota: %s", exc)
+            self._discard(account, "quota")
+            return None, None
@@ -7,6 +7,7 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from imapclient import IMAPClient
     from mailsweep.db.repository import MessageRepository
+    from mailsweep.models.folder import Folder
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +35,43 @@ def get_new_deleted_uids(
     return new_uids, deleted_uids
 
 
+def get_new_uids_since(
+    client: "IMAPClient",
+    folder: "Folder",
+    select_status: dict,
+    msg_repo: "MessageRepository",
+) -> list[int] | None:
+    """
+    Return UIDs above folder.last_uid, or None if a full diff is needed.
+
+    Only asks the server for the UID range past the cached high-watermark.
+    That is enough when nothing was expunged, which holds when the folder's
+    EXISTS, less the messages flagged \\Deleted (which EXISTS still counts),
+    equals the cached count plus the new UIDs, and no cached message has
+    since been flagged \\Deleted.
+    Otherwise, or with no watermark yet, returns None so the caller falls
+    back to get_new_deleted_uids().
+    """
+    if not folder.last_uid:
+        return None
+    # "n:*" always matches the highest UID, even when it is below n
+    new_uids = sorted(
+        uid for uid in client.search(["UID", f"{folder.last_uid + 1}:*", "NOT", "DELETED"])
+        if uid > folder.last_uid
+    )
+    flagged = set(client.search(["DELETED"]))
+    exists = int(select_status.get(b"EXISTS", -1))
+    if exists - len(flagged) != folder.message_count + len(new_uids):
+        return None
+    if flagged and flagged & msg_repo.get_uids_for_folder(folder.id):
+        return None
+    logger.debug(
+        "Watermark scan: %d new above UID %d for folder_id=%s",
+        len(new_uids), folder.last_uid, folder.id,
+    )
+    return new_uids
+
+
 def supports_condstore(client: "IMAPClient") -> bool:
     """Check whether the server advertises CONDSTORE capability."""
     try:
@@ -41,3 +79,37 @@ def supports_condstore(client: "IMAPClient") -> bool:
         return b"CONDSTORE" in caps or "CONDSTORE" in caps
     except Exception:
         return False
+
+
+def enable_condstore(client: "IMAPClient") -> bool:
+    """Turn on CONDSTORE so SELECT reports HIGHESTMODSEQ; False if unsupported."""
+    if not supports_condstore(client):
+        return False
+    try:
+        client.enable("CONDSTORE")
+    except Exception as exc:
+        logger.debug("ENABLE CONDSTORE failed: %s", exc)
+        return False
+    return True
+
+
+def highest_modseq(select_status: dict) -> int:
+    """Return HIGHESTMODSEQ from a select_folder() response, or 0 if absent."""
+    try:
+        return int(select_status.get(b"HIGHESTMODSEQ", 0) or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def folder_unchanged(folder: "Folder", select_status: dict) -> bool:
+    """True when the server reports nothing has changed since the last scan.
+
+    Any new message, flag change or (with QRESYNC) expunge raises
+    HIGHESTMODSEQ; the EXISTS check also catches expunges on servers that
+    only implement CONDSTORE.  The caller must already have checked
+    UIDVALIDITY.
+    """
+    modseq = highest_modseq(select_status)
+    if not modseq or not folder.highest_modseq or modseq != folder.highest_modseq:
+        return False
+    return int(select_status.get(b"EXISTS", -1)) == folder.message_count
@@ -37,10 +37,10 @@ class MoveWorker(QObject):
     def cancel(self) -> None:
         self._cancel_requested = True
 
-    def run(self, account: Account, moves: list[MoveOp], conn=None, folder_repo=None, msg_repo=None) -> None:
+    def run(self, account: Account, moves: list[MoveOp], folder_repo=None, msg_repo=None) -> None:
         """Execute all move operations.
 
-        conn, folder_repo, msg_repo: if provided, update the local DB cache
+        folder_repo, msg_repo: if provided, update the local DB cache
         after successful moves.
         """
         if not moves:
@@ -103,9 +103,9 @@ class MoveWorker(QObject):
                             client.expunge(uids)
 
                         # Update local DB cache
-                        if conn and folder_repo and msg_repo:
+                        if folder_repo and msg_repo:
                             _update_db_after_move(
-                                conn, folder_repo, msg_repo,
+                                folder_repo, msg_repo,
                                 uids, src_folder, dst_folder, account.id,
                             )
 
@@ -135,22 +135,16 @@ class MoveWorker(QObject):
         self.finished.emit(done)
 
 
-def _update_db_after_move(conn, folder_repo, msg_repo, uids, src_folder, dst_folder, account_id):
+def _update_db_after_move(folder_repo, msg_repo, uids, src_folder, dst_folder, account_id):
     """Update local DB: change folder_id on moved messages and recompute stats."""
     src = folder_repo.get_by_name(account_id, src_folder)
     dst = folder_repo.get_by_name(account_id, dst_folder)
     if not src or not dst or src.id is None or dst.id is None:
         return
 
-    placeholders = ",".join("?" * len(uids))
     try:
-        conn.execute(
-            f"UPDATE messages SET folder_id = ? WHERE folder_id = ? AND uid IN ({placeholders})",
-            [dst.id, src.id, *uids],
-        )
-        conn.commit()
+        msg_repo.move_uids(src.id, dst.id, uids)
         folder_repo.update_stats(src.id)
         folder_repo.update_stats(dst.id)
     except Exception as exc:
         logger.warning("DB update after move failed: %s", exc)
-        conn.rollback()
@@ -2,15 +2,25 @@
 from __future__ import annotations
 
 import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 
 from PyQt6.QtCore import QObject, pyqtSignal
 
+import mailsweep.config as cfg
 from mailsweep.imap.connection import IMAPConnectionError, connect
 from mailsweep.models.account import Account
 from mailsweep.models.folder import Folder
 from mailsweep.models.message import Message
-from mailsweep.workers.incremental_scan import get_new_deleted_uids
+from mailsweep.workers.incremental_scan import (
+    enable_condstore,
+    folder_unchanged,
+    get_new_deleted_uids,
+    get_new_uids_since,
+    highest_modseq,
+)
 from mailsweep.workers.scan_worker import ScanWorker
 
 logger = logging.getLogger(__name__)
@@ -32,8 +42,8 @@ class QtScanWorker(QObject):
     """
 
     # Signals
-    folder_started = pyqtSignal(str)                   # folder_name
-    message_batch_done = pyqtSignal(list, int, int)    # messages, done, total
+    folder_started = pyqtSignal(str)                   # name(s) of the folders now scanning
+    message_batch_done = pyqtSignal(list, int, int)    # messages, done, total (all folders)
     folder_done = pyqtSignal(object)                   # Folder (updated stats)
     all_done = pyqtSignal()
     error = pyqtSignal(str)
@@ -55,14 +65,24 @@ class QtScanWorker(QObject):
         self._msg_repo = msg_repo
         self._force_full = force_full
         self._cancel_requested = False
-        self._current_worker: ScanWorker | None = None
+        self._active_workers: set[ScanWorker] = set()  # one per scanning connection
+        # Folders scan in parallel, so progress is summed across them
+        self._progress_lock = threading.Lock()
+        self._scanning: dict[int, str] = {}  # folder id → name, in start order
+        self._folder_progress: dict[int, tuple[int, int]] = {}  # folder id → (done, total)
 
     def cancel(self) -> None:
         self._cancel_requested = True
-        if self._current_worker:
-            self._current_worker.cancel()
+        for worker in list(self._active_workers):
+            worker.cancel()
 
     def run(self) -> None:
+        """Scan every folder, spreading them over up to cfg.SCAN_CONNECTIONS clients.
+
+        The first connection runs on this thread and must succeed; extra
+        connections are opened in parallel and simply drop out if the
+        server refuses them, leaving their share of folders to the others.
+        """
         try:
             client = connect(self._account)
         except IMAPConnectionError as exc:
@@ -70,98 +90,180 @@ class QtScanWorker(QObject):
             self.finished.emit()
             return
 
-        try:
-            for folder in self._folders:
-                if self._cancel_requested:
-                    break
-
-                assert folder.id is not None
-                self.folder_started.emit(folder.name)
-
-                # UID validity check
-                try:
-                    status = client.select_folder(folder.name, readonly=True)
-                    server_uidvalidity = int(status.get(b"UIDVALIDITY", 0))
-                except Exception as exc:
-                    logger.warning("Cannot select %s: %s", folder.name, exc)
-                    continue
-
-                cache_valid = (
-                    not self._force_full
-                    and folder.uid_validity != 0
-                    and folder.uid_validity == server_uidvalidity
-                )
-
-                if not cache_valid:
-                    if self._force_full:
-                        logger.info("Force full rescan for %s", folder.name)
-                    elif folder.uid_validity and folder.uid_validity != server_uidvalidity:
-                        logger.info("UID validity changed for %s — full rescan", folder.name)
-                    else:
-                        logger.info("No cache for %s — full scan", folder.name)
-                    self._folder_repo.invalidate(folder.id)
-                    new_uids = None       # None → ScanWorker fetches all
-                    deleted_uids: list[int] = []
-                else:
-                    # Incremental: only fetch UIDs the server has that we don't,
-                    # and remove UIDs we have that the server deleted.
-                    new_uids, deleted_uids = get_new_deleted_uids(
-                        client, folder.id, self._msg_repo
-                    )
-                    if deleted_uids:
-                        self._msg_repo.delete_uids(folder.id, deleted_uids)
-                        logger.info("%s: removed %d deleted UIDs from cache",
-                                    folder.name, len(deleted_uids))
-
-                    if not new_uids:
-                        logger.info("%s: cache up to date, skipping fetch", folder.name)
-                        # Still emit folder_done so UI stays current
-                        self._folder_repo.update_stats(folder.id)
-                        updated = self._folder_repo.get_by_id(folder.id)
-                        if updated:
-                            self.folder_done.emit(updated)
-                        continue
-
-                    logger.info("%s: incremental — fetching %d new UIDs", folder.name, len(new_uids))
-
-                def on_batch_emit(msgs: list[Message], _fid=folder.id) -> None:
-                    self._msg_repo.upsert_batch(msgs)
-                    self.message_batch_done.emit(msgs, 0, 0)
-
-                def on_progress(done: int, total: int, _fname=folder.name) -> None:
-                    self.message_batch_done.emit([], done, total)
-
-                worker = ScanWorker(
-                    client=client,
-                    folder_id=folder.id,
-                    folder_name=folder.name,
-                    on_batch=on_batch_emit,
-                    on_progress=on_progress,
-                )
-                self._current_worker = worker
-
-                try:
-                    worker.run(uids=new_uids)
-                except Exception as exc:
-                    logger.error("Scan error for %s: %s", folder.name, exc)
-                    self.error.emit(f"Error scanning {folder.name}: {exc}")
-                    continue
-
-                # Update folder metadata
-                folder.uid_validity = server_uidvalidity
-                folder.last_scanned_at = datetime.now(timezone.utc)
-                self._folder_repo.upsert(folder)
-                self._folder_repo.update_stats(folder.id)
-
-                updated = self._folder_repo.get_by_id(folder.id)
-                if updated:
-                    self.folder_done.emit(updated)
+        pending: queue.SimpleQueue[Folder] = queue.SimpleQueue()
+        for folder in self._folders:
+            pending.put(folder)
+        extra = max(0, min(cfg.SCAN_CONNECTIONS, len(self._folders)) - 1)
 
+        try:
+            if extra:
+                with ThreadPoolExecutor(max_workers=extra, thread_name_prefix="scan") as pool:
+                    for _ in range(extra):
+                        pool.submit(self._scan_on_new_connection, pending)
+                    self._scan_pending(client, pending)
+            else:
+                self._scan_pending(client, pending)
         finally:
             try:
                 client.logout()
             except Exception:
                 pass
-            self._current_worker = None
             self.all_done.emit()
             self.finished.emit()
+
+    def _scan_on_new_connection(self, pending: queue.SimpleQueue[Folder]) -> None:
+        """Pool-thread entry: open another client and help drain pending."""
+        try:
+            client = connect(self._account)
+        except IMAPConnectionError as exc:
+            logger.warning("Extra scan connection unavailable: %s", exc)
+            return
+        try:
+            self._scan_pending(client, pending)
+        except Exception as exc:
+            logger.error("Scan connection failed: %s", exc)
+            self.error.emit(f"Scan connection failed: {exc}")
+        finally:
+            try:
+                client.logout()
+            except Exception:
+                pass
+
+    def _scan_pending(self, client, pending: queue.SimpleQueue[Folder]) -> None:
+        """Scan folders from pending on client until it is empty or cancelled."""
+        condstore = enable_condstore(client)
+        while not self._cancel_requested:
+            try:
+                folder = pending.get_nowait()
+            except queue.Empty:
+                return
+            assert folder.id is not None
+            with self._progress_lock:
+                self._scanning[folder.id] = folder.name
+                label = self._scanning_label()
+            self.folder_started.emit(label)
+            try:
+                self._scan_folder(client, folder, condstore)
+            finally:
+                with self._progress_lock:
+                    del self._scanning[folder.id]
+                    label = self._scanning_label()
+                    _, total = self._folder_progress.get(folder.id, (0, 0))
+                    self._folder_progress[folder.id] = (total, total)  # no longer pending
+                if label:
+                    self.folder_started.emit(label)
+
+    def _scanning_label(self) -> str:
+        """Name the folders being scanned, e.g. "INBOX (+2 more)".  Needs _progress_lock."""
+        names = list(self._scanning.values())
+        if len(names) > 1:
+            return f"{names[0]} (+{len(names) - 1} more)"
+        return names[0] if names else ""
+
+    def _report_progress(self, folder_id: int, done: int, total: int) -> None:
+        """Record one folder's progress and emit the total over all folders."""
+        with self._progress_lock:
+            self._folder_progress[folder_id] = (done, total)
+            all_done = sum(d for d, _ in self._folder_progress.values())
+            all_total = sum(t for _, t in self._folder_progress.values())
+        self.message_batch_done.emit([], all_done, all_total)
+
+    def _scan_folder(self, client, folder: Folder, condstore: bool) -> None:
+        assert folder.id is not None
+
+        # UID validity check
+        try:
+            status = client.select_folder(folder.name, readonly=True)
+            server_uidvalidity = int(status.get(b"UIDVALIDITY", 0))
+            server_modseq = highest_modseq(status) if condstore else 0
+        except Exception as exc:
+            logger.warning("Cannot select %s: %s", folder.name, exc)
+            return
+
+        cache_valid = (
+            not self._force_full
+            and folder.uid_validity != 0
+            and folder.uid_validity == server_uidvalidity
+        )
+
+        if not cache_valid:
+            if self._force_full:
+                logger.info("Force full rescan for %s", folder.name)
+            elif folder.uid_validity and folder.uid_validity != server_uidvalidity:
+                logger.info("UID validity changed for %s — full rescan", folder.name)
+            else:
+                logger.info("No cache for %s — full scan", folder.name)
+            self._folder_repo.invalidate(folder.id)
+            new_uids = None       # None → ScanWorker fetches all
+        elif condstore and folder_unchanged(folder, status):
+            # HIGHESTMODSEQ unchanged: skip the UID SEARCH and diff entirely
+            logger.info("%s: unchanged since last scan (MODSEQ %d)",
+                        folder.name, server_modseq)
+            self.folder_done.emit(folder)
+            return
+        else:
+            # Incremental: only fetch UIDs the server has that we don't,
+            # and remove UIDs we have that the server deleted.  Past the
+            # cached high-watermark is enough unless something was expunged.
+            new_uids = get_new_uids_since(client, folder, status, self._msg_repo)
+            if new_uids is not None:
+                deleted_uids: list[int] = []
+            else:
+                new_uids, deleted_uids = get_new_deleted_uids(
+                    client, folder.id, self._msg_repo
+                )
+            if deleted_uids:
+                self._msg_repo.delete_uids(folder.id, deleted_uids)
+                logger.info("%s: removed %d deleted UIDs from cache",
+                            folder.name, len(deleted_uids))
+
+            if not new_uids:
+                logger.info("%s: cache up to date, skipping fetch", folder.name)
+                if server_modseq != folder.highest_modseq:
+                    folder.highest_modseq = server_modseq
+                    self._folder_repo.upsert(folder)
+                # Still emit folder_done so UI stays current
+                updated = self._folder_repo.update_stats(folder.id)
+                if updated:
+                    self.folder_done.emit(updated)
+                return
+
+            logger.info("%s: incremental — fetching %d new UIDs", folder.name, len(new_uids))
+
+        def on_batch_emit(msgs: list[Message]) -> None:
+            self._msg_repo.upsert_batch(msgs)
+            self.message_batch_done.emit(msgs, 0, 0)
+
+        def on_progress(done: int, total: int) -> None:
+            self._report_progress(folder.id, done, total)
+
+        worker = ScanWorker(
+            client=client,
+            folder_id=folder.id,
+            folder_name=folder.name,
+            on_batch=on_batch_emit,
+            on_progress=on_progress,
+            batch_size=cfg.SCAN_BATCH_SIZE,
+        )
+        self._active_workers.add(worker)
+        if self._cancel_requested:
+            worker.cancel()  # cancel() ran before this worker was registered
+
+        try:
+            worker.run(uids=new_uids)
+        except Exception as exc:
+            logger.error("Scan error for %s: %s", folder.name, exc)
+            self.error.emit(f"Error scanning {folder.name}: {exc}")
+            return
+        finally:
+            self._active_workers.discard(worker)
+
+        # Update folder metadata
+        folder.uid_validity = server_uidvalidity
+        # A cancelled scan is incomplete, so don't let it look up to date
+        folder.highest_modseq = 0 if self._cancel_requested else server_modseq
+        folder.last_scanned_at = datetime.now(timezone.utc)
+        self._folder_repo.upsert(folder)
+        updated = self._folder_repo.update_stats(folder.id)
+        if updated:
+            self.folder_done.emit(updated)
@@ -23,10 +23,30 @@ BATCH_SIZE = 500
 FETCH_ITEMS = [b"ENVELOPE", b"RFC822.SIZE", b"BODYSTRUCTURE", b"FLAGS", b"X-GM-THRID"]
 
 
+def _uid_ranges(uids: list[int]) -> list[str]:
+    """Collapse sorted UIDs into IMAP sequence-set items ("1:100", "105", ...).
+
+    Only runs of consecutive UIDs become ranges, so the set matches uids
+    exactly while the FETCH command line stays short for large batches.
+    """
+    items: list[str] = []
+    if not uids:
+        return items
+    start = prev = uids[0]
+    for uid in uids[1:]:
+        if uid == prev + 1:
+            prev = uid
+            continue
+        items.append(f"{start}:{prev}" if prev != start else str(start))
+        start = prev = uid
+    items.append(f"{start}:{prev}" if prev != start else str(start))
+    return items
+
+
 class ScanWorker:
     """
     Scans one IMAP folder: fetches metadata for all messages and calls
-    `on_batch(messages)` for each batch of BATCH_SIZE.
+    `on_batch(messages)` for each batch of batch_size UIDs (one FETCH per batch).
 
     Not a QObject yet — Phase 2 wraps it.
     """
@@ -38,8 +58,10 @@ class ScanWorker:
         folder_name: str,
         on_batch: Callable[[list[Message]], None] | None = None,
         on_progress: Callable[[int, int], None] | None = None,
+        batch_size: int = BATCH_SIZE,
     ) -> None:
         self._client = client
+        self._batch_size = max(1, batch_size)
         self._folder_id = folder_id
         self._folder_name = folder_name
         self._on_batch = on_batch or (lambda msgs: None)
@@ -60,20 +82,22 @@ class ScanWorker:
             all_uids = uids
         else:
             all_uids = self._client.search(["NOT", "DELETED"])
+        all_uids = sorted(all_uids)  # consecutive UIDs collapse into ranges
         total = len(all_uids)
         logger.info("Scanning %s: %d messages", self._folder_name, total)
 
         all_messages: list[Message] = []
         done = 0
 
-        for batch_start in range(0, total, BATCH_SIZE):
+        batch_size = self._batch_size
+        for batch_start in range(0, total, batch_size):
             if self._cancel_requested:
                 logger.info("Scan cancelled at uid batch %d/%d", done, total)
                 break
 
-            batch_uids = all_uids[batch_start: batch_start + BATCH_SIZE]
+            batch_uids = all_uids[batch_start: batch_start + batch_size]
             try:
-                fetch_data = self._client.fetch(batch_uids, FETCH_ITEMS)
+                fetch_data = self._client.fetch(_uid_ranges(batch_uids), FETCH_ITEMS)
             except Exception as exc:
                 logger.error("FETCH failed for %s batch %d: %s", self._folder_name, batch_start, exc)
                 raise
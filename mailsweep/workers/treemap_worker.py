@@ -0,0 +1,56 @@
+"""TreemapWorker — background QObject for treemap sender/receiver aggregation."""
+from __future__ import annotations
+
+import logging
+import sqlite3
+
+from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
+
+from mailsweep.db.repository import MessageRepository
+
+logger = logging.getLogger(__name__)
+
+
+class TreemapWorker(QObject):
+    """Runs the GROUP BY summary queries behind the Senders/Receivers treemaps.
+
+    Lives on a long-lived QThread owned by the main window; each request
+    arrives as a queued call to run().  The repository must be backed by a
+    ConnectionPool so this thread reads through its own SQLite connection.
+    """
+
+    summary_ready = pyqtSignal(int, list)  # request id, summary rows
+
+    def __init__(self, msg_repo: MessageRepository) -> None:
+        super().__init__()
+        self._msg_repo = msg_repo
+
+    @pyqtSlot(int, bool, object, object)
+    def run(
+        self,
+        request_id: int,
+        receivers: bool,
+        folder_ids: list[int] | None,
+        unlabelled: tuple[int, list[int], str] | None,
+    ) -> None:
+        """Aggregate by receiver (or sender) and emit the rows with request_id.
+
+        unlabelled is (all_mail_folder_id, other_folder_ids, mode) for the
+        virtual Unlabelled folder, in which case folder_ids is ignored.
+        """
+        repo = self._msg_repo
+        try:
+            if unlabelled is not None:
+                all_mail_id, other_ids, mode = unlabelled
+                if receivers:
+                    rows = repo.get_unlabelled_receiver_summary(all_mail_id, other_ids, mode=mode)
+                else:
+                    rows = repo.get_unlabelled_sender_summary(all_mail_id, other_ids, mode=mode)
+            elif receivers:
+                rows = repo.get_receiver_summary(folder_ids=folder_ids)
+            else:
+                rows = repo.get_sender_summary(folder_ids=folder_ids)
+        except sqlite3.Error as exc:
+            logger.error("Treemap aggregation failed: %s", exc)
+            rows = []
+        self.summary_ready.emit(request_id, rows)
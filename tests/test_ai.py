@@ -16,9 +16,11 @@ from mailsweep.ai.providers import (
     AnthropicProvider,
     LLMError,
     create_provider,
+    fetch_model_list,
     PROVIDER_PRESETS,
 )
 from mailsweep.ai.context import build_mailbox_context
+from mailsweep.ai.formatting import format_response, history_window
 
 
 # ── Fixtures ─────────────────────────────────────────────────────────────────
@@ -168,6 +170,53 @@ class TestOpenAICompatProvider:
                 provider.chat([{"role": "user", "content": "Hi"}])
 
 
+    def test_chat_stream_yields_deltas(self):
+        provider = OpenAICompatProvider(
+            base_url="http://localhost:11434/v1",
+            api_key="",
+            model="llama3.2",
+        )
+        lines = [
+            b'data: {"choices": [{"delta": {"role": "assistant"}}]}\n', b"\n",
+            b'data: {"choices": [{"delta": {"content": "Hel"}}]}\n', b"\n",
+            b'data: {"choices": [{"delta": {"content": "lo"}}]}\n', b"\n",
+            b"data: [DONE]\n",
+        ]
+        mock_resp = MagicMock()
+        mock_resp.__iter__ = lambda s: iter(lines)
+        mock_resp.__enter__ = lambda s: s
+        mock_resp.__exit__ = MagicMock(return_value=False)
+
+        with patch("urllib.request.urlopen", return_value=mock_resp) as mock_open:
+            chunks = list(provider.chat_stream([{"role": "user", "content": "Hi"}]))
+            body = json.loads(mock_open.call_args[0][0].data.decode("utf-8"))
+
+        assert chunks == ["Hel", "lo"]
+        assert body["stream"] is True
+
+    def test_chat_stream_skips_chunks_without_choices(self):
+        provider = OpenAICompatProvider(
+            base_url="http://localhost:11434/v1",
+            api_key="",
+            model="llama3.2",
+        )
+        lines = [
+            b'data: {"choices": [], "prompt_filter_results": []}\n', b"\n",
+            b'data: {"choices": [{"delta": {"content": "Hi"}}]}\n', b"\n",
+            b'data: {"choices": [], "usage": {"total_tokens": 5}}\n', b"\n",
+            b"data: [DONE]\n",
+        ]
+        mock_resp = MagicMock()
+        mock_resp.__iter__ = lambda s: iter(lines)
+        mock_resp.__enter__ = lambda s: s
+        mock_resp.__exit__ = MagicMock(return_value=False)
+
+        with patch("urllib.request.urlopen", return_value=mock_resp):
+            chunks = list(provider.chat_stream([{"role": "user", "content": "Hi"}]))
+
+        assert chunks == ["Hi"]
+
+
 class TestAnthropicProvider:
     def test_chat_success(self):
         provider = AnthropicProvider(api_key="sk-test", model="claude-3-haiku")
@@ -192,6 +241,47 @@ class TestAnthropicProvider:
             assert body["system"] == "Be helpful."
 
 
+    def test_chat_stream_yields_text_deltas(self):
+        provider = AnthropicProvider(api_key="sk-test", model="claude-3-haiku")
+        events = [
+            ("message_start", {"type": "message_start", "message": {}}),
+            ("content_block_delta",
+             {"type": "content_block_delta", "index": 0,
+              "delta": {"type": "text_delta", "text": "Anthropic "}}),
+            ("content_block_delta",
+             {"type": "content_block_delta", "index": 0,
+              "delta": {"type": "text_delta", "text": "stream"}}),
+            ("message_stop", {"type": "message_stop"}),
+        ]
+        lines = []
+        for name, data in events:
+            lines += [f"event: {name}\n".encode(), f"data: {json.dumps(data)}\n".encode(), b"\n"]
+        mock_resp = MagicMock()
+        mock_resp.__iter__ = lambda s: iter(lines)
+        mock_resp.__enter__ = lambda s: s
+        mock_resp.__exit__ = MagicMock(return_value=False)
+
+        with patch("urllib.request.urlopen", return_value=mock_resp):
+            chunks = list(provider.chat_stream([{"role": "user", "content": "test"}]))
+
+        assert chunks == ["Anthropic ", "stream"]
+
+    def test_chat_stream_error_event_raises(self):
+        provider = AnthropicProvider(api_key="sk-test", model="claude-3-haiku")
+        lines = [
+            b"event: error\n",
+            b'data: {"type": "error", "error": {"message": "Overloaded"}}\n',
+        ]
+        mock_resp = MagicMock()
+        mock_resp.__iter__ = lambda s: iter(lines)
+        mock_resp.__enter__ = lambda s: s
+        mock_resp.__exit__ = MagicMock(return_value=False)
+
+        with patch("urllib.request.urlopen", return_value=mock_resp):
+            with pytest.raises(LLMError, match="Overloaded"):
+                list(provider.chat_stream([{"role": "user", "content": "test"}]))
+
+
 class TestCreateProvider:
     def test_ollama_preset(self):
         p = create_provider("ollama", "http://localhost:11434/v1", "", "llama3.2")
@@ -217,6 +307,51 @@ class TestCreateProvider:
             assert "model" in preset
 
 
+class TestFetchModelList:
+    @pytest.fixture
+    def models_server(self):
+        """Local server for /v1/models; /old/models redirects there."""
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/old/models":
+                    self.send_response(301)
+                    self.send_header("Location", "/v1/models")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                body = json.dumps({"data": [{"id": "b-model"}, {"id": "a-model"}]}).encode()
+                self.send_response(200 if self.path == "/v1/models" else 404)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+        yield f"http://127.0.0.1:{server.server_port}"
+        server.shutdown()
+        server.server_close()
+
+    def test_returns_sorted_ids(self, models_server):
+        assert fetch_model_list(models_server + "/v1/") == ["a-model", "b-model"]
+
+    def test_follows_redirect(self, models_server):
+        assert fetch_model_list(models_server + "/old") == ["a-model", "b-model"]
+
+    def test_http_error_returns_empty(self, models_server):
+        assert fetch_model_list(models_server + "/nope") == []
+
+    def test_unreachable_returns_empty(self):
+        assert fetch_model_list("http://127.0.0.1:9/v1") == []
+        assert fetch_model_list("localhost:11434/v1") == []
+
+
 # ── Context Builder Tests ────────────────────────────────────────────────────
 
 class TestBuildMailboxContext:
@@ -295,3 +430,62 @@ class TestRepositoryAIQueries:
         # alice@bank.com has 2 msgs in INBOX, bob@shop.com has 1
         assert top[0]["sender_email"] == "alice@bank.com"
         assert top[0]["message_count"] == 2
+
+
+# ── Chat Formatting Tests ────────────────────────────────────────────────────
+
+class TestFormatResponse:
+    def test_escapes_html(self):
+        assert format_response("a < b & c") == "a &lt; b &amp; c"
+
+    def test_plain_text_keeps_line_breaks(self):
+        assert format_response("one\ntwo <x>") == "one<br>two &lt;x&gt;"
+
+    def test_bold_and_inline_code(self):
+        html = format_response("**Banks** use `IMP/Banks`")
+        assert html.startswith("<b>Banks</b> use <code")
+        assert ">IMP/Banks</code>" in html
+
+    def test_code_block_spans_lines(self):
+        html = format_response("```\nline1\nline2\n```")
+        assert html.startswith("<pre")
+        assert html.endswith("</pre>")
+        assert "line1<br>line2" in html
+
+    def test_move_line_highlighted_inside_code_block(self):
+        html = format_response('```\nMOVE: sender="a@b.com", from="INBOX", to="X", reason=""\n```')
+        assert '<span style="color: #bf360c; font-weight: bold;">MOVE: sender=' in html
+        assert html.index("<span") > html.index("<pre")
+        assert html.index("</span>") < html.index("</pre>")
+
+    def test_move_highlight_stops_at_line_end(self):
+        html = format_response("MOVE: x\n**next**")
+        assert html.endswith("MOVE: x</span><br><b>next</b>")
+
+
+class TestHistoryWindow:
+    @staticmethod
+    def _turns(n, size=10):
+        history = []
+        for i in range(n):
+            history.append({"role": "user", "content": f"q{i}".ljust(size)})
+            history.append({"role": "assistant", "content": f"a{i}".ljust(size)})
+        return history
+
+    def test_short_history_unchanged(self):
+        history = self._turns(3)
+        assert history_window(history) == tuple(history)
+
+    def test_caps_turn_count(self):
+        window = history_window(self._turns(50))
+        assert len(window) == 40
+        assert window[0]["content"].startswith("q30")
+
+    def test_caps_total_chars(self):
+        window = history_window(self._turns(10, size=10_000))
+        assert sum(len(m["content"]) for m in window) <= 32_000
+        assert window[-1]["content"].startswith("a9")
+
+    def test_starts_with_user_message(self):
+        window = history_window(self._turns(10, size=10_000))
+        assert window[0]["role"] == "user"
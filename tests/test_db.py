@@ -4,7 +4,7 @@ from __future__ import annotations
 import pytest
 from datetime import datetime, timezone
 
-from mailsweep.db.schema import init_db
+from mailsweep.db.schema import ConnectionPool, init_db
 from mailsweep.db.repository import AccountRepository, FolderRepository, MessageRepository
 from mailsweep.models.account import Account, AuthType
 from mailsweep.models.folder import Folder
@@ -132,6 +132,15 @@ class TestFolderRepository:
         assert len(folders) == 3
         assert {f.name for f in folders} == {"INBOX", "Sent", "Trash"}
 
+    def test_get_by_ids(self, folder_repo, sample_account):
+        saved = [
+            folder_repo.upsert(Folder(account_id=sample_account.id, name=n))
+            for n in ("INBOX", "Sent", "Trash")
+        ]
+        folders = folder_repo.get_by_ids([saved[0].id, saved[2].id, 99999])
+        assert sorted(f.name for f in folders) == ["INBOX", "Trash"]
+        assert folder_repo.get_by_ids([]) == []
+
     def test_invalidate_clears_uid_validity(self, folder_repo, msg_repo, sample_folder):
         msgs = [Message(uid=i, folder_id=sample_folder.id, size_bytes=1000) for i in range(5)]
         msg_repo.upsert_batch(msgs)
@@ -148,6 +157,33 @@ class TestFolderRepository:
         assert updated.message_count == 10
         assert updated.total_size_bytes == 10240
 
+    def test_update_stats_returns_updated_folder(self, folder_repo, msg_repo, sample_folder):
+        msg_repo.upsert_batch([Message(uid=1, folder_id=sample_folder.id, size_bytes=2048)])
+        updated = folder_repo.update_stats(sample_folder.id)
+        assert updated is not None
+        assert updated.message_count == 1
+        assert updated.total_size_bytes == 2048
+        assert folder_repo.update_stats(99999) is None
+
+    def test_update_stats_tracks_last_uid(self, folder_repo, msg_repo, sample_folder):
+        msg_repo.upsert_batch([Message(uid=u, folder_id=sample_folder.id) for u in (3, 9, 4)])
+        assert folder_repo.update_stats(sample_folder.id).last_uid == 9
+        folder_repo.invalidate(sample_folder.id)
+        assert folder_repo.get_by_id(sample_folder.id).last_uid == 0
+
+    def test_highest_modseq_persisted_and_invalidated(self, folder_repo, sample_account):
+        f = folder_repo.upsert(Folder(account_id=sample_account.id, name="INBOX",
+                                      uid_validity=7, highest_modseq=1234))
+        assert folder_repo.get_by_id(f.id).highest_modseq == 1234
+        folder_repo.invalidate(f.id)
+        assert folder_repo.get_by_id(f.id).highest_modseq == 0
+
+    def test_upsert_returns_full_row(self, folder_repo, sample_account):
+        saved = folder_repo.upsert(Folder(account_id=sample_account.id, name="Archive", uid_validity=7))
+        assert saved.name == "Archive"
+        assert saved.uid_validity == 7
+        assert saved.account_id == sample_account.id
+
 
 class TestMessageRepository:
     def test_upsert_batch(self, msg_repo, sample_folder):
@@ -209,6 +245,109 @@ class TestMessageRepository:
         assert len(results) == 1
         assert results[0].from_addr == "alice@example.com"
 
+    def test_query_bucketed_folder_ids(self, msg_repo, folder_repo, sample_account):
+        folders = [
+            folder_repo.upsert(Folder(account_id=sample_account.id, name=n))
+            for n in ("A", "B", "C")
+        ]
+        msg_repo.upsert_batch([
+            Message(uid=i, folder_id=f.id, size_bytes=100) for i, f in enumerate(folders)
+        ])
+        # Three ids are padded to a bucket of four; results must not repeat
+        results = msg_repo.query_messages(folder_ids=[f.id for f in folders])
+        assert sorted(m.uid for m in results) == [0, 1, 2]
+
+    def test_query_date_parsed_lazily(self, msg_repo, sample_folder):
+        when = datetime(2024, 3, 5, 8, 30, tzinfo=timezone.utc)
+        msg_repo.upsert_batch([Message(uid=1, folder_id=sample_folder.id, date=when)])
+        result = msg_repo.query_messages(folder_ids=[sample_folder.id])[0]
+        assert result.date_iso == when.isoformat()
+        assert result.date == when
+        assert isinstance(result.cached_at, datetime)
+
+    def test_iter_messages_streams_in_order(self, msg_repo, sample_folder):
+        msg_repo.upsert_batch([
+            Message(uid=i, folder_id=sample_folder.id, size_bytes=100 * (i + 1)) for i in range(5)
+        ])
+        it = msg_repo.iter_messages(folder_ids=[sample_folder.id], order_by="size_bytes DESC")
+        assert next(it).uid == 4
+        assert [m.uid for m in it] == [3, 2, 1, 0]
+
+    def test_query_pages_and_count(self, msg_repo, sample_folder):
+        msg_repo.upsert_batch([
+            Message(uid=i, folder_id=sample_folder.id, size_bytes=100 * (i + 1)) for i in range(5)
+        ])
+        page = msg_repo.query_messages(folder_ids=[sample_folder.id], limit=2, offset=2)
+        assert [m.uid for m in page] == [2, 1]
+        assert msg_repo.count_messages(folder_ids=[sample_folder.id]) == 5
+        assert msg_repo.count_messages(folder_ids=[sample_folder.id], size_min=300) == 3
+        assert msg_repo.count_messages(folder_ids=[sample_folder.id], limit=4) == 4
+
+    def test_query_pages_in_header_sort_order(self, msg_repo, sample_folder):
+        msg_repo.upsert_batch([
+            Message(uid=i, folder_id=sample_folder.id, subject=f"s{i}", size_bytes=100)
+            for i in range(4)
+        ])
+        page = msg_repo.query_messages(
+            folder_ids=[sample_folder.id], order_by="subject DESC", limit=2, offset=1,
+        )
+        assert [m.subject for m in page] == ["s2", "s1"]
+
+    def test_query_pages_text_order_ignores_case(self, msg_repo, sample_folder):
+        msg_repo.upsert_batch([
+            Message(uid=i, folder_id=sample_folder.id, subject=subj, size_bytes=100)
+            for i, subj in enumerate(["Zeta", "alpha", "Beta", "gamma"])
+        ])
+        page = msg_repo.query_messages(
+            folder_ids=[sample_folder.id], order_by="subject ASC", limit=2, offset=1,
+        )
+        assert [m.subject for m in page] == ["Beta", "gamma"]
+
+    def test_message_position_matches_query_order(self, msg_repo, sample_folder):
+        # Equal sizes tie-break on row id, so positions agree with paging
+        msg_repo.upsert_batch([
+            Message(uid=i, folder_id=sample_folder.id, size_bytes=(i % 3) * 100) for i in range(9)
+        ])
+        fid = sample_folder.id
+        rows = msg_repo.query_messages(folder_ids=[fid])
+        for pos, m in enumerate(rows):
+            assert msg_repo.get_message_position(fid, m.uid, folder_ids=[fid]) == pos
+        assert msg_repo.get_message_position(fid, 999, folder_ids=[fid]) is None
+        assert msg_repo.get_message_position(fid, rows[-1].uid, folder_ids=[fid], limit=5) is None
+
+    def test_message_position_uses_folder_of_uid(self, msg_repo, folder_repo, sample_account):
+        # The same UID in two folders must resolve to the clicked folder's message
+        small, large = (
+            folder_repo.upsert(Folder(account_id=sample_account.id, name=n)) for n in ("A", "B")
+        )
+        msg_repo.upsert_batch([
+            Message(uid=7, folder_id=small.id, size_bytes=100),
+            Message(uid=7, folder_id=large.id, size_bytes=900),
+        ])
+        folder_ids = [small.id, large.id]
+        assert msg_repo.get_message_position(large.id, 7, folder_ids=folder_ids) == 0
+        assert msg_repo.get_message_position(small.id, 7, folder_ids=folder_ids) == 1
+
+    def test_treemap_rows_match_query_order(self, msg_repo, sample_folder):
+        msg_repo.upsert_batch([
+            Message(uid=i, folder_id=sample_folder.id, subject=f"s{i}", size_bytes=(i % 3) * 100)
+            for i in range(6)
+        ])
+        rows = msg_repo.query_treemap_rows(folder_ids=[sample_folder.id], limit=4)
+        expected = msg_repo.query_messages(folder_ids=[sample_folder.id], limit=4)
+        assert rows == [
+            (m.uid, m.subject, m.sender_email, m.folder_id, m.size_bytes) for m in expected
+        ]
+
+    def test_sender_email_stored_at_ingest(self, msg_repo, sample_folder):
+        msg_repo.upsert_batch([
+            Message(uid=1, folder_id=sample_folder.id, from_addr="Alice <Alice@X.com>"),
+            Message(uid=2, folder_id=sample_folder.id, from_addr="bob@x.com"),
+        ])
+        by_uid = {m.uid: m for m in msg_repo.query_messages(folder_ids=[sample_folder.id])}
+        assert by_uid[1].sender_email == "alice@x.com"
+        assert by_uid[2].sender_email == "bob@x.com"
+
     def test_sender_summary(self, msg_repo, sample_folder):
         msgs = [
             Message(uid=1, folder_id=sample_folder.id, from_addr="alice@x.com", size_bytes=1000),
@@ -348,6 +487,30 @@ class TestUnlabelled:
         assert len(messages) == 1
         assert messages[0].from_addr == "big@x.com"
 
+    def test_unlabelled_sender_summary(self, msg_repo, gmail_folders):
+        """Unlabelled senders are grouped by bare email, labelled copies excluded."""
+        inbox, all_mail, sent = gmail_folders
+        msg_repo.upsert_batch([
+            Message(uid=1, folder_id=all_mail.id, message_id="<a1@x>",
+                    from_addr="Alice <Alice@x.com>", to_addr="me@x.com", size_bytes=1000),
+            Message(uid=2, folder_id=all_mail.id, message_id="<a2@x>",
+                    from_addr="alice@x.com", to_addr="Me <me@x.com>", size_bytes=500),
+            Message(uid=3, folder_id=all_mail.id, message_id="<b1@x>",
+                    from_addr="bob@x.com", to_addr="me@x.com", size_bytes=9000),
+            Message(uid=30, folder_id=inbox.id, message_id="<b1@x>",
+                    from_addr="bob@x.com", to_addr="me@x.com", size_bytes=9000),
+        ])
+        other_ids = [inbox.id, sent.id]
+
+        senders = msg_repo.get_unlabelled_sender_summary(all_mail.id, other_ids)
+        assert senders == [
+            {"sender_email": "alice@x.com", "message_count": 2, "total_size_bytes": 1500},
+        ]
+        receivers = msg_repo.get_unlabelled_receiver_summary(all_mail.id, other_ids)
+        assert receivers == [
+            {"receiver_email": "me@x.com", "message_count": 2, "total_size_bytes": 1500},
+        ]
+
 
 class TestMessageIdMatching:
     """Tests for message_id-based cross-folder matching."""
@@ -433,6 +596,22 @@ class TestMessageIdMatching:
         folders = msg_repo.get_folders_for_message(msg)
         assert set(folders) == {"INBOX", "[Gmail]/All Mail"}
 
+    def test_cross_label_duplicates_bytes(self, msg_repo, gmail_folders, gmail_account):
+        """Duplicate bytes count every copy except the smallest one per group."""
+        inbox, _all_mail, sent, old = gmail_folders
+        msg_repo.upsert_batch([
+            Message(uid=1, folder_id=inbox.id, message_id="<d1@x>", size_bytes=3000),
+            Message(uid=2, folder_id=old.id, message_id="<d1@x>", size_bytes=2000),
+            Message(uid=3, folder_id=sent.id, message_id="<d1@x>", size_bytes=3000),
+            Message(uid=4, folder_id=inbox.id, message_id="<d2@x>", size_bytes=700),
+            Message(uid=5, folder_id=old.id, message_id="<d2@x>", size_bytes=700),
+            Message(uid=6, folder_id=inbox.id, message_id="<solo@x>", size_bytes=9000),
+        ])
+        messages, group_count, dup_bytes = msg_repo.find_cross_label_duplicates(gmail_account.id)
+        assert len(messages) == 5
+        assert group_count == 2
+        assert dup_bytes == 6000 + 700
+
     def test_dedup_uses_message_id(self, msg_repo, gmail_folders):
         """get_dedup_total_size deduplicates by message_id."""
         inbox, all_mail, _sent, _old = gmail_folders
@@ -449,6 +628,29 @@ class TestMessageIdMatching:
         assert count == 1
         assert size == 5000
 
+    def test_account_totals_match_dedup_total(self, msg_repo, gmail_folders, gmail_account):
+        inbox, all_mail, sent, _old = gmail_folders
+        msg_repo.upsert_batch([
+            Message(uid=1, folder_id=all_mail.id, message_id="<a@x>", size_bytes=5000),
+            Message(uid=10, folder_id=inbox.id, message_id="<a@x>", size_bytes=5000),
+            Message(uid=2, folder_id=all_mail.id, from_addr="b@x.com", subject="S",
+                    size_bytes=300),
+            Message(uid=20, folder_id=sent.id, from_addr="b@x.com", subject="S",
+                    size_bytes=300),
+            Message(uid=3, folder_id=sent.id, message_id="<c@x>", size_bytes=70),
+        ])
+        folder_ids = [f.id for f in gmail_folders]
+        totals = msg_repo.get_account_totals(gmail_account.id)
+        assert (totals["dedup_size"], totals["dedup_count"]) == (
+            msg_repo.get_dedup_total_size(folder_ids)
+        )
+        assert (totals["total_size"], totals["message_count"]) == (10670, 5)
+
+        no_all_mail = msg_repo.get_account_totals(gmail_account.id, all_mail.id)
+        assert (no_all_mail["dedup_size"], no_all_mail["dedup_count"]) == (
+            msg_repo.get_dedup_total_size([fid for fid in folder_ids if fid != all_mail.id])
+        )
+
     def test_message_id_persisted_via_upsert(self, msg_repo, sample_folder):
         """message_id is saved and retrievable."""
         mid = "<test@example.com>"
@@ -615,3 +817,71 @@ class TestThreadAwareUnlabelled:
         other_ids = [inbox.id, sent.id]
         count, _ = msg_repo.get_unlabelled_stats(all_mail.id, other_ids, mode="in_reply_to")
         assert count == 0, "parent should not be unlabelled when child is labelled"
+
+
+class TestConnectionPool:
+    def test_each_thread_gets_own_connection(self, tmp_path):
+        import threading
+
+        pool = ConnectionPool(tmp_path / "pool.db")
+        main_conn = pool.get()
+        assert pool.get() is main_conn
+
+        seen: list = []
+        t = threading.Thread(target=lambda: seen.append(pool.get()))
+        t.start()
+        t.join()
+        assert seen and seen[0] is not main_conn
+        pool.close()
+
+    def test_repositories_share_data_across_threads(self, tmp_path):
+        import threading
+
+        pool = ConnectionPool(tmp_path / "pool.db")
+        account_repo = AccountRepository(pool)
+        acc = account_repo.upsert(Account(display_name="A", host="h", username="u"))
+
+        found: list = []
+        t = threading.Thread(target=lambda: found.append(account_repo.get_by_id(acc.id)))
+        t.start()
+        t.join()
+        assert found[0] is not None and found[0].username == "u"
+        pool.close()
+
+    def test_memory_pool_shares_one_connection(self):
+        import threading
+
+        pool = ConnectionPool(":memory:")
+        seen: list = []
+        t = threading.Thread(target=lambda: seen.append(pool.get()))
+        t.start()
+        t.join()
+        assert seen[0] is pool.get()
+        pool.close()
+
+
+class TestSchema:
+    def test_attachment_index_is_folder_scoped(self, conn):
+        names = {
+            r["name"] for r in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index'"
+            ).fetchall()
+        }
+        assert "idx_messages_folder_attach" in names
+        assert "idx_messages_attachment" not in names
+
+    def test_migrate_drops_old_attachment_index(self, tmp_path):
+        path = tmp_path / "old.db"
+        init_db(path).close()
+        old = init_db(path)
+        old.execute(
+            "CREATE INDEX idx_messages_attachment ON messages(has_attachment) WHERE has_attachment=1"
+        )
+        old.commit()
+        old.close()
+        c = init_db(path)
+        row = c.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'idx_messages_attachment'"
+        ).fetchone()
+        assert row is None
+        c.close()
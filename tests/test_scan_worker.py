@@ -10,7 +10,10 @@ from mailsweep.workers.scan_worker import (
     _decode_header,
     _parse_date,
     _envelope_addr,
+    _uid_ranges,
 )
+from mailsweep.models.folder import Folder
+from mailsweep.workers.incremental_scan import folder_unchanged, get_new_uids_since
 
 
 def make_mock_client(uid_map: dict) -> MagicMock:
@@ -185,6 +188,89 @@ class TestScanWorker:
         assert len(messages) == 0  # Cancelled before first batch
 
 
+    def test_fetch_batches_use_uid_ranges(self):
+        client = MagicMock()
+        client.search.return_value = [7, 1, 2, 3, 5, 6]
+        client.fetch.return_value = {}
+
+        worker = ScanWorker(client=client, folder_id=1, folder_name="INBOX", batch_size=4)
+        worker.run()
+        requested = [c.args[0] for c in client.fetch.call_args_list]
+        assert requested == [["1:3", "5"], ["6:7"]]
+
+
+class TestUidRanges:
+    def test_collapses_consecutive_runs(self):
+        assert _uid_ranges([1, 2, 3, 5, 7, 8]) == ["1:3", "5", "7:8"]
+
+    def test_empty(self):
+        assert _uid_ranges([]) == []
+
+
+class TestFolderUnchanged:
+    def test_same_modseq_and_count(self):
+        folder = Folder(highest_modseq=50, message_count=3)
+        assert folder_unchanged(folder, {b"HIGHESTMODSEQ": 50, b"EXISTS": 3})
+
+    def test_modseq_moved(self):
+        folder = Folder(highest_modseq=50, message_count=3)
+        assert not folder_unchanged(folder, {b"HIGHESTMODSEQ": 51, b"EXISTS": 3})
+
+    def test_expunge_without_modseq_change(self):
+        folder = Folder(highest_modseq=50, message_count=3)
+        assert not folder_unchanged(folder, {b"HIGHESTMODSEQ": 50, b"EXISTS": 2})
+
+    def test_no_condstore(self):
+        folder = Folder(highest_modseq=0, message_count=3)
+        assert not folder_unchanged(folder, {b"EXISTS": 3})
+
+
+class TestNewUidsSince:
+    def test_only_uids_above_watermark(self):
+        client = MagicMock()
+        client.search.side_effect = [[10, 12, 11], []]
+        folder = Folder(id=1, last_uid=10, message_count=5)
+        assert get_new_uids_since(client, folder, {b"EXISTS": 7}, MagicMock()) == [11, 12]
+        client.search.assert_any_call(["UID", "11:*", "NOT", "DELETED"])
+
+    def test_expunge_needs_full_diff(self):
+        client = MagicMock()
+        client.search.return_value = [11]
+        folder = Folder(id=1, last_uid=10, message_count=5)
+        assert get_new_uids_since(client, folder, {b"EXISTS": 5}, MagicMock()) is None
+
+    def test_flagged_deleted_needs_full_diff(self):
+        client = MagicMock()
+        client.search.side_effect = [[10], [7]]
+        msg_repo = MagicMock()
+        msg_repo.get_uids_for_folder.return_value = {6, 7, 8, 9, 10}
+        folder = Folder(id=1, last_uid=10, message_count=5)
+        assert get_new_uids_since(client, folder, {b"EXISTS": 5}, msg_repo) is None
+
+    def test_flagged_deleted_not_cached(self):
+        client = MagicMock()
+        client.search.side_effect = [[10], [3]]
+        msg_repo = MagicMock()
+        msg_repo.get_uids_for_folder.return_value = {6, 7, 8, 9, 10}
+        folder = Folder(id=1, last_uid=10, message_count=5)
+        # EXISTS counts the uncached flagged UID 3 on top of the five cached
+        assert get_new_uids_since(client, folder, {b"EXISTS": 6}, msg_repo) == []
+
+    def test_expunge_hidden_by_uncached_flagged(self):
+        client = MagicMock()
+        client.search.side_effect = [[10], [3]]
+        msg_repo = MagicMock()
+        msg_repo.get_uids_for_folder.return_value = {6, 7, 8, 9, 10}
+        folder = Folder(id=1, last_uid=10, message_count=5)
+        # UID 8 was expunged; flagged UID 3 keeps EXISTS at the cached count
+        assert get_new_uids_since(client, folder, {b"EXISTS": 5}, msg_repo) is None
+
+    def test_no_watermark(self):
+        client = MagicMock()
+        assert get_new_uids_since(client, Folder(id=1), {b"EXISTS": 0}, MagicMock()) is None
+        client.search.assert_not_called()
+
+
 class TestBodystructureParsing:
     def test_simple_text(self):
         bs = (b"text", b"plain", [], None, None, b"7bit", 100)